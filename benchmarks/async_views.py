@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+"""
+Compare the sync and native async read endpoints under concurrency.
+
+For each endpoint (feed, detail, nearby, locations, my notifications) and
+each concurrency level, virtual users hammer the sync route (/api/...) and
+then its async twin (/api/async/...) through the ASGI app in one process,
+as a single Daphne worker would serve them. Reports req/s and p50/p95/p99 per
+route, so the effect of not holding a thread per request shows up as the
+concurrency grows.
+
+Both variants share the Redis cache entries, so --cold clears the cache
+before every run to measure the database path instead of cache hits.
+
+Usage (from the repository root, with PostGIS and Redis running):
+    python benchmarks/async_views.py
+    python benchmarks/async_views.py --concurrency 1,10,50,200 --duration 10
+    python benchmarks/async_views.py --endpoints feed,nearby --cold
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from django.core.asgi import get_asgi_application  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+
+from loadgen import AsgiClient, Recorder, prepare  # noqa: E402  (sets up Django)
+
+ENDPOINTS = ("feed", "detail", "nearby", "locations", "notifications")
+
+
+def endpoint_request(name, rng, issues):
+    """(path suffix, query) for one request to `name`."""
+    issue_id, lon, lat, _ = rng.choice(issues)
+    if name == "feed":
+        page = 1 + int(rng.expovariate(1.0))
+        return "issues/", {"page": page} if page > 1 else None
+    if name == "detail":
+        return f"issues/{issue_id}/", None
+    if name == "nearby":
+        return "issues/nearby/", {
+            "latitude": round(lat, 3),
+            "longitude": round(lon, 3),
+            "distance": rng.choice((500, 1000, 3000)),
+        }
+    if name == "locations":
+        span = rng.choice((0.02, 0.05, 0.1))
+        lon, lat = round(lon, 2), round(lat, 2)
+        return "issues/locations/", {
+            "bbox": f"{lon - span},{lat - span},{lon + span},{lat + span}"
+        }
+    return "notifications/my/", None
+
+
+async def measure(app, name, prefix, concurrency, args, users, issues):
+    recorder = Recorder()
+    client = AsgiClient(app, recorder)
+    label = f"{name}:{'async' if prefix else 'sync'}"
+    warmup_end = time.monotonic() + args.warmup
+    deadline = warmup_end + args.duration
+
+    async def virtual_user(index):
+        rng = random.Random(args.seed * 1000 + index)
+        token = users[index % len(users)]
+        while time.monotonic() < deadline:
+            if not recorder.recording and time.monotonic() >= warmup_end:
+                recorder.recording = True
+            path, query = endpoint_request(name, rng, issues)
+            await client.request(label, "GET", f"/api/{prefix}{path}", token, query)
+
+    await asyncio.gather(*(virtual_user(index) for index in range(concurrency)))
+    rows = recorder.report(time.monotonic() - warmup_end)
+    if label not in rows:
+        raise SystemExit(f"{label}: no request finished within --duration")
+    return rows[label]
+
+
+async def run(args, users, issues):
+    app = get_asgi_application()
+    results = []
+    for name in args.endpoints:
+        for concurrency in args.concurrency:
+            for prefix in ("", "async/"):
+                if args.cold:
+                    await cache.aclear()
+                row = await measure(app, name, prefix, concurrency, args, users, issues)
+                row.update(
+                    endpoint=name,
+                    variant="async" if prefix else "sync",
+                    concurrency=concurrency,
+                )
+                results.append(row)
+                print_row(row)
+    return results
+
+
+def print_row(row):
+    print(
+        f"{row['endpoint']:<15}{row['variant']:<7}{row['concurrency']:>6}"
+        f"{row['requests']:>8}{row['errors']:>6}{row['rps']:>9.1f}"
+        f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}",
+        flush=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--concurrency",
+        type=lambda text: [int(n) for n in text.split(",")],
+        default=[1, 10, 50, 100],
+        help="Comma-separated concurrency levels",
+    )
+    parser.add_argument(
+        "--endpoints",
+        type=lambda text: [name.strip() for name in text.split(",")],
+        default=list(ENDPOINTS),
+        help=f"Comma-separated subset of {','.join(ENDPOINTS)}",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10, help="Measured seconds per run"
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=2, help="Unmeasured seconds per run"
+    )
+    parser.add_argument(
+        "--users", type=int, default=50, help="Distinct loadgen accounts"
+    )
+    parser.add_argument(
+        "--issues", type=int, default=2000, help="Issues to sample targets from"
+    )
+    parser.add_argument(
+        "--cold", action="store_true", help="Clear the cache before each run"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+    users, _, issues = prepare(args)
+    if not issues:
+        parser.error(
+            "No approved issues with a location found, seed the database first"
+        )
+
+    print(
+        f"{'endpoint':<15}{'variant':<7}{'conc':>6}{'reqs':>8}{'err':>6}"
+        f"{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)"
+    )
+    results = asyncio.run(run(args, users, issues))
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(
+                {
+                    "args": {k: v for k, v in vars(args).items() if k != "json"},
+                    "runs": results,
+                },
+                handle,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+"""
+Compare GeoJSON and polyline geometry encoding for API payloads.
+
+Reports raw and gzip payload bytes and encode time for:
+  - issue points, as returned by IssueSerializer / /issues/locations/
+  - area boundaries, as returned by /issues/in-area/
+
+Usage (from the repository root):
+    python benchmarks/geometry_encoding.py
+    python benchmarks/geometry_encoding.py --points 5000 --vertices 2000
+    python benchmarks/geometry_encoding.py --from-db
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "my_site.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon  # noqa: E402
+
+from my_api.geometry import encode_geometry, encode_polyline  # noqa: E402
+
+# Karachi, where most of the data lives.
+CENTER = (67.0011, 24.8607)
+
+
+def synthetic_points(count):
+    rng = random.Random(42)
+    return [
+        Point(
+            CENTER[0] + rng.uniform(-0.3, 0.3),
+            CENTER[1] + rng.uniform(-0.3, 0.3),
+            srid=4326,
+        )
+        for _ in range(count)
+    ]
+
+
+def synthetic_boundaries(count, vertices):
+    rng = random.Random(7)
+    boundaries = []
+    for _ in range(count):
+        cx = CENTER[0] + rng.uniform(-0.2, 0.2)
+        cy = CENTER[1] + rng.uniform(-0.2, 0.2)
+        ring = []
+        for step in range(vertices):
+            angle = 2 * math.pi * step / vertices
+            radius = 0.01 * (1 + 0.2 * rng.random())
+            ring.append((cx + radius * math.cos(angle), cy + radius * math.sin(angle)))
+        ring.append(ring[0])
+        boundaries.append(MultiPolygon(Polygon(ring), srid=4326))
+    return boundaries
+
+
+def db_data(limit):
+    from my_api.models import AreaLocation, Issue
+
+    points = list(
+        Issue.objects.exclude(location__isnull=True).values_list("location", flat=True)[
+            :limit
+        ]
+    )
+    boundaries = list(
+        AreaLocation.objects.exclude(boundary__isnull=True).values_list(
+            "boundary", flat=True
+        )
+    )
+    return points, boundaries
+
+
+def measure(label, encode, repeat):
+    payload = encode()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        payload = encode()
+    elapsed = (time.perf_counter() - start) / repeat
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    return label, len(body), len(gzip.compress(body)), elapsed * 1000
+
+
+def report(title, rows):
+    print(f"\n{title}")
+    print(f"{'format':<28}{'bytes':>12}{'gzip':>12}{'encode ms':>12}")
+    base_bytes, base_gzip = rows[0][1], rows[0][2]
+    for label, size, gzipped, ms in rows:
+        print(
+            f"{label:<28}{size:>12,}{gzipped:>12,}{ms:>12.2f}"
+            f"   ({size / base_bytes:.0%} / {gzipped / base_gzip:.0%} of GeoJSON)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--points", type=int, default=1000)
+    parser.add_argument("--areas", type=int, default=20)
+    parser.add_argument("--vertices", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--from-db", action="store_true", help="Use issues and areas from the database"
+    )
+    args = parser.parse_args()
+
+    if args.from_db:
+        points, boundaries = db_data(args.points)
+    else:
+        points = synthetic_points(args.points)
+        boundaries = synthetic_boundaries(args.areas, args.vertices)
+
+    if points:
+        report(
+            f"{len(points)} issue points",
+            [
+                measure(
+                    "GeoJSON per item",
+                    lambda: [json.loads(point.json) for point in points],
+                    args.repeat,
+                ),
+                measure(
+                    "polyline per item",
+                    lambda: [encode_geometry(point) for point in points],
+                    args.repeat,
+                ),
+                measure(
+                    "polyline single string",
+                    lambda: encode_polyline(point.coords for point in points),
+                    args.repeat,
+                ),
+            ],
+        )
+
+    if boundaries:
+        vertex_count = sum(boundary.num_points for boundary in boundaries)
+        report(
+            f"{len(boundaries)} boundaries, {vertex_count} vertices",
+            [
+                measure(
+                    "nested coordinate lists",
+                    lambda: [list(boundary.coords) for boundary in boundaries],
+                    args.repeat,
+                ),
+                measure(
+                    "polyline rings",
+                    lambda: [encode_geometry(boundary) for boundary in boundaries],
+                    args.repeat,
+                ),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    main()
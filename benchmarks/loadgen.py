@@ -0,0 +1,396 @@
+#!/usr/bin/env python
+"""
+Drive a mixed API workload through the ASGI app and report per-endpoint latency.
+
+Virtual users run concurrently against the Django ASGI application in-process
+(the same handler Daphne serves, without the socket), authenticated with real
+JWTs, against the database and Redis configured in settings. Each virtual
+user loops over weighted scenarios:
+
+    feed     GET   /api/issues/?page=N
+    map      GET   /api/issues/nearby/ and /api/issues/locations/?bbox=...
+    like     POST  /api/issues/<id>/like/
+    comment  POST  /api/comments/
+    status   PATCH /api/issues/<id>/change-status/ (as an admin, cycling
+                   approved -> solving -> rejected -> approved)
+
+and the run reports throughput plus p50/p95/p99 per endpoint. Use --seed and
+the same data set to compare runs, and --json to keep the numbers.
+
+The run writes to the database: it creates loadgen users, likes, comments
+and status changes on the sampled issues. Point it at a local database.
+The sliding-window throttles are lifted for the run unless --throttles is set.
+
+Usage (from the repository root, with PostGIS and Redis running):
+    python benchmarks/loadgen.py
+    python benchmarks/loadgen.py --concurrency 50 --duration 60
+    python benchmarks/loadgen.py --mix feed=5,map=3,like=1 --json run.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "my_site.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.asgi import get_asgi_application  # noqa: E402
+
+from my_api.models import Issue, MyApiUser  # noqa: E402
+from my_api.throttling import SlidingWindowThrottle  # noqa: E402
+
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+SCENARIOS = ("feed", "map", "like", "comment", "status")
+DEFAULT_MIX = "feed=40,map=30,like=15,comment=10,status=5"
+STATUS_CYCLE = {
+    Issue.APPROVED: Issue.SOLVING,
+    Issue.SOLVING: Issue.REJECTED,
+    Issue.REJECTED: Issue.APPROVED,
+    Issue.REOPENED: Issue.SOLVING,
+}
+VISIBLE_STATUSES = [
+    Issue.APPROVED,
+    Issue.SOLVING,
+    Issue.OFFICIAL_SOLVED,
+    Issue.PENDING_USER_CONFIRMATION,
+    Issue.SOLVED,
+    Issue.REOPENED,
+]
+
+
+def percentile(samples, fraction):
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown scenario '{name}', expected one of {', '.join(SCENARIOS)}"
+            )
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.recording = False
+
+    def record(self, endpoint, status, seconds):
+        if not self.recording:
+            return
+        self.samples[endpoint].append(seconds)
+        self.statuses[endpoint][status] += 1
+        if status >= 400:
+            self.errors[endpoint] += 1
+
+    def report(self, elapsed):
+        rows = {}
+        for endpoint in sorted(self.samples):
+            samples = sorted(self.samples[endpoint])
+            rows[endpoint] = {
+                "requests": len(samples),
+                "errors": self.errors[endpoint],
+                "statuses": dict(self.statuses[endpoint]),
+                "rps": len(samples) / elapsed,
+                "mean_ms": statistics.fmean(samples) * 1000,
+                "p50_ms": percentile(samples, 0.50) * 1000,
+                "p95_ms": percentile(samples, 0.95) * 1000,
+                "p99_ms": percentile(samples, 0.99) * 1000,
+                "max_ms": samples[-1] * 1000,
+            }
+        return rows
+
+
+class AsgiClient:
+    """Minimal HTTP client speaking ASGI directly to the application."""
+
+    def __init__(self, app, recorder):
+        self.app = app
+        self.recorder = recorder
+
+    async def request(self, endpoint, method, path, token, query=None, data=None):
+        body = json.dumps(data).encode() if data is not None else b""
+        headers = [
+            (b"host", b"localhost"),
+            (b"authorization", f"Bearer {token}".encode()),
+            (b"accept", b"application/json"),
+        ]
+        if data is not None:
+            headers.append((b"content-type", b"application/json"))
+            headers.append((b"content-length", str(len(body)).encode()))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": urlencode(query or {}).encode(),
+            "headers": headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("localhost", 80),
+        }
+        request_sent = False
+        response = {"status": 0, "body": []}
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+
+        start = time.perf_counter()
+        await self.app(scope, receive, send)
+        self.recorder.record(endpoint, response["status"], time.perf_counter() - start)
+        return response["status"], b"".join(response["body"])
+
+
+class Workload:
+    def __init__(self, args, client, users, admin_token, issues):
+        self.args = args
+        self.client = client
+        self.users = users
+        self.admin_token = admin_token
+        self.issues = issues
+        self.status_pool = asyncio.Queue()
+        for issue_id, _, _, issue_status in issues[: args.status_pool]:
+            if issue_status in STATUS_CYCLE:
+                self.status_pool.put_nowait([issue_id, issue_status])
+
+    async def feed(self, rng, token):
+        page = 1 + int(rng.expovariate(1.0))
+        query = {"page": page} if page > 1 else None
+        await self.client.request("issues-list", "GET", "/api/issues/", token, query)
+
+    async def map(self, rng, token):
+        _, lon, lat, _ = rng.choice(self.issues)
+        lon += rng.uniform(-0.01, 0.01)
+        lat += rng.uniform(-0.01, 0.01)
+        await self.client.request(
+            "issues-nearby",
+            "GET",
+            "/api/issues/nearby/",
+            token,
+            {
+                "latitude": lat,
+                "longitude": lon,
+                "distance": rng.choice((500, 1000, 3000)),
+            },
+        )
+        span = rng.choice((0.02, 0.05, 0.1))
+        await self.client.request(
+            "issues-locations",
+            "GET",
+            "/api/issues/locations/",
+            token,
+            {"bbox": f"{lon - span},{lat - span},{lon + span},{lat + span}"},
+        )
+
+    async def like(self, rng, token):
+        issue_id = rng.choice(self.issues)[0]
+        await self.client.request(
+            "issues-like", "POST", f"/api/issues/{issue_id}/like/", token
+        )
+
+    async def comment(self, rng, token):
+        issue_id = rng.choice(self.issues)[0]
+        await self.client.request(
+            "comments-list",
+            "POST",
+            "/api/comments/",
+            token,
+            data={
+                "issueId": issue_id,
+                "content": f"loadgen comment {rng.random():.6f}",
+            },
+        )
+
+    async def status(self, rng, token):
+        if self.status_pool.empty():
+            return
+        entry = await self.status_pool.get()
+        try:
+            issue_id, current = entry
+            new_status = STATUS_CYCLE[current]
+            code, _ = await self.client.request(
+                "issues-change-status",
+                "PATCH",
+                f"/api/issues/{issue_id}/change-status/",
+                self.admin_token,
+                data={"new_status": new_status},
+            )
+            if code == 200:
+                entry[1] = new_status
+        finally:
+            self.status_pool.put_nowait(entry)
+
+    async def virtual_user(self, index, deadline):
+        rng = random.Random(self.args.seed * 100_003 + index)
+        token = self.users[index % len(self.users)]
+        names = list(self.args.mix)
+        weights = [self.args.mix[name] for name in names]
+        while time.monotonic() < deadline:
+            scenario = rng.choices(names, weights)[0]
+            await getattr(self, scenario)(rng, token)
+            if self.args.think_ms:
+                await asyncio.sleep(rng.expovariate(1000 / self.args.think_ms))
+
+
+def prepare(args):
+    users = []
+    for index in range(args.users):
+        user = MyApiUser.objects.filter(email=f"loadgen{index}@example.com").first()
+        if user is None:
+            user = MyApiUser.objects.create_user(
+                f"loadgen{index}@example.com",
+                f"loadgen{index}",
+                password=None,
+                verified=True,
+            )
+        users.append(str(RefreshToken.for_user(user).access_token))
+
+    admin = MyApiUser.objects.filter(email="loadgen-admin@example.com").first()
+    if admin is None:
+        admin = MyApiUser.objects.create_user(
+            "loadgen-admin@example.com",
+            "loadgen-admin",
+            password=None,
+            role=MyApiUser.ADMIN,
+            verified=True,
+        )
+    admin_token = str(RefreshToken.for_user(admin).access_token)
+
+    issues = [
+        (issue_id, location.x, location.y, issue_status)
+        for issue_id, location, issue_status in Issue.objects.filter(
+            issue_status__in=VISIBLE_STATUSES + [Issue.REJECTED],
+            location__isnull=False,
+        )
+        .order_by("id")
+        .values_list("id", "location", "issue_status")[: args.issues]
+    ]
+    return users, admin_token, issues
+
+
+async def run(args, users, admin_token, issues):
+    recorder = Recorder()
+    client = AsgiClient(get_asgi_application(), recorder)
+    workload = Workload(args, client, users, admin_token, issues)
+
+    warmup_end = time.monotonic() + args.warmup
+    deadline = warmup_end + args.duration
+
+    async def start_recording():
+        await asyncio.sleep(args.warmup)
+        recorder.recording = True
+
+    await asyncio.gather(
+        start_recording(),
+        *(workload.virtual_user(index, deadline) for index in range(args.concurrency)),
+    )
+    elapsed = time.monotonic() - warmup_end
+    return recorder.report(elapsed), elapsed
+
+
+def print_report(rows, elapsed, args):
+    total = sum(row["requests"] for row in rows.values())
+    errors = sum(row["errors"] for row in rows.values())
+    print(
+        f"{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s), "
+        f"{errors} errors, concurrency {args.concurrency}"
+    )
+    print(
+        f"{'endpoint':<24}{'reqs':>8}{'err':>6}{'req/s':>9}"
+        f"{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)"
+    )
+    for endpoint, row in rows.items():
+        print(
+            f"{endpoint:<24}{row['requests']:>8}{row['errors']:>6}{row['rps']:>9.1f}"
+            f"{row['mean_ms']:>9.1f}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}"
+            f"{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}"
+        )
+        unexpected = {code: n for code, n in row["statuses"].items() if code >= 400}
+        if unexpected:
+            print(f"{'':<24}status codes: {unexpected}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds")
+    parser.add_argument(
+        "--warmup", type=float, default=5, help="Unmeasured seconds first"
+    )
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument(
+        "--users", type=int, default=50, help="Distinct loadgen accounts"
+    )
+    parser.add_argument(
+        "--issues", type=int, default=2000, help="Issues to sample targets from"
+    )
+    parser.add_argument(
+        "--status-pool", type=int, default=50, help="Issues whose status gets cycled"
+    )
+    parser.add_argument(
+        "--think-ms", type=float, default=0, help="Mean pause between requests"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--throttles", action="store_true", help="Keep the configured write throttles"
+    )
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    if not args.throttles:
+        SlidingWindowThrottle.allow_request = lambda self, request, view: True
+
+    users, admin_token, issues = prepare(args)
+    if not issues:
+        parser.error(
+            "No approved issues with a location found, seed the database first"
+        )
+
+    rows, elapsed = asyncio.run(run(args, users, admin_token, issues))
+    print_report(rows, elapsed, args)
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(
+                {
+                    "args": {k: v for k, v in vars(args).items() if k != "json"},
+                    "elapsed": elapsed,
+                    "endpoints": rows,
+                },
+                handle,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
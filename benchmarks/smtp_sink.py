@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Local SMTP sink for load testing the email queue.
+
+Accepts any message and discards it, printing connection and message
+throughput every few seconds. It speaks plain SMTP (no STARTTLS/AUTH), so
+point the worker at it with:
+
+    EMAIL_BACKEND=django.core.mail.backends.smtp.EmailBackend
+    EMAIL_HOST=127.0.0.1 EMAIL_PORT=1025 EMAIL_USE_TLS=False
+    EMAIL_HOST_USER= EMAIL_HOST_PASSWORD=
+
+Usage:
+    python benchmarks/smtp_sink.py --port 1025 --latency 0.05
+    python manage.py send_queued_emails --once
+
+--latency adds a delay to every reply, to mimic a remote relay and show what
+connection reuse saves per message.
+"""
+
+import argparse
+import asyncio
+import time
+
+
+class Stats:
+    def __init__(self):
+        self.connections = 0
+        self.messages = 0
+        self.bytes = 0
+
+
+async def handle_client(reader, writer, stats, latency):
+    stats.connections += 1
+
+    async def reply(line):
+        if latency:
+            await asyncio.sleep(latency)
+        writer.write(line.encode() + b"\r\n")
+        await writer.drain()
+
+    await reply("220 smtp-sink ready")
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode(errors="replace").strip().upper()
+
+            if command.startswith("EHLO"):
+                writer.write(b"250-smtp-sink\r\n250-8BITMIME\r\n")
+                await reply("250 SMTPUTF8")
+            elif command.startswith("DATA"):
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                while True:
+                    data = await reader.readline()
+                    if not data or data == b".\r\n":
+                        break
+                    stats.bytes += len(data)
+                stats.messages += 1
+                await reply("250 OK queued")
+            elif command.startswith("QUIT"):
+                await reply("221 Bye")
+                break
+            elif command.split(" ", 1)[0] in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                await reply("250 OK")
+            else:
+                await reply("502 Command not implemented")
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def report(stats, interval):
+    last_messages = 0
+    last_time = time.monotonic()
+    while True:
+        await asyncio.sleep(interval)
+        now = time.monotonic()
+        rate = (stats.messages - last_messages) / (now - last_time)
+        print(
+            f"connections={stats.connections} messages={stats.messages} "
+            f"bytes={stats.bytes} rate={rate:.1f} msg/s",
+            flush=True,
+        )
+        last_messages, last_time = stats.messages, now
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds to delay every reply"
+    )
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    args = parser.parse_args()
+
+    stats = Stats()
+    server = await asyncio.start_server(
+        lambda r, w: handle_client(r, w, stats, args.latency), args.host, args.port
+    )
+    print(f"SMTP sink listening on {args.host}:{args.port}", flush=True)
+    async with server:
+        await asyncio.gather(
+            server.serve_forever(), report(stats, args.report_interval)
+        )
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Measure the per-request cost of the Redis sliding-window throttles.
+
+Runs the per-user and per-IP throttle checks for a scope (as DRF does for a
+throttled action) against the Redis at REDIS_URL, and reports the latency
+distribution of one check. The throttled scope's rate is raised for the run so
+every check takes the counting path.
+
+Usage (from the repository root, with Redis running):
+    python benchmarks/throttling.py
+    python benchmarks/throttling.py --requests 50000 --clients 1000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "my_site.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+
+from my_api.redis_client import get_redis  # noqa: E402
+from my_api.throttling import SlidingWindowThrottle, scoped_throttles  # noqa: E402
+
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+SCOPE = "benchmark"
+
+
+class BenchmarkUser:
+    is_authenticated = True
+
+    def __init__(self, pk):
+        self.pk = pk
+
+
+def percentile(samples, fraction):
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument(
+        "--clients", type=int, default=100, help="Distinct users / IPs to rotate"
+    )
+    args = parser.parse_args()
+
+    SlidingWindowThrottle.THROTTLE_RATES = {
+        **SlidingWindowThrottle.THROTTLE_RATES,
+        SCOPE: f"{args.requests * 10}/hour",
+        f"{SCOPE}_ip": f"{args.requests * 10}/hour",
+    }
+
+    factory = APIRequestFactory()
+    client_requests = []
+    for index in range(args.clients):
+        request = factory.post(
+            "/issues/1/like/", REMOTE_ADDR=f"10.0.{index // 256}.{index % 256}"
+        )
+        request.user = BenchmarkUser(index) if index % 2 else AnonymousUser()
+        client_requests.append(request)
+
+    redis_client = get_redis()
+    redis_client.ping()
+    start = time.perf_counter()
+    for _ in range(1000):
+        redis_client.ping()
+    round_trip = (time.perf_counter() - start) / 1000
+
+    samples = []
+    denied = 0
+    for index in range(args.requests):
+        request = client_requests[index % len(client_requests)]
+        start = time.perf_counter()
+        throttles = scoped_throttles(SCOPE)
+        allowed = all(throttle.allow_request(request, None) for throttle in throttles)
+        samples.append(time.perf_counter() - start)
+        denied += not allowed
+
+    for key in redis_client.scan_iter(f"throttle:{SCOPE}:*"):
+        redis_client.delete(key)
+
+    samples.sort()
+    to_us = 1_000_000
+    print(
+        f"{args.requests} throttled requests, {args.clients} clients, {denied} denied"
+    )
+    print(f"redis PING round trip  {round_trip * to_us:8.1f} us")
+    print(f"throttle check mean    {statistics.fmean(samples) * to_us:8.1f} us")
+    for label, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+        print(
+            f"throttle check {label}     {percentile(samples, fraction) * to_us:8.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
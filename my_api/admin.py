@@ -10,7 +10,16 @@ from leaflet.admin import LeafletGeoAdmin
 from unfold.admin import ModelAdmin
 from unfold.sites import UnfoldAdminSite
 
-from .models import Comment, Issue, Like, MyApiOfficial, MyApiUser
+from .models import (
+    Comment,
+    EmergencyService,
+    Issue,
+    Like,
+    MyApiOfficial,
+    MyApiUser,
+    OutboxEvent,
+    OutgoingEmail,
+)
 
 
 class MyApiUserAdmin(LeafletGeoAdmin, ModelAdmin):
@@ -86,7 +95,13 @@ class LikeAdmin(ModelAdmin):
 
 
 class MyApiOfficialAdmin(LeafletGeoAdmin, ModelAdmin):
-    list_display = ("user", "district_name", "country_code")
+    list_display = (
+        "user",
+        "district_name",
+        "country_code",
+        "assigned_count",
+        "resolved_count",
+    )
     search_fields = ("user__username", "country_code")
     list_filter = ("country_code", "city_name", "country_name", "district_name")
     fieldsets = (
@@ -112,6 +127,11 @@ class MyApiOfficialAdmin(LeafletGeoAdmin, ModelAdmin):
             },
         ),
     )
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # assigned_issues may have been edited in the form.
+        form.instance.refresh_stats()
+
     # readonly_fields = (
     #     "country_code",
     #     "city_name",
@@ -120,6 +140,28 @@ class MyApiOfficialAdmin(LeafletGeoAdmin, ModelAdmin):
     # )
 
 
+class EmergencyServiceAdmin(LeafletGeoAdmin, ModelAdmin):
+    list_display = ("name", "tag_key", "tag_value", "phone", "updated_at")
+    search_fields = ("name", "address")
+    list_filter = ("tag_key", "tag_value")
+    readonly_fields = ("osm_type", "osm_id", "updated_at")
+
+
+class OutgoingEmailAdmin(ModelAdmin):
+    list_display = ("subject", "to", "status", "attempts", "created_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("subject", "last_error")
+    readonly_fields = ("created_at", "sent_at", "last_error")
+
+
+class OutboxEventAdmin(ModelAdmin):
+    list_display = ("kind", "issue", "status", "attempts", "created_at", "processed_at")
+    list_filter = ("kind", "status")
+    search_fields = ("last_error",)
+    raw_id_fields = ("issue",)
+    readonly_fields = ("created_at", "processed_at", "last_error")
+
+
 class CustomAdminSite(UnfoldAdminSite):
     site_header = "Masla Bolo Admin"
     site_title = "Masla Bolo Admin"
@@ -156,3 +198,6 @@ custom_admin_site.register(Issue, IssueAdmin)
 custom_admin_site.register(Comment, CommentAdmin)
 custom_admin_site.register(Like, LikeAdmin)
 custom_admin_site.register(MyApiOfficial, MyApiOfficialAdmin)
+custom_admin_site.register(EmergencyService, EmergencyServiceAdmin)
+custom_admin_site.register(OutgoingEmail, OutgoingEmailAdmin)
+custom_admin_site.register(OutboxEvent, OutboxEventAdmin)
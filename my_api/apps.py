@@ -1,6 +1,28 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+from .metrics import install_query_counter
+
+
+def simplify_missing_boundaries(sender, using, **kwargs):
+    """
+    Fill the per-zoom boundaries of areas that predate them (or were written
+    with a queryset update), so upgraded databases serve ?zoom= without a
+    manual simplify_area_boundaries run.
+    """
+    AreaLocation = sender.get_model("AreaLocation")
+    missing = AreaLocation.objects.using(using).filter(
+        boundary__isnull=False, boundary_z8__isnull=True
+    )
+    if missing.exists():
+        missing.simplify_boundaries()
 
 
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "my_api"
+
+    def ready(self):
+        post_migrate.connect(simplify_missing_boundaries, sender=self)
+        connection_created.connect(install_query_counter)
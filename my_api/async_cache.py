@@ -0,0 +1,76 @@
+"""
+Native asyncio access to the default cache, for the async views.
+
+Django's `cache.aget()`/`aset()` run the sync client in a worker thread. With
+the Redis backend these helpers talk to the same Redis database through
+redis.asyncio instead, using the backend's key function and serializer, so
+entries written by sync code are read by async code and vice versa. Other
+backends (locmem in tests) fall back to `cache.aget()`/`aset()`.
+
+As in sync code, Redis errors are treated as misses.
+"""
+
+import asyncio
+import weakref
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.redis import RedisCache, RedisSerializer
+
+import redis
+import redis.asyncio
+
+from .metrics import record_cache_lookup
+
+# redis.asyncio connections belong to the event loop that opened them.
+_clients = weakref.WeakKeyDictionary()
+_serializer = RedisSerializer()
+
+
+def _cache():
+    return caches["default"]
+
+
+def _client():
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        location = settings.CACHES["default"]["LOCATION"]
+        if isinstance(location, str):
+            location = location.split(",")
+        # Django writes to the first server, so read from it too.
+        client = _clients[loop] = redis.asyncio.Redis.from_url(
+            location[0], socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+    return client
+
+
+async def aget(key, default=None):
+    cache = _cache()
+    if not isinstance(cache, RedisCache):
+        value = await cache.aget(key, default)
+        record_cache_lookup(key, value is not default)
+        return value
+
+    try:
+        raw = await _client().get(cache.make_and_validate_key(key))
+    except redis.exceptions.RedisError:
+        raw = None
+    record_cache_lookup(key, raw is not None)
+    return default if raw is None else _serializer.loads(raw)
+
+
+async def aset(key, value, timeout=DEFAULT_TIMEOUT):
+    cache = _cache()
+    if not isinstance(cache, RedisCache):
+        await cache.aset(key, value, timeout)
+        return
+
+    timeout = cache.get_backend_timeout(timeout)
+    try:
+        await _client().set(
+            cache.make_and_validate_key(key), _serializer.dumps(value), ex=timeout
+        )
+    except redis.exceptions.RedisError:
+        pass
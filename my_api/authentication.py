@@ -0,0 +1,74 @@
+from django.utils.translation import gettext_lazy as _
+
+from asgiref.sync import sync_to_async
+
+from .user_cache import aget_cached_user, get_cached_user
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that reads the user from the two-tier user cache
+    (see user_cache.py) instead of querying MyApiUser on every request.
+    `aauthenticate` does the same for the async views, without a thread hop
+    unless both cache tiers miss.
+    """
+
+    def get_user(self, validated_token):
+        if getattr(api_settings, "CHECK_REVOKE_TOKEN", False):
+            # Revocation compares against the live password hash.
+            return super().get_user(validated_token)
+
+        try:
+            user = get_cached_user(self.get_user_id(validated_token), self.load_user)
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        return self.check_active(user)
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        if getattr(api_settings, "CHECK_REVOKE_TOKEN", False):
+            return await sync_to_async(super().get_user)(validated_token)
+
+        try:
+            user = await aget_cached_user(
+                self.get_user_id(validated_token), self.aload_user
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        return self.check_active(user)
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def check_active(self, user):
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+    def load_user(self, user_id):
+        return self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+
+    async def aload_user(self, user_id):
+        return await self.user_model.objects.aget(
+            **{api_settings.USER_ID_FIELD: user_id}
+        )
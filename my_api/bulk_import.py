@@ -0,0 +1,498 @@
+"""
+Bulk issue import from CSV or GeoJSON.
+
+The per-issue path (IssueViewSet.create) geocodes, fetches a boundary and
+runs a duplicate query for every issue. Imports instead:
+
+1. stream rows from the file (csv.DictReader, or an incremental GeoJSON
+   feature reader) in batches of `batch_size`,
+2. validate each batch in Python, collecting per-row errors,
+3. COPY the valid rows into a temporary staging table,
+4. resolve areas (the smallest AreaLocation covering the point) and
+   duplicates (an existing issue, or an earlier row of the file, within
+   DUPLICATE_DISTANCE_METERS with the same categories, the same rule as
+   create) with set-based UPDATEs,
+5. INSERT ... SELECT the survivors and update the rollups and official
+   assignments for the whole batch.
+
+Rows are never geocoded: a point outside every known AreaLocation is
+imported without an area. A failing row is reported and skipped, it never
+aborts its batch.
+
+CSV columns: title, description, categories (separated by ";" or "|"),
+latitude, longitude, and optionally status, created_at, resolved_at (ISO
+8601), is_anonymous and images (URLs separated by ";" or "|"). GeoJSON
+features carry the same properties with a Point geometry; a FeatureCollection
+or a sequence of features (one per line) is accepted.
+"""
+
+import csv
+import io
+import json
+import re
+from datetime import timezone as dt_timezone
+
+from django.contrib.gis.geos import Point
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import (
+    AreaIssueCount,
+    AreaLocation,
+    Issue,
+    IssueSlaBucket,
+    IssueStatsBucket,
+    IssueStatusHistory,
+    MyApiOfficial,
+)
+
+CSV = "csv"
+GEOJSON = "geojson"
+FORMATS = (CSV, GEOJSON)
+
+DUPLICATE_DISTANCE_METERS = 100
+# Index-friendly bounding box prefilter for the distance checks, comfortably
+# wider than DUPLICATE_DISTANCE_METERS in degrees at any inhabited latitude.
+DUPLICATE_BOX_DEGREES = 0.005
+
+LIST_SEPARATOR = re.compile(r"[;|]")
+TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+FALSE_VALUES = {"", "0", "false", "f", "no", "n"}
+
+_CATEGORY_LABELS = {}
+for _key, _label in Issue.CATEGORY_CHOICES:
+    _CATEGORY_LABELS[_key] = _label
+    _CATEGORY_LABELS[_label.lower()] = _label
+
+
+class BulkImportError(ValueError):
+    """The file as a whole cannot be read (not a per-row problem)."""
+
+
+def detect_format(filename, requested=None):
+    fmt = (requested or "").lower() or None
+    if fmt is None and filename:
+        extension = filename.rsplit(".", 1)[-1].lower()
+        fmt = {"csv": CSV, "geojson": GEOJSON, "json": GEOJSON, "ndjson": GEOJSON}.get(
+            extension
+        )
+    if fmt not in FORMATS:
+        raise BulkImportError(
+            f"Unknown import format, expected one of: {', '.join(FORMATS)}"
+        )
+    return fmt
+
+
+def iter_csv_rows(stream):
+    reader = csv.DictReader(stream)
+    if not reader.fieldnames:
+        raise BulkImportError("The CSV file has no header row")
+    for row in reader:
+        # Physical line of the record, so errors point into the file.
+        yield reader.line_num, {
+            (key or "").strip().lower(): value for key, value in row.items()
+        }
+
+
+def iter_geojson_features(stream, chunk_size=1 << 16):
+    """
+    Yield the features of a FeatureCollection (or of a sequence of Feature
+    objects) one at a time, reading `stream` in chunks, so a large file is
+    never held in memory as one document.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+
+    def read_more():
+        nonlocal buffer
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        return bool(chunk)
+
+    # A FeatureCollection mentions "features" long before its first feature
+    # ends; a bare Feature at the start means a feature sequence.
+    pos = None
+    while pos is None:
+        marker = buffer.find('"features"')
+        if marker >= 0:
+            bracket = buffer.find("[", marker)
+            if bracket >= 0:
+                pos = bracket + 1
+                collection = True
+                break
+        start = len(buffer) - len(buffer.lstrip(" \t\r\n\x1e"))
+        if start < len(buffer):
+            try:
+                document, _ = decoder.raw_decode(buffer, start)
+            except json.JSONDecodeError:
+                document = None
+            if isinstance(document, dict):
+                if document.get("type") == "FeatureCollection":
+                    yield from document.get("features") or []
+                    return
+                pos, collection = start, False
+                break
+        if not read_more():
+            raise BulkImportError("The file is not valid GeoJSON")
+
+    separators = " \t\r\n\x1e" + ("," if collection else "")
+    while True:
+        while pos < len(buffer) and buffer[pos] in separators:
+            pos += 1
+        if pos >= len(buffer):
+            buffer, pos = "", 0
+            if not read_more():
+                if collection:
+                    raise BulkImportError("The GeoJSON features array is not closed")
+                return
+            continue
+        if collection and buffer[pos] == "]":
+            return
+        try:
+            feature, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Most likely a feature split across chunks.
+            buffer, pos = buffer[pos:], 0
+            if not read_more():
+                raise BulkImportError("The file is not valid GeoJSON")
+            continue
+        yield feature
+        pos = end
+
+
+def iter_geojson_rows(stream):
+    for index, feature in enumerate(iter_geojson_features(stream), start=1):
+        if not isinstance(feature, dict):
+            yield index, {"_error": "Feature must be a JSON object"}
+            continue
+        row = {
+            str(key).lower(): value
+            for key, value in (feature.get("properties") or {}).items()
+        }
+        geometry = feature.get("geometry") or {}
+        coordinates = geometry.get("coordinates") or []
+        if geometry.get("type") != "Point" or len(coordinates) < 2:
+            row["_error"] = "Geometry must be a Point"
+        else:
+            row["longitude"], row["latitude"] = coordinates[:2]
+        yield index, row
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in LIST_SEPARATOR.split(str(value)) if item.strip()]
+
+
+def _as_datetime(value, field, errors):
+    if value in (None, ""):
+        return None
+    parsed = parse_datetime(str(value).strip())
+    if parsed is None:
+        errors.append(f"{field}: not an ISO 8601 datetime")
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def validate_row(row, default_status):
+    """Return (values, errors) for one parsed row."""
+    errors = [row["_error"]] if row.get("_error") else []
+
+    title = str(row.get("title") or "").strip()
+    if not title:
+        errors.append("title: required")
+    elif len(title) > Issue._meta.get_field("title").max_length:
+        errors.append("title: too long")
+
+    description = str(row.get("description") or "").strip()
+    if not description:
+        errors.append("description: required")
+    elif len(description) > Issue._meta.get_field("description").max_length:
+        errors.append("description: too long")
+
+    categories = []
+    for category in _as_list(row.get("categories")):
+        label = _CATEGORY_LABELS.get(category) or _CATEGORY_LABELS.get(category.lower())
+        if label is None:
+            errors.append(f"categories: invalid category '{category}'")
+        elif label not in categories:
+            categories.append(label)
+    if not categories and not any(e.startswith("categories") for e in errors):
+        errors.append("categories: at least one category is required")
+
+    location = None
+    if not row.get("_error"):
+        try:
+            latitude = float(row.get("latitude"))
+            longitude = float(row.get("longitude"))
+        except (TypeError, ValueError):
+            errors.append("latitude/longitude: required numbers")
+        else:
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                errors.append("latitude/longitude: out of range")
+            else:
+                location = Point(longitude, latitude, srid=4326)
+
+    issue_status = str(row.get("status") or row.get("issue_status") or default_status)
+    issue_status = issue_status.strip().lower()
+    if issue_status not in dict(Issue.ISSUE_STATUS):
+        errors.append(f"status: invalid status '{issue_status}'")
+
+    is_anonymous = row.get("is_anonymous")
+    is_anonymous = "" if is_anonymous is None else str(is_anonymous).strip().lower()
+    if is_anonymous not in TRUE_VALUES | FALSE_VALUES:
+        errors.append("is_anonymous: expected true or false")
+
+    created_at = _as_datetime(row.get("created_at"), "created_at", errors)
+    resolved_at = _as_datetime(row.get("resolved_at"), "resolved_at", errors)
+
+    if errors:
+        return None, errors
+    created_at = created_at or timezone.now()
+    return {
+        "title": title,
+        "description": description,
+        "categories": categories,
+        "images": _as_list(row.get("images")),
+        "location": location,
+        "issue_status": issue_status,
+        "is_anonymous": is_anonymous in TRUE_VALUES,
+        "created_at": created_at,
+        "resolved_at": resolved_at if issue_status == Issue.SOLVED else None,
+    }, []
+
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, Point):
+        return value.ewkt
+    if isinstance(value, list):
+        value = json.dumps(value)
+    elif hasattr(value, "isoformat"):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+STAGING_COLUMNS = (
+    "row_number",
+    "title",
+    "description",
+    "categories",
+    "images",
+    "location",
+    "issue_status",
+    "is_anonymous",
+    "created_at",
+    "resolved_at",
+)
+
+
+class IssueImporter:
+    """
+    Imports issues owned by `user` in batches. `report` accumulates across
+    batches: row counts plus up to `max_errors` per-row errors.
+    """
+
+    def __init__(
+        self, user, default_status=Issue.APPROVED, batch_size=5000, max_errors=1000
+    ):
+        self.user = user
+        self.default_status = default_status
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.report = {
+            "rows": 0,
+            "imported": 0,
+            "duplicates": 0,
+            "failed": 0,
+            "errors": [],
+            "errors_truncated": False,
+        }
+
+    def add_error(self, row_number, messages):
+        if len(self.report["errors"]) < self.max_errors:
+            self.report["errors"].append({"row": row_number, "errors": messages})
+        else:
+            self.report["errors_truncated"] = True
+
+    def run(self, stream, fmt):
+        rows = iter_csv_rows(stream) if fmt == CSV else iter_geojson_rows(stream)
+        batch = []
+        for row_number, row in rows:
+            self.report["rows"] += 1
+            values, errors = validate_row(row, self.default_status)
+            if errors:
+                self.report["failed"] += 1
+                self.add_error(row_number, errors)
+                continue
+            batch.append((row_number, values))
+            if len(batch) >= self.batch_size:
+                self.load(batch)
+                batch = []
+        if batch:
+            self.load(batch)
+        return self.report
+
+    def load(self, batch):
+        quote = connection.ops.quote_name
+        issue_table = quote(Issue._meta.db_table)
+        area_table = quote(AreaLocation._meta.db_table)
+        buffer = io.StringIO()
+        for row_number, values in batch:
+            buffer.write(
+                "\t".join(
+                    _copy_value(
+                        row_number if column == "row_number" else values[column]
+                    )
+                    for column in STAGING_COLUMNS
+                )
+            )
+            buffer.write("\n")
+        buffer.seek(0)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            # ON COMMIT DROP only fires at the outermost commit.
+            cursor.execute("DROP TABLE IF EXISTS issue_import_staging")
+            cursor.execute(
+                """
+                CREATE TEMP TABLE issue_import_staging (
+                    row_number integer PRIMARY KEY,
+                    title text,
+                    description text,
+                    categories jsonb,
+                    images jsonb,
+                    location geometry(Point, 4326),
+                    issue_status text,
+                    is_anonymous boolean,
+                    created_at timestamptz,
+                    resolved_at timestamptz,
+                    area_id integer,
+                    duplicate_of_issue integer,
+                    duplicate_of_row integer,
+                    issue_id integer
+                ) ON COMMIT DROP
+                """
+            )
+            cursor.copy_expert(
+                f"COPY issue_import_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN",
+                buffer,
+            )
+            cursor.execute("CREATE INDEX ON issue_import_staging USING gist (location)")
+            cursor.execute("ANALYZE issue_import_staging")
+
+            cursor.execute(
+                f"""
+                UPDATE issue_import_staging s SET area_id = (
+                    SELECT a.id FROM {area_table} a
+                    WHERE ST_Covers(a.boundary, s.location)
+                    ORDER BY ST_Area(a.boundary), a.id
+                    LIMIT 1
+                )
+                """
+            )
+            cursor.execute(
+                f"""
+                UPDATE issue_import_staging s SET duplicate_of_issue = (
+                    SELECT i.id FROM {issue_table} i
+                    WHERE i.location && ST_Expand(s.location, %s)
+                      AND ST_DWithin(i.location::geography, s.location::geography, %s)
+                      AND i.categories = s.categories
+                    ORDER BY i.id
+                    LIMIT 1
+                )
+                """,
+                [DUPLICATE_BOX_DEGREES, DUPLICATE_DISTANCE_METERS],
+            )
+            cursor.execute(
+                """
+                UPDATE issue_import_staging s SET duplicate_of_row = (
+                    SELECT MIN(e.row_number) FROM issue_import_staging e
+                    WHERE e.row_number < s.row_number
+                      AND e.location && ST_Expand(s.location, %s)
+                      AND ST_DWithin(e.location::geography, s.location::geography, %s)
+                      AND e.categories = s.categories
+                )
+                WHERE s.duplicate_of_issue IS NULL
+                """,
+                [DUPLICATE_BOX_DEGREES, DUPLICATE_DISTANCE_METERS],
+            )
+            cursor.execute(
+                """
+                SELECT row_number, duplicate_of_issue, duplicate_of_row
+                FROM issue_import_staging
+                WHERE duplicate_of_issue IS NOT NULL OR duplicate_of_row IS NOT NULL
+                ORDER BY row_number
+                """
+            )
+            for row_number, issue_id, duplicate_row in cursor.fetchall():
+                self.report["duplicates"] += 1
+                self.add_error(
+                    row_number,
+                    [
+                        (
+                            f"duplicate of issue {issue_id}"
+                            if issue_id
+                            else f"duplicate of row {duplicate_row}"
+                        )
+                    ],
+                )
+
+            cursor.execute(
+                """
+                UPDATE issue_import_staging
+                SET issue_id = nextval(pg_get_serial_sequence(%s, 'id'))
+                WHERE duplicate_of_issue IS NULL AND duplicate_of_row IS NULL
+                """,
+                [Issue._meta.db_table],
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {issue_table} (
+                    id, title, user_id, location, description, categories, images,
+                    issue_status, is_anonymous, likes_count, comments_count,
+                    created_at, updated_at, resolved_at, area_id
+                )
+                SELECT issue_id, title, %s, location, description, categories, images,
+                       issue_status, is_anonymous, 0, 0,
+                       created_at, COALESCE(resolved_at, created_at), resolved_at, area_id
+                FROM issue_import_staging
+                WHERE issue_id IS NOT NULL
+                ORDER BY row_number
+                RETURNING id
+                """,
+                [self.user.pk],
+            )
+            issue_ids = [row[0] for row in cursor.fetchall()]
+            cursor.execute(
+                "SELECT DISTINCT area_id FROM issue_import_staging "
+                "WHERE issue_id IS NOT NULL AND area_id IS NOT NULL"
+            )
+            area_ids = [row[0] for row in cursor.fetchall()]
+
+            if issue_ids:
+                imported = Issue.objects.filter(id__in=issue_ids)
+                IssueStatsBucket.objects.record_created(imported)
+                IssueStatusHistory.objects.record_created(imported)
+                MyApiOfficial.objects.all().assign_covering(
+                    imported.exclude(issue_status=Issue.NOT_APPROVED)
+                )
+                # After the assignment, for the per-official histograms.
+                IssueSlaBucket.objects.record_created(imported)
+                Issue.objects.schedule_deadlines(imported)
+                if area_ids:
+                    AreaIssueCount.objects.rebuild(area_ids=area_ids)
+        self.report["imported"] += len(issue_ids)
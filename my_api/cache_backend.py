@@ -0,0 +1,21 @@
+from django.core.cache.backends.redis import RedisCache
+
+from .metrics import record_cache_lookup
+
+_MISSING = object()
+
+
+class InstrumentedRedisCache(RedisCache):
+    """RedisCache that counts hits and misses per key prefix (text before the first ':')."""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        record_cache_lookup(key, value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version)
+        for key in keys:
+            record_cache_lookup(key, key in found)
+        return found
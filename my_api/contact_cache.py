@@ -0,0 +1,126 @@
+"""
+Stale-while-revalidate cache for the Gemini emergency contacts shown on
+issue detail.
+
+Entries are stored as {"value", "fresh_until", "is_error"} and kept for
+EMERGENCY_CONTACT_STALE_SECONDS. Once `fresh_until` has passed the cached
+value is still returned immediately while a background worker refreshes it,
+so request latency never includes the LLM call. Failed lookups are only
+cached for EMERGENCY_CONTACT_ERROR_SECONDS, and never replace a good value.
+"""
+
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+
+from asgiref.sync import sync_to_async
+
+from . import async_cache
+from .utils import get_emergency_contact_info
+
+FRESH_SECONDS = getattr(settings, "EMERGENCY_CONTACT_FRESH_SECONDS", 86400)
+STALE_SECONDS = getattr(settings, "EMERGENCY_CONTACT_STALE_SECONDS", 30 * 86400)
+ERROR_SECONDS = getattr(settings, "EMERGENCY_CONTACT_ERROR_SECONDS", 120)
+REFRESH_LOCK_SECONDS = 60
+
+PENDING_CONTACT = {
+    "status": "pending",
+    "message": "Emergency contact is being fetched, please retry shortly.",
+}
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "EMERGENCY_CONTACT_REFRESH_WORKERS", 2),
+    thread_name_prefix="emergency-contact",
+)
+
+
+def contact_cache_key(category, city, area):
+    raw_key = f"{category}|{city}|{area}".lower()
+    return "emergency_contact:" + hashlib.md5(raw_key.encode()).hexdigest()
+
+
+def get_cached_emergency_contact(category, city, area):
+    """
+    Return the cached contact for (category, city, area) without ever calling
+    Gemini inline. Stale or missing entries are refreshed in the background;
+    a miss returns PENDING_CONTACT.
+    """
+    entry = cache.get(contact_cache_key(category, city, area))
+
+    if entry is None:
+        schedule_refresh(category, city, area)
+        return PENDING_CONTACT
+
+    if entry["fresh_until"] <= time.time():
+        schedule_refresh(category, city, area)
+
+    return entry["value"]
+
+
+async def aget_cached_emergency_contact(category, city, area):
+    """get_cached_emergency_contact for async views; only a refresh hops to a thread."""
+    entry = await async_cache.aget(contact_cache_key(category, city, area))
+
+    if entry is None or entry["fresh_until"] <= time.time():
+        await sync_to_async(schedule_refresh, thread_sensitive=False)(
+            category, city, area
+        )
+
+    return PENDING_CONTACT if entry is None else entry["value"]
+
+
+def schedule_refresh(category, city, area):
+    """
+    Queue a background refresh unless one is already running for this key in
+    any process (the lock lives in the shared cache).
+    """
+    lock_key = contact_cache_key(category, city, area) + ":refreshing"
+    if not cache.add(lock_key, 1, timeout=REFRESH_LOCK_SECONDS):
+        return False
+
+    _executor.submit(_refresh_and_unlock, category, city, area, lock_key)
+    return True
+
+
+def _refresh_and_unlock(category, city, area, lock_key):
+    try:
+        refresh_emergency_contact(category, city, area)
+    finally:
+        cache.delete(lock_key)
+
+
+def refresh_emergency_contact(category, city, area):
+    """Fetch the contact from Gemini and store it. Returns the stored value."""
+    value = get_emergency_contact_info(category, city, area)
+    key = contact_cache_key(category, city, area)
+    now = time.time()
+
+    if "error" not in value:
+        cache.set(
+            key,
+            {"value": value, "fresh_until": now + FRESH_SECONDS, "is_error": False},
+            timeout=STALE_SECONDS,
+        )
+        return value
+
+    previous = cache.get(key)
+    if previous and not previous["is_error"]:
+        # Keep serving the last good contact; retry after the error window.
+        previous["fresh_until"] = now + ERROR_SECONDS
+        cache.set(key, previous, timeout=STALE_SECONDS)
+        return previous["value"]
+
+    cache.set(
+        key,
+        {"value": value, "fresh_until": now + ERROR_SECONDS, "is_error": True},
+        timeout=ERROR_SECONDS,
+    )
+    return value
+
+
+def is_contact_fresh(category, city, area):
+    entry = cache.get(contact_cache_key(category, city, area))
+    return bool(entry) and not entry["is_error"] and entry["fresh_until"] > time.time()
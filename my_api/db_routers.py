@@ -0,0 +1,191 @@
+"""
+Read-replica routing with read-your-writes stickiness.
+
+Writes, and every read by default, go to the "default" (primary) database.
+Views opt endpoints into replica reads (ReplicaReadMixin for viewsets,
+`replica_reads` on the async views); for those, `choose_read_alias()` picks a
+healthy replica from REPLICA_DATABASES unless:
+
+  - the user wrote something in the last REPLICA_STICKY_SECONDS
+    (ReadYourWritesMiddleware pins them to the primary through the cache),
+    so they always see their own changes, or
+  - no replica is healthy: each process checks replication lag every
+    REPLICA_LAG_CHECK_SECONDS and drops replicas lagging more than
+    REPLICA_MAX_LAG_SECONDS, or that cannot be reached.
+
+Reads inside a transaction stay on the primary. With no replicas configured
+(development, tests) everything goes to the primary.
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from asgiref.sync import sync_to_async
+
+from . import async_cache
+
+# pg_is_in_recovery() is false when a "replica" points at a primary (local
+# setups); pg_last_xact_replay_timestamp() is NULL until the first replay.
+REPLICATION_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+_read_alias = ContextVar("read_alias", default=None)
+
+# alias -> (monotonic time of the check, lag in seconds or None if unreachable)
+_replica_health = {}
+_health_lock = threading.Lock()
+
+
+def replica_aliases():
+    return getattr(settings, "REPLICA_DATABASES", ())
+
+
+@contextmanager
+def read_from(alias):
+    """Route the ORM reads in this block to `alias` (None for the primary)."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def use_read_alias(alias):
+    """Like read_from(), until the enclosing read_from() block ends."""
+    _read_alias.set(alias)
+
+
+def _pin_key(user_id):
+    return f"primary_pin:{user_id}"
+
+
+def pin_to_primary(user):
+    """Send `user`'s reads to the primary for the next REPLICA_STICKY_SECONDS."""
+    if replica_aliases() and user.is_authenticated:
+        cache.set(_pin_key(user.pk), 1, getattr(settings, "REPLICA_STICKY_SECONDS", 5))
+
+
+async def apin_to_primary(user):
+    if replica_aliases() and user.is_authenticated:
+        await async_cache.aset(
+            _pin_key(user.pk), 1, getattr(settings, "REPLICA_STICKY_SECONDS", 5)
+        )
+
+
+def replication_lag(alias):
+    """Seconds `alias` is behind the primary, or None if it cannot be reached."""
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(REPLICATION_LAG_SQL)
+            lag = cursor.fetchone()[0]
+    except DatabaseError:
+        return None
+    return None if lag is None else float(lag)
+
+
+def _health_is_stale():
+    interval = getattr(settings, "REPLICA_LAG_CHECK_SECONDS", 2)
+    now = time.monotonic()
+    return any(
+        now - _replica_health.get(alias, (float("-inf"), None))[0] >= interval
+        for alias in replica_aliases()
+    )
+
+
+def refresh_replica_health(force=False):
+    """Re-check the replicas whose last check is older than the interval."""
+    # One thread checks while the others keep routing on the last results.
+    if not _health_lock.acquire(blocking=force):
+        return
+    try:
+        interval = getattr(settings, "REPLICA_LAG_CHECK_SECONDS", 2)
+        for alias in replica_aliases():
+            checked_at, _ = _replica_health.get(alias, (float("-inf"), None))
+            if force or time.monotonic() - checked_at >= interval:
+                _replica_health[alias] = (time.monotonic(), replication_lag(alias))
+    finally:
+        _health_lock.release()
+
+
+def healthy_replicas():
+    max_lag = getattr(settings, "REPLICA_MAX_LAG_SECONDS", 2)
+    return [
+        alias
+        for alias in replica_aliases()
+        if (lag := _replica_health.get(alias, (None, None))[1]) is not None
+        and lag <= max_lag
+    ]
+
+
+def replica_status():
+    """Last health check of every replica, for the health endpoint."""
+    max_lag = getattr(settings, "REPLICA_MAX_LAG_SECONDS", 2)
+    now = time.monotonic()
+    status = []
+    for alias in replica_aliases():
+        checked_at, lag = _replica_health.get(alias, (None, None))
+        status.append(
+            {
+                "alias": alias,
+                "host": settings.DATABASES[alias].get("HOST"),
+                "lag_seconds": lag,
+                "healthy": lag is not None and lag <= max_lag,
+                "checked_seconds_ago": None if checked_at is None else now - checked_at,
+            }
+        )
+    return status
+
+
+def choose_read_alias(user):
+    """A healthy replica for `user`'s reads, or None for the primary."""
+    if not replica_aliases():
+        return None
+    if user.is_authenticated and cache.get(_pin_key(user.pk)):
+        return None
+    if _health_is_stale():
+        refresh_replica_health()
+    replicas = healthy_replicas()
+    return random.choice(replicas) if replicas else None
+
+
+async def achoose_read_alias(user):
+    if not replica_aliases():
+        return None
+    if user.is_authenticated and await async_cache.aget(_pin_key(user.pk)):
+        return None
+    if _health_is_stale():
+        await sync_to_async(refresh_replica_health)()
+    replicas = healthy_replicas()
+    return random.choice(replicas) if replicas else None
+
+
+class ReplicaRouter:
+    """DATABASE_ROUTERS entry: reads follow read_from(), writes the primary."""
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in replica_aliases()
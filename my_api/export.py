@@ -0,0 +1,221 @@
+"""
+Streaming issue export as CSV, GeoJSON or NDJSON.
+
+Rows are read with `QuerySet.iterator()`, which on PostgreSQL is a
+server-side cursor fetching EXPORT_CHUNK_SIZE rows at a time, and rendered
+into ~EXPORT_BUFFER_BYTES text chunks, so memory stays constant whatever the
+export size. Only the exported columns are selected (no model instances, no
+serializer).
+
+Under ASGI, a plain generator handed to StreamingHttpResponse is consumed
+into a list before the first byte is sent; `aiter_chunks` wraps it so each
+chunk is pulled (and each cursor batch fetched) on the sync thread as the
+client reads.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, time
+from datetime import timezone as dt_timezone
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from asgiref.sync import sync_to_async
+
+from .models import Issue
+
+CSV = "csv"
+GEOJSON = "geojson"
+NDJSON = "ndjson"
+CONTENT_TYPES = {
+    CSV: "text/csv; charset=utf-8",
+    GEOJSON: "application/geo+json",
+    NDJSON: "application/x-ndjson",
+}
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_BUFFER_BYTES = 64 * 1024
+
+FIELDS = (
+    "id",
+    "title",
+    "description",
+    "categories",
+    "issue_status",
+    "is_anonymous",
+    "likes_count",
+    "comments_count",
+    "created_at",
+    "updated_at",
+    "resolved_at",
+    "area__name",
+    "area__city_name",
+    "location",
+)
+CSV_HEADER = [
+    "id",
+    "title",
+    "description",
+    "categories",
+    "status",
+    "is_anonymous",
+    "likes_count",
+    "comments_count",
+    "created_at",
+    "updated_at",
+    "resolved_at",
+    "area",
+    "city",
+    "latitude",
+    "longitude",
+]
+
+
+def parse_export_datetime(value, end_of_day=False):
+    """
+    Parse an ISO date or datetime filter. A bare date means the start of
+    that day, or its end for `end_of_day` (inclusive upper bounds).
+    Raises ValueError when `value` is neither.
+    """
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"'{value}' is not an ISO date or datetime")
+        parsed = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def export_queryset(
+    area_range=None,
+    area_id=None,
+    statuses=None,
+    category=None,
+    created_after=None,
+    created_before=None,
+):
+    issues = Issue.objects.all()
+    if area_range is not None:
+        issues = issues.filter(location__within=area_range)
+    if area_id is not None:
+        issues = issues.filter(area_id=area_id)
+    if statuses:
+        issues = issues.filter(issue_status__in=statuses)
+    if category:
+        issues = issues.filter(categories__contains=[category])
+    if created_after:
+        issues = issues.filter(created_at__gte=created_after)
+    if created_before:
+        issues = issues.filter(created_at__lte=created_before)
+    # Key order, so the server-side cursor walks the primary key index.
+    return issues.order_by("id").values_list(*FIELDS)
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _feature(row):
+    values = dict(zip(FIELDS, row))
+    location = values.pop("location")
+    properties = {
+        "id": values["id"],
+        "title": values["title"],
+        "description": values["description"],
+        "categories": values["categories"],
+        "status": values["issue_status"],
+        "is_anonymous": values["is_anonymous"],
+        "likes_count": values["likes_count"],
+        "comments_count": values["comments_count"],
+        "created_at": _isoformat(values["created_at"]),
+        "updated_at": _isoformat(values["updated_at"]),
+        "resolved_at": _isoformat(values["resolved_at"]),
+        "area": values["area__name"],
+        "city": values["area__city_name"],
+    }
+    geometry = (
+        {"type": "Point", "coordinates": [location.x, location.y]} if location else None
+    )
+    return {"type": "Feature", "geometry": geometry, "properties": properties}
+
+
+def _csv_lines(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    yield buffer.getvalue()
+    for row in rows:
+        values = dict(zip(FIELDS, row))
+        location = values["location"]
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(
+            [
+                values["id"],
+                values["title"],
+                values["description"],
+                ";".join(values["categories"] or []),
+                values["issue_status"],
+                values["is_anonymous"],
+                values["likes_count"],
+                values["comments_count"],
+                _isoformat(values["created_at"]),
+                _isoformat(values["updated_at"]),
+                _isoformat(values["resolved_at"]),
+                values["area__name"],
+                values["area__city_name"],
+                location.y if location else None,
+                location.x if location else None,
+            ]
+        )
+        yield buffer.getvalue()
+
+
+def _geojson_parts(rows):
+    yield '{"type": "FeatureCollection", "features": ['
+    separator = ""
+    for row in rows:
+        yield separator + json.dumps(_feature(row))
+        separator = ",\n"
+    yield "]}\n"
+
+
+def _ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(_feature(row)) + "\n"
+
+
+def render_export(issues, fmt):
+    """
+    Generate the export of `issues` (an export_queryset) in `fmt` as str
+    chunks of roughly EXPORT_BUFFER_BYTES.
+    """
+    rows = issues.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    parts = {CSV: _csv_lines, GEOJSON: _geojson_parts, NDJSON: _ndjson_lines}[fmt](rows)
+    pending = []
+    size = 0
+    for part in parts:
+        pending.append(part)
+        size += len(part)
+        if size >= EXPORT_BUFFER_BYTES:
+            yield "".join(pending)
+            pending = []
+            size = 0
+    if pending:
+        yield "".join(pending)
+
+
+async def aiter_chunks(chunks):
+    """Serve a sync chunk generator to ASGI without buffering it whole."""
+    # thread_sensitive keeps the cursor on the request's database connection.
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    done = object()
+    while True:
+        chunk = await next_chunk(chunks, done)
+        if chunk is done:
+            return
+        yield chunk
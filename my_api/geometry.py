@@ -0,0 +1,114 @@
+from django.contrib.gis.db.models.functions import GeomOutputGeoFunc
+
+# Zoom tier -> ST_SimplifyPreserveTopology tolerance in degrees, roughly one
+# 256px-tile pixel (360 / (256 * 2 ** zoom)) at that zoom level.
+BOUNDARY_ZOOM_TOLERANCES = {
+    8: 0.0055,
+    11: 0.0007,
+    14: 0.00009,
+}
+
+
+def boundary_field_for_zoom(zoom):
+    """
+    Name of the AreaLocation boundary column to serve at `zoom`: the coarsest
+    tier that still has enough detail, or the full boundary past the last one.
+    """
+    if zoom is None:
+        return "boundary"
+    for tier in sorted(BOUNDARY_ZOOM_TOLERANCES):
+        if zoom <= tier:
+            return f"boundary_z{tier}"
+    return "boundary"
+
+
+class SimplifyPreserveTopology(GeomOutputGeoFunc):
+    function = "ST_SimplifyPreserveTopology"
+
+
+class Multi(GeomOutputGeoFunc):
+    function = "ST_Multi"
+
+
+# Compact geometry encoding ------------------------------------------------
+#
+# Opt-in alternative to GeoJSON for mobile clients: coordinates are quantized
+# to POLYLINE_PRECISION decimals (~1.1 m at 5) and delta + zig-zag varint
+# encoded with Google's encoded polyline algorithm (lat, lon order).
+# Negotiated per request with `?geometry=polyline` or an
+# `Accept: application/json; geometry=polyline` header.
+
+POLYLINE = "polyline"
+POLYLINE_PRECISION = 5
+
+
+def wants_compact_geometry(request):
+    if request is None:
+        return False
+    if request.query_params.get("geometry") == POLYLINE:
+        return True
+    accept = request.META.get("HTTP_ACCEPT", "")
+    return f"geometry={POLYLINE}" in accept.replace(" ", "")
+
+
+def _encode_value(value):
+    value = ~(value << 1) if value < 0 else value << 1
+    chunks = []
+    while value >= 0x20:
+        chunks.append(chr((0x20 | (value & 0x1F)) + 63))
+        value >>= 5
+    chunks.append(chr(value + 63))
+    return "".join(chunks)
+
+
+def encode_polyline(coords, precision=POLYLINE_PRECISION):
+    """Encode an iterable of (lon, lat) pairs as a single polyline string."""
+    factor = 10**precision
+    encoded = []
+    prev_lat = prev_lon = 0
+    for lon, lat, *_ in coords:
+        lat, lon = round(lat * factor), round(lon * factor)
+        encoded.append(_encode_value(lat - prev_lat))
+        encoded.append(_encode_value(lon - prev_lon))
+        prev_lat, prev_lon = lat, lon
+    return "".join(encoded)
+
+
+def decode_polyline(encoded, precision=POLYLINE_PRECISION):
+    """Inverse of encode_polyline, returns a list of (lon, lat) pairs."""
+    factor = 10**precision
+    values = []
+    value = shift = 0
+    for char in encoded:
+        byte = ord(char) - 63
+        value |= (byte & 0x1F) << shift
+        shift += 5
+        if byte < 0x20:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+
+    coords = []
+    lat = lon = 0
+    for index in range(0, len(values), 2):
+        lat += values[index]
+        lon += values[index + 1]
+        coords.append((lon / factor, lat / factor))
+    return coords
+
+
+def encode_geometry(geometry):
+    """
+    Point -> one polyline string, Polygon -> list of ring strings,
+    MultiPolygon -> list of polygons (lists of ring strings).
+    """
+    if geometry is None:
+        return None
+    if geometry.geom_type == "Point":
+        return encode_polyline([geometry.coords])
+    if geometry.geom_type == "Polygon":
+        return [encode_polyline(ring) for ring in geometry.coords]
+    if geometry.geom_type == "MultiPolygon":
+        return [
+            [encode_polyline(ring) for ring in polygon] for polygon in geometry.coords
+        ]
+    raise ValueError(f"Unsupported geometry type: {geometry.geom_type}")
@@ -0,0 +1,267 @@
+"""
+Shared outbound HTTP layer for Nominatim, Overpass and Gemini.
+
+Every upstream gets one pooled keep-alive `requests.Session`, a default
+(connect, read) timeout, retries with exponential backoff and full jitter,
+and a circuit breaker. While a breaker is open calls fail immediately with
+`CircuitOpenError` (a `requests.RequestException`), so the existing
+`except requests.RequestException` paths in utils return their degraded
+result without waiting on a dead upstream.
+
+Nominatim and Overpass also take a token from the cluster-wide rate limiter
+(see rate_limit.py) before every attempt, at the caller's priority.
+
+Per-service defaults can be overridden with settings.OUTBOUND_SERVICES, e.g.
+OUTBOUND_SERVICES = {"overpass": {"read_timeout": 60, "retries": 1}}
+"""
+
+import random
+import threading
+import time
+
+from django.conf import settings
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .rate_limit import DistributedRateLimiter, RateLimitTimeout
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, float("inf"))
+
+DEFAULT_SERVICES = {
+    "nominatim": {
+        "connect_timeout": 3.05,
+        "read_timeout": 10,
+        "retries": 2,
+        "backoff": 0.5,
+        "pool_size": 10,
+        "failure_threshold": 5,
+        "reset_timeout": 30,
+        # Nominatim usage policy: at most one request per second.
+        "rate_limit": {"rate": 1.0, "capacity": 1},
+    },
+    "overpass": {
+        "connect_timeout": 3.05,
+        "read_timeout": 30,
+        "retries": 2,
+        "backoff": 1.0,
+        "pool_size": 10,
+        "failure_threshold": 5,
+        "reset_timeout": 60,
+        "rate_limit": {"rate": 1.0, "capacity": 2},
+    },
+    "gemini": {
+        "connect_timeout": 3.05,
+        "read_timeout": 15,
+        "retries": 1,
+        "backoff": 0.5,
+        "pool_size": 10,
+        "failure_threshold": 5,
+        "reset_timeout": 30,
+    },
+}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                # Let a single trial request through.
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def release_trial(self):
+        """Give back a half-open trial that never reached the upstream."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.opened_at = 0.0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class ServiceMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.short_circuited = 0
+        self.rate_limited = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, error):
+        with self._lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.latency_sum += seconds
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    self.latency_buckets[index] += 1
+                    break
+
+    def increment(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "retries": self.retries,
+                "short_circuited": self.short_circuited,
+                "rate_limited": self.rate_limited,
+                "latency_sum": round(self.latency_sum, 6),
+                "latency_avg": (
+                    round(self.latency_sum / self.requests, 6) if self.requests else 0
+                ),
+                "latency_buckets": {
+                    str(bound): count
+                    for bound, count in zip(LATENCY_BUCKETS, self.latency_buckets)
+                },
+            }
+
+
+class OutboundService:
+    def __init__(
+        self,
+        name,
+        connect_timeout,
+        read_timeout,
+        retries,
+        backoff,
+        pool_size,
+        failure_threshold,
+        reset_timeout,
+        rate_limit=None,
+    ):
+        self.name = name
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.metrics = ServiceMetrics()
+        self.limiter = (
+            DistributedRateLimiter(name, **rate_limit) if rate_limit else None
+        )
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request with the service timeout, retrying connection errors,
+        timeouts and RETRY_STATUSES. The last response is returned as-is, so
+        callers keep using `raise_for_status()`.
+        """
+        if not self.breaker.allow_request():
+            self.metrics.increment("short_circuited")
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        kwargs.setdefault("timeout", self.timeout)
+
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            if self.limiter:
+                try:
+                    self.limiter.acquire()
+                except RateLimitTimeout:
+                    self.metrics.increment("rate_limited")
+                    self.breaker.release_trial()
+                    raise
+            start = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self.metrics.observe(time.monotonic() - start, error=True)
+                if last_attempt:
+                    self.breaker.record_failure()
+                    raise
+            except Exception:
+                # Not retried, but it must still settle a half-open trial or
+                # the breaker would never let another request through.
+                self.metrics.observe(time.monotonic() - start, error=True)
+                self.breaker.record_failure()
+                raise
+            else:
+                failed = response.status_code in RETRY_STATUSES
+                self.metrics.observe(time.monotonic() - start, error=failed)
+                if not failed:
+                    self.breaker.record_success()
+                    return response
+                if last_attempt:
+                    self.breaker.record_failure()
+                    return response
+
+            self.metrics.increment("retries")
+            time.sleep(random.uniform(0, self.backoff * 2**attempt))
+
+    def stats(self):
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "timeout": self.timeout,
+            **self.metrics.as_dict(),
+        }
+
+
+def _build_services():
+    overrides = getattr(settings, "OUTBOUND_SERVICES", {})
+    return {
+        name: OutboundService(name, **{**config, **overrides.get(name, {})})
+        for name, config in DEFAULT_SERVICES.items()
+    }
+
+
+SERVICES = _build_services()
+
+nominatim = SERVICES["nominatim"]
+overpass = SERVICES["overpass"]
+gemini = SERVICES["gemini"]
+
+
+def service_metrics():
+    return {name: service.stats() for name, service in SERVICES.items()}
@@ -0,0 +1,61 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from my_api.models import Issue
+from my_api.utils import send_push_notification
+
+
+class Command(BaseCommand):
+    help = (
+        "Notify the assigned officials of issues past their due_at, in batches "
+        "claimed with SKIP LOCKED so several workers can run side by side"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=getattr(settings, "ISSUE_ESCALATION_BATCH_SIZE", 200),
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=30.0,
+            help="Seconds to sleep when nothing is overdue (default: 30.0)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Escalate the currently overdue issues and exit",
+        )
+        parser.add_argument(
+            "--schedule-missing",
+            action="store_true",
+            help="First give a due_at to active issues that have none",
+        )
+
+    def handle(self, *args, **options):
+        if options["schedule_missing"]:
+            scheduled = Issue.objects.schedule_deadlines()
+            self.stdout.write(f"Scheduled deadlines for {scheduled} issues")
+
+        escalated = 0
+        try:
+            while True:
+                issues, pushes = Issue.objects.escalate_overdue(options["batch_size"])
+                if not issues:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                escalated += len(issues)
+                # After the commit, so a failed push never re-escalates.
+                for notification, tokens in pushes:
+                    send_push_notification(notification, tokens)
+        finally:
+            self.stdout.write(
+                self.style.SUCCESS(f"Escalated {escalated} overdue issues")
+            )
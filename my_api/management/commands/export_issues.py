@@ -0,0 +1,72 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from my_api.export import (
+    CONTENT_TYPES,
+    export_queryset,
+    parse_export_datetime,
+    render_export,
+)
+from my_api.models import Issue, MyApiOfficial
+
+
+class Command(BaseCommand):
+    help = "Stream issues to a CSV, GeoJSON or NDJSON file with constant memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=list(CONTENT_TYPES), default="csv")
+        parser.add_argument("--output", default="-", help="File path, '-' for stdout")
+        parser.add_argument(
+            "--official", help="Email of an official, export their area_range"
+        )
+        parser.add_argument("--area", type=int, help="AreaLocation id")
+        parser.add_argument(
+            "--status",
+            action="append",
+            dest="statuses",
+            choices=[value for value, _ in Issue.ISSUE_STATUS],
+            help="Can be repeated",
+        )
+        parser.add_argument("--category")
+        parser.add_argument("--created-after", help="ISO date or datetime")
+        parser.add_argument("--created-before", help="ISO date or datetime, inclusive")
+
+    def handle(self, *args, **options):
+        criteria = {
+            "area_id": options["area"],
+            "statuses": options["statuses"],
+            "category": options["category"],
+        }
+        try:
+            if options["created_after"]:
+                criteria["created_after"] = parse_export_datetime(
+                    options["created_after"]
+                )
+            if options["created_before"]:
+                criteria["created_before"] = parse_export_datetime(
+                    options["created_before"], end_of_day=True
+                )
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+
+        if options["official"]:
+            official = MyApiOfficial.objects.filter(
+                user__email=options["official"]
+            ).first()
+            if official is None or not official.area_range:
+                raise CommandError(
+                    f"No official with an area_range for {options['official']}"
+                )
+            criteria["area_range"] = official.area_range
+
+        chunks = render_export(export_queryset(**criteria), options["format"])
+        if options["output"] == "-":
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+            return
+
+        with open(options["output"], "w", encoding="utf-8", newline="") as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Exported issues to {options['output']}"))
@@ -0,0 +1,77 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from my_api.bulk_import import BulkImportError, IssueImporter, detect_format
+from my_api.models import Issue, MyApiUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import issues from a CSV or GeoJSON file through COPY, skipping "
+        "invalid and duplicate rows (see my_api/bulk_import.py for the columns)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or GeoJSON file, '-' for stdin")
+        parser.add_argument(
+            "--user",
+            required=True,
+            help="Email of the account that will own the issues",
+        )
+        parser.add_argument("--format", choices=["csv", "geojson"])
+        parser.add_argument(
+            "--status",
+            default=Issue.APPROVED,
+            choices=[value for value, _ in Issue.ISSUE_STATUS],
+            help="Status for rows without one (default: approved)",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--report", help="Write the full JSON report, every row error included"
+        )
+
+    def handle(self, *args, **options):
+        user = MyApiUser.objects.filter(email=options["user"]).first()
+        if user is None:
+            raise CommandError(f"No user with email {options['user']}")
+
+        path = options["path"]
+        try:
+            fmt = detect_format(None if path == "-" else path, options["format"])
+        except BulkImportError as e:
+            raise CommandError(f"{e}, pass --format") from e
+
+        importer = IssueImporter(
+            user,
+            default_status=options["status"],
+            batch_size=options["batch_size"],
+            max_errors=float("inf") if options["report"] else 1000,
+        )
+        try:
+            if path == "-":
+                report = importer.run(sys.stdin, fmt)
+            else:
+                with open(path, encoding="utf-8-sig", newline="") as stream:
+                    report = importer.run(stream, fmt)
+        except (BulkImportError, UnicodeDecodeError) as e:
+            raise CommandError(
+                f"{e} (after {importer.report['imported']} imported rows)"
+            ) from e
+
+        if options["report"]:
+            with open(options["report"], "w") as handle:
+                json.dump(report, handle, indent=2)
+        else:
+            for error in report["errors"][:20]:
+                self.stdout.write(f"  row {error['row']}: {'; '.join(error['errors'])}")
+            if len(report["errors"]) > 20:
+                self.stdout.write("  ... pass --report to see every error")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['imported']} of {report['rows']} rows "
+                f"({report['duplicates']} duplicates, {report['failed']} invalid)"
+            )
+        )
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import re
+import xml.etree.ElementTree as ET
+
+from django.contrib.gis.geos import GEOSGeometry, Point, Polygon
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from my_api.models import EmergencyService
+from my_api.rate_limit import BATCH, rate_limit_priority
+from my_api.utils import fetch_emergency_services_from_overpass, parse_osm_element
+
+OSM_ID_PATTERN = re.compile(r"^(node|way|relation|n|w|r)/?(\d+)$")
+OSM_TYPES = {"n": "node", "w": "way", "r": "relation"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Populate the local EmergencyService POI index from an OSM XML extract, "
+        "a GeoJSON / Overpass JSON file, or a live Overpass query for a bbox"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--osm", help="Path to an OSM XML extract (.osm)")
+        parser.add_argument(
+            "--geojson", help="Path to a GeoJSON FeatureCollection of OSM features"
+        )
+        parser.add_argument(
+            "--overpass-json", help="Path to a saved Overpass JSON response"
+        )
+        parser.add_argument(
+            "--bbox",
+            help="Refresh from Overpass for south,west,north,east (e.g. Karachi)",
+        )
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help=(
+                "After a successful load, delete the services it did not "
+                "return (only inside --bbox when refreshing one)"
+            ),
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        sources = [options["osm"], options["geojson"], options["overpass_json"]]
+        if not any(sources) and not options["bbox"]:
+            raise CommandError(
+                "Provide one of --osm, --geojson, --overpass-json or --bbox"
+            )
+
+        started = timezone.now()
+        bbox = None
+        if options["osm"]:
+            records = self.read_osm_xml(options["osm"])
+        elif options["geojson"]:
+            records = self.read_geojson(options["geojson"])
+        elif options["overpass_json"]:
+            with open(options["overpass_json"]) as fh:
+                elements = json.load(fh).get("elements", [])
+            records = (parse_osm_element(element) for element in elements)
+        else:
+            try:
+                south, west, north, east = [
+                    float(c) for c in options["bbox"].split(",")
+                ]
+            except ValueError:
+                raise CommandError("Invalid --bbox, use south,west,north,east")
+            bbox = Polygon.from_bbox((west, south, east, north))
+            bbox.srid = 4326
+            with rate_limit_priority(BATCH):
+                records = fetch_emergency_services_from_overpass(
+                    south, west, north, east
+                )
+
+        total = 0
+        batch = []
+        for record in records:
+            if not record:
+                continue
+            batch.append(self.to_instance(record))
+            if len(batch) >= options["batch_size"]:
+                total += self.upsert(batch)
+                batch = []
+        if batch:
+            total += self.upsert(batch)
+
+        if options["replace"]:
+            # Only once the load has succeeded, so a failed refresh leaves
+            # the previous index serving rather than an empty one.
+            stale = EmergencyService.objects.filter(updated_at__lt=started)
+            if bbox is not None:
+                stale = stale.filter(location__within=bbox)
+            deleted, _ = stale.delete()
+            self.stdout.write(f"Removed {deleted} services missing from this load")
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} emergency services"))
+
+    def to_instance(self, record):
+        return EmergencyService(
+            osm_type=record["osm_type"],
+            osm_id=record["osm_id"],
+            tag_key=record["tag_key"],
+            tag_value=record["tag_value"],
+            name=record["name"],
+            address=record["address"],
+            phone=record["phone"],
+            location=Point(record["lon"], record["lat"], srid=4326),
+        )
+
+    def upsert(self, batch):
+        # One upsert cannot touch a row twice, so repeated features keep the last.
+        batch = list({(s.osm_type, s.osm_id): s for s in batch}.values())
+        EmergencyService.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=["osm_type", "osm_id"],
+            update_fields=[
+                "tag_key",
+                "tag_value",
+                "name",
+                "address",
+                "phone",
+                "location",
+                "updated_at",
+            ],
+        )
+        return len(batch)
+
+    def read_osm_xml(self, path):
+        """
+        Stream nodes out of an OSM XML extract. Ways/relations are skipped since
+        resolving their geometry needs every referenced node in memory; use
+        --geojson (e.g. `osmium export`) or --bbox for those.
+        """
+        root = None
+        for event, elem in ET.iterparse(path, events=("start", "end")):
+            if root is None:
+                root = elem
+            if event == "start":
+                continue
+            if elem.tag == "node":
+                tags = {tag.get("k"): tag.get("v") for tag in elem.iter("tag")}
+                if tags:
+                    yield parse_osm_element(
+                        {
+                            "type": "node",
+                            "id": int(elem.get("id")),
+                            "lat": elem.get("lat"),
+                            "lon": elem.get("lon"),
+                            "tags": tags,
+                        }
+                    )
+            if elem.tag in ("node", "way", "relation"):
+                # Cleared elements stay attached to the root until it is
+                # cleared too.
+                elem.clear()
+                root.clear()
+
+    def read_geojson(self, path):
+        with open(path) as fh:
+            features = json.load(fh).get("features", [])
+
+        for feature in features:
+            properties = feature.get("properties") or {}
+            geometry = feature.get("geometry")
+            if not geometry:
+                continue
+
+            point = GEOSGeometry(json.dumps(geometry))
+            if point.geom_type != "Point":
+                point = point.centroid
+
+            osm_type, osm_id = self.parse_osm_id(
+                properties.get("@id") or feature.get("id")
+            )
+            tags = properties.get("tags") or properties
+            record = parse_osm_element(
+                {
+                    "type": osm_type,
+                    "id": osm_id,
+                    "lat": point.y,
+                    "lon": point.x,
+                    "tags": tags,
+                }
+            )
+            if record and osm_id is None:
+                record["osm_id"] = self.content_key(record)
+            yield record
+
+    def parse_osm_id(self, raw_id):
+        match = OSM_ID_PATTERN.match(str(raw_id or ""))
+        if not match:
+            return "feature", None
+        osm_type, osm_id = match.groups()
+        return OSM_TYPES.get(osm_type, osm_type), int(osm_id)
+
+    def content_key(self, record):
+        """
+        Stable key for a feature without an OSM id: the same POI (tag and
+        location to ~1 m) maps to the same row in every file, and different
+        POIs to different rows.
+        """
+        content = (
+            f"{record['tag_key']}={record['tag_value']}"
+            f"@{record['lon']:.5f},{record['lat']:.5f}"
+        )
+        digest = hashlib.blake2b(content.encode(), digest_size=8).digest()
+        # Positive, to fit the signed bigint column.
+        return int.from_bytes(digest, "big") >> 1
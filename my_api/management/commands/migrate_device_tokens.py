@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+
+from my_api.models import DeviceToken, MyApiUser
+
+
+class Command(BaseCommand):
+    help = "Copy tokens from the legacy MyApiUser.fcm_tokens field into DeviceToken"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Empty fcm_tokens on users once their tokens are copied",
+        )
+
+    def handle(self, *args, **options):
+        users = (
+            MyApiUser.objects.exclude(fcm_tokens=[])
+            .exclude(fcm_tokens__isnull=True)
+            .values_list("id", "fcm_tokens")
+        )
+
+        copied = 0
+        batch = {}
+        user_ids = []
+        for user_id, tokens in users.iterator(chunk_size=options["batch_size"]):
+            if not isinstance(tokens, list):
+                tokens = [tokens]
+            for token in tokens:
+                if token:
+                    # The same token can sit on two accounts, the last one wins.
+                    batch[str(token)] = DeviceToken(user_id=user_id, token=str(token))
+            user_ids.append(user_id)
+            if len(batch) >= options["batch_size"]:
+                copied += self.flush(batch)
+                batch = {}
+        if batch:
+            copied += self.flush(batch)
+
+        if options["clear"] and user_ids:
+            # Bypasses save(), the users' cached rows just expire.
+            MyApiUser.objects.filter(id__in=user_ids).update(fcm_tokens=[])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Copied {copied} tokens from {len(user_ids)} users")
+        )
+
+    def flush(self, batch):
+        DeviceToken.objects.bulk_create(
+            list(batch.values()),
+            update_conflicts=True,
+            unique_fields=["token"],
+            update_fields=["user"],
+        )
+        return len(batch)
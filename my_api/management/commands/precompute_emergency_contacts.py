@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from my_api.contact_cache import is_contact_fresh, refresh_emergency_contact
+from my_api.models import AreaLocation, Issue
+
+
+class Command(BaseCommand):
+    help = (
+        "Warm the emergency contact cache for every AreaLocation x category pair, "
+        "throttled so Gemini is not flooded"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--delay",
+            type=float,
+            default=1.0,
+            help="Seconds to wait between Gemini calls (default: 1.0)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Refresh entries that are still fresh",
+        )
+        parser.add_argument(
+            "--city", help="Only precompute areas in this city (case-insensitive)"
+        )
+        parser.add_argument(
+            "--categories",
+            help="Comma-separated category labels, defaults to all categories",
+        )
+        parser.add_argument("--limit", type=int, help="Stop after N Gemini calls")
+
+    def handle(self, *args, **options):
+        # Issue.categories stores the display labels, so the cache keys do too.
+        categories = [label for _, label in Issue.CATEGORY_CHOICES]
+        if options["categories"]:
+            categories = [c.strip() for c in options["categories"].split(",")]
+
+        areas = AreaLocation.objects.order_by("city_name", "name")
+        if options["city"]:
+            areas = areas.filter(city_name__iexact=options["city"])
+
+        fetched = skipped = failed = 0
+        for name, city_name in areas.values_list("name", "city_name").iterator():
+            for category in categories:
+                if not options["force"] and is_contact_fresh(category, city_name, name):
+                    skipped += 1
+                    continue
+
+                if options["limit"] is not None and fetched >= options["limit"]:
+                    self.report(fetched, skipped, failed)
+                    return
+
+                value = refresh_emergency_contact(category, city_name, name)
+                fetched += 1
+                if "error" in value:
+                    failed += 1
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f"{category} @ {name}, {city_name}: {value['error']}"
+                        )
+                    )
+                time.sleep(options["delay"])
+
+        self.report(fetched, skipped, failed)
+
+    def report(self, fetched, skipped, failed):
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Fetched {fetched} contacts ({failed} failed), "
+                f"skipped {skipped} fresh entries"
+            )
+        )
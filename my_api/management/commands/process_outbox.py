@@ -0,0 +1,126 @@
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from my_api.models import OutboxEvent
+from my_api.utils import send_push_notification
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the side effects queued in OutboxEvent (official assignment, "
+        "notifications) exactly once per event, retrying failures with backoff"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=getattr(settings, "OUTBOX_BATCH_SIZE", 100),
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=getattr(settings, "OUTBOX_MAX_ATTEMPTS", 5),
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the outbox is empty (default: 1.0)",
+        )
+        parser.add_argument(
+            "--lease",
+            type=int,
+            default=300,
+            help="Seconds a claimed batch stays reserved for this worker",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process the currently due events and exit",
+        )
+
+    def handle(self, *args, **options):
+        self.max_attempts = options["max_attempts"]
+        self.handlers = {
+            OutboxEvent.ISSUE_STATUS_CHANGED: self.issue_status_changed,
+        }
+        processed = failed = 0
+
+        try:
+            while True:
+                batch = OutboxEvent.objects.claim(
+                    options["batch_size"], options["lease"], self.max_attempts
+                )
+                if not batch:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                for event in batch:
+                    if self.process(event):
+                        processed += 1
+                    elif event.status == OutboxEvent.FAILED:
+                        failed += 1
+        finally:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Processed {processed} events, {failed} failed permanently"
+                )
+            )
+
+    def process(self, event):
+        """
+        Apply the event's database side effects and mark it done in one
+        transaction, then send its pushes. A worker that crashes mid-event
+        leaves nothing behind, and an event re-claimed after its lease ran out
+        is skipped once the first worker has committed, so notifications are
+        never created twice.
+        """
+        try:
+            with transaction.atomic():
+                locked = (
+                    OutboxEvent.objects.select_for_update()
+                    .filter(pk=event.pk, status=OutboxEvent.PROCESSING)
+                    .first()
+                )
+                if locked is None:
+                    return False
+                pushes = self.handlers[event.kind](event)
+                locked.status = OutboxEvent.DONE
+                locked.processed_at = timezone.now()
+                locked.last_error = ""
+                locked.save(update_fields=["status", "processed_at", "last_error"])
+        except Exception as exc:
+            self.record_failure(event, exc)
+            return False
+
+        # Pushes are best effort: never retried, so never sent twice.
+        for notification, tokens in pushes:
+            send_push_notification(notification, tokens)
+        return True
+
+    def issue_status_changed(self, event):
+        return event.issue.apply_status_change(
+            event.payload["old_status"], event.payload["new_status"]
+        )
+
+    def record_failure(self, event, exc):
+        event.last_error = f"{type(exc).__name__}: {exc}"
+        if event.attempts < self.max_attempts:
+            backoff = min(2**event.attempts * 5, 900)
+            event.status = OutboxEvent.PENDING
+            event.next_attempt_at = timezone.now() + timedelta(
+                seconds=random.uniform(backoff / 2, backoff)
+            )
+        else:
+            event.status = OutboxEvent.FAILED
+            self.stderr.write(f"Outbox event {event.id} failed: {event.last_error}")
+        event.save(update_fields=["status", "next_attempt_at", "last_error"])
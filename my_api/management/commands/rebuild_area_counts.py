@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from my_api.models import AreaIssueCount
+
+
+class Command(BaseCommand):
+    help = "Recompute the AreaIssueCount rollup from the Issue table to fix drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--area",
+            type=int,
+            action="append",
+            dest="areas",
+            help="Only rebuild this AreaLocation id (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        rows = AreaIssueCount.objects.rebuild(area_ids=options["areas"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} area count rows"))
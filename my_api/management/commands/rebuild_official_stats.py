@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from my_api.models import MyApiOfficial
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized MyApiOfficial performance stats"
+
+    def handle(self, *args, **options):
+        officials = MyApiOfficial.objects.all()
+        count = officials.count()
+        officials.refresh_stats()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed stats for {count} officials"))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from my_api.models import IssueSlaBucket
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the IssueSlaBucket histograms from the status history to fix drift"
+    )
+
+    def handle(self, *args, **options):
+        rows = IssueSlaBucket.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} SLA histogram rows"))
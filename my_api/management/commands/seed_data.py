@@ -0,0 +1,623 @@
+import io
+import json
+import math
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from my_api.models import (
+    AreaIssueCount,
+    AreaLocation,
+    Comment,
+    Issue,
+    IssueSlaBucket,
+    IssueStatsBucket,
+    IssueStatusHistory,
+    Like,
+    MyApiOfficial,
+    MyApiUser,
+    Notification,
+)
+
+# (city, country, lon, lat, relative population)
+CITIES = [
+    ("Karachi", "Pakistan", 67.0011, 24.8607, 16),
+    ("Lahore", "Pakistan", 74.3587, 31.5204, 11),
+    ("Faisalabad", "Pakistan", 73.0479, 31.4504, 3),
+    ("Rawalpindi", "Pakistan", 73.0169, 33.5651, 2),
+    ("Islamabad", "Pakistan", 73.0479, 33.6844, 1),
+    ("Multan", "Pakistan", 71.5249, 30.1575, 2),
+    ("Hyderabad", "Pakistan", 68.3737, 25.3960, 2),
+    ("Peshawar", "Pakistan", 71.5249, 34.0151, 2),
+    ("Quetta", "Pakistan", 66.9750, 30.1798, 1),
+    ("Gujranwala", "Pakistan", 74.1883, 32.1877, 2),
+]
+
+CATEGORY_WEIGHTS = {
+    "Roads & Potholes": 18,
+    "Waste": 14,
+    "Sewerage": 11,
+    "Water": 10,
+    "Street Lighting": 8,
+    "Electric": 7,
+    "Illegal Dumping": 5,
+    "Stormwater": 4,
+    "Traffic Signals": 3,
+    "Gas": 3,
+    "Sidewalk Maintenance": 3,
+    "Noise Pollution": 2,
+    "Parking Violations": 2,
+    "Public Safety": 2,
+    "Other": 2,
+}
+
+STATUS_WEIGHTS = {
+    Issue.NOT_APPROVED: 8,
+    Issue.APPROVED: 30,
+    Issue.SOLVING: 14,
+    Issue.OFFICIAL_SOLVED: 2,
+    Issue.PENDING_USER_CONFIRMATION: 4,
+    Issue.SOLVED: 32,
+    Issue.REJECTED: 7,
+    Issue.REOPENED: 3,
+}
+# Statuses other users can see and interact with.
+PUBLIC_STATUSES = set(STATUS_WEIGHTS) - {Issue.NOT_APPROVED, Issue.REJECTED}
+
+TITLES = [
+    "{category} problem near {landmark}",
+    "{category} issue on {landmark}",
+    "Urgent: {category} at {landmark}",
+    "{category} not fixed for weeks near {landmark}",
+]
+LANDMARKS = [
+    "the main market",
+    "the bus stop",
+    "the school gate",
+    "the mosque",
+    "the park entrance",
+    "the hospital road",
+    "block 4",
+    "the roundabout",
+]
+COMMENTS = [
+    "Same problem on our street.",
+    "This has been going on for a month.",
+    "Reported this last week as well.",
+    "Thanks for raising it!",
+    "Any update from the officials?",
+    "It got worse after the rain.",
+]
+
+NULL = "\\N"
+
+
+def copy_value(value):
+    """Render one value in PostgreSQL COPY text format."""
+    if value is None:
+        return NULL
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (list, dict)):
+        value = json.dumps(value)
+    elif hasattr(value, "isoformat"):
+        return value.isoformat()
+    else:
+        value = str(value)
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def ewkt_point(lon, lat):
+    return f"SRID=4326;POINT({lon:.6f} {lat:.6f})"
+
+
+def ewkt_box(min_lon, min_lat, max_lon, max_lat, multi=False):
+    ring = (
+        f"{min_lon:.6f} {min_lat:.6f}, {max_lon:.6f} {min_lat:.6f}, "
+        f"{max_lon:.6f} {max_lat:.6f}, {min_lon:.6f} {max_lat:.6f}, "
+        f"{min_lon:.6f} {min_lat:.6f}"
+    )
+    if multi:
+        return f"SRID=4326;MULTIPOLYGON((({ring})))"
+    return f"SRID=4326;POLYGON(({ring}))"
+
+
+class CopyWriter:
+    """Buffers rows for one table and streams them to COPY FROM STDIN in batches."""
+
+    def __init__(self, cursor, model, columns, batch_size):
+        self.cursor = cursor
+        self.batch_size = batch_size
+        self.sql = "COPY {} ({}) FROM STDIN".format(
+            connection.ops.quote_name(model._meta.db_table),
+            ", ".join(
+                connection.ops.quote_name(model._meta.get_field(name).column)
+                for name in columns
+            ),
+        )
+        self.buffer = io.StringIO()
+        self.pending = 0
+        self.count = 0
+
+    def add(self, *values):
+        self.buffer.write("\t".join(copy_value(value) for value in values))
+        self.buffer.write("\n")
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        self.buffer.seek(0)
+        self.cursor.copy_expert(self.sql, self.buffer)
+        self.count += self.pending
+        self.buffer = io.StringIO()
+        self.pending = 0
+
+
+class IdAllocator:
+    """
+    Hands out primary keys from blocks reserved on the table's sequence, so
+    rows can reference each other before they are copied.
+    """
+
+    def __init__(self, cursor, model, block_size):
+        self.cursor = cursor
+        self.table = model._meta.db_table
+        self.block_size = block_size
+        self.next_id = self.last_id = 0
+        self.first_id = None
+
+    def __call__(self):
+        if self.next_id > self.last_id:
+            self.cursor.execute(
+                "SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+                "nextval(pg_get_serial_sequence(%s, 'id')) + %s - 1)",
+                [self.table, self.table, self.block_size],
+            )
+            self.last_id = self.cursor.fetchone()[0]
+            self.next_id = self.last_id - self.block_size + 1
+            if self.first_id is None:
+                self.first_id = self.next_id
+        value = self.next_id
+        self.next_id += 1
+        return value
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a reproducible synthetic dataset (areas, users, officials, "
+        "issues, likes, comments, notifications) and load it with COPY"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument(
+            "--tag",
+            help="Prefix for generated names and emails (default: seed<seed>)",
+        )
+        parser.add_argument("--cities", type=int, default=len(CITIES))
+        parser.add_argument(
+            "--grid", type=int, default=4, help="Areas per city are a grid x grid"
+        )
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--officials-per-area", type=int, default=1)
+        parser.add_argument("--issues", type=int, default=100000)
+        parser.add_argument("--likes-per-issue", type=float, default=8.0)
+        parser.add_argument("--comments-per-issue", type=float, default=3.0)
+        parser.add_argument("--reply-ratio", type=float, default=0.3)
+        parser.add_argument("--comment-like-ratio", type=float, default=0.5)
+        parser.add_argument("--notifications-per-user", type=float, default=10.0)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--batch-size", type=int, default=50000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.options = options
+        self.tag = options["tag"] or f"seed{options['seed']}"
+        self.now = timezone.now()
+        self.cities = CITIES[: max(1, options["cities"])]
+
+        if MyApiUser.objects.filter(username__startswith=f"{self.tag}-").exists():
+            raise CommandError(
+                f"Data tagged '{self.tag}' already exists, pass another --tag or --seed"
+            )
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            self.cursor = cursor
+            areas = self.seed_areas()
+            users = self.seed_users()
+            officials = self.seed_officials(areas)
+            issue_range = self.seed_issues_and_interactions(areas, users)
+            self.seed_notifications(users, issue_range)
+            self.write("areas", len(areas))
+            self.write("users", len(users))
+            self.write("officials", officials)
+
+            self.stdout.write("Rebuilding rollups...")
+            area_ids = [area["id"] for area in areas]
+            AreaLocation.objects.filter(id__in=area_ids).simplify_boundaries()
+            seeded = Issue.objects.filter(id__range=issue_range)
+            # Only moderated issues are assigned, as on approval.
+            assigned = MyApiOfficial.objects.all().assign_covering(
+                seeded.exclude(issue_status=Issue.NOT_APPROVED)
+            )
+            IssueStatsBucket.objects.record_created(seeded)
+            IssueStatusHistory.objects.record_created(seeded)
+            IssueSlaBucket.objects.record_created(seeded)
+            Issue.objects.schedule_deadlines(seeded)
+            AreaIssueCount.objects.rebuild(area_ids=area_ids)
+            self.write("official assignments", assigned)
+
+        self.stdout.write(self.style.SUCCESS(f"Seeded dataset '{self.tag}'"))
+
+    def write(self, label, count):
+        self.stdout.write(f"  {count:>10} {label}")
+
+    def writer(self, model, columns):
+        return CopyWriter(self.cursor, model, columns, self.options["batch_size"])
+
+    def allocator(self, model, count=None):
+        block_size = min(
+            count or self.options["batch_size"], self.options["batch_size"]
+        )
+        return IdAllocator(self.cursor, model, max(block_size, 1))
+
+    def seed_areas(self):
+        grid = self.options["grid"]
+        cell = 0.04
+        next_id = self.allocator(AreaLocation, len(self.cities) * grid * grid)
+        writer = self.writer(
+            AreaLocation, ["id", "name", "city_name", "country", "boundary"]
+        )
+        areas = []
+        for city, country, lon, lat, _ in self.cities:
+            origin_lon = lon - grid * cell / 2
+            origin_lat = lat - grid * cell / 2
+            for row in range(grid):
+                for col in range(grid):
+                    area = {
+                        "id": next_id(),
+                        "city": city,
+                        "col": col,
+                        "row": row,
+                    }
+                    min_lon = origin_lon + col * cell
+                    min_lat = origin_lat + row * cell
+                    writer.add(
+                        area["id"],
+                        f"{self.tag} Sector {row * grid + col + 1}",
+                        city,
+                        country,
+                        ewkt_box(
+                            min_lon, min_lat, min_lon + cell, min_lat + cell, multi=True
+                        ),
+                    )
+                    area["bbox"] = (min_lon, min_lat, min_lon + cell, min_lat + cell)
+                    areas.append(area)
+        writer.flush()
+        self.cell = cell
+        return areas
+
+    def seed_users(self):
+        password = make_password(None)
+        next_id = self.allocator(MyApiUser, self.options["users"])
+        writer = self.writer(
+            MyApiUser,
+            [
+                "id",
+                "password",
+                "is_superuser",
+                "email",
+                "verified",
+                "is_social",
+                "username",
+                "fcm_tokens",
+                "is_active",
+                "is_staff",
+                "role",
+                "location",
+                "created_at",
+                "updated_at",
+            ],
+        )
+        users = []
+        for index in range(self.options["users"]):
+            user_id = next_id()
+            city = self.pick_city()
+            lon, lat = self.jitter(city[2], city[3], 0.05)
+            joined = self.now - timedelta(days=self.options["days"] * self.rng.random())
+            writer.add(
+                user_id,
+                password,
+                False,
+                f"{self.tag}-{index}@example.com",
+                True,
+                False,
+                f"{self.tag}-{index}",
+                [],
+                True,
+                False,
+                MyApiUser.USER,
+                ewkt_point(lon, lat) if self.rng.random() < 0.6 else None,
+                joined,
+                joined,
+            )
+            users.append(user_id)
+        writer.flush()
+        return users
+
+    def seed_officials(self, areas):
+        password = make_password(None)
+        count = len(areas) * self.options["officials_per_area"]
+        user_ids = self.allocator(MyApiUser, count)
+        official_ids = self.allocator(MyApiOfficial, count)
+        user_writer = self.writer(
+            MyApiUser,
+            [
+                "id",
+                "password",
+                "is_superuser",
+                "email",
+                "verified",
+                "is_social",
+                "username",
+                "fcm_tokens",
+                "is_active",
+                "is_staff",
+                "role",
+                "created_at",
+                "updated_at",
+            ],
+        )
+        official_writer = self.writer(
+            MyApiOfficial,
+            [
+                "id",
+                "user",
+                "area_range",
+                "city_name",
+                "country_name",
+                "district_name",
+                "country_code",
+                "assigned_count",
+                "in_progress_count",
+                "resolved_count",
+            ],
+        )
+        countries = {city: country for city, country, *_ in self.cities}
+        for area in areas:
+            for index in range(self.options["officials_per_area"]):
+                user_id = user_ids()
+                username = f"{self.tag}-official-{area['id']}-{index}"
+                user_writer.add(
+                    user_id,
+                    password,
+                    False,
+                    f"{username}@example.com",
+                    True,
+                    False,
+                    username,
+                    [],
+                    True,
+                    False,
+                    MyApiUser.OFFICIAL,
+                    self.now,
+                    self.now,
+                )
+                country = countries[area["city"]]
+                official_writer.add(
+                    official_ids(),
+                    user_id,
+                    ewkt_box(*area["bbox"]),
+                    area["city"],
+                    country,
+                    None,
+                    country[:3].upper(),
+                    0,
+                    0,
+                    0,
+                )
+        # Officials reference their users, so users go first.
+        user_writer.flush()
+        official_writer.flush()
+        return official_writer.count
+
+    def seed_issues_and_interactions(self, areas, users):
+        options = self.options
+        grid = options["grid"]
+        areas_by_cell = {(a["city"], a["row"], a["col"]): a["id"] for a in areas}
+        hotspots = {
+            city[0]: [
+                (*self.jitter(city[2], city[3], 0.06), self.rng.uniform(0.004, 0.02))
+                for _ in range(8)
+            ]
+            for city in self.cities
+        }
+        categories = list(CATEGORY_WEIGHTS)
+        category_weights = list(CATEGORY_WEIGHTS.values())
+        statuses = list(STATUS_WEIGHTS)
+        status_weights = list(STATUS_WEIGHTS.values())
+
+        issue_ids = self.allocator(Issue, options["issues"])
+        comment_ids = self.allocator(Comment)
+        issues = self.writer(
+            Issue,
+            [
+                "id",
+                "title",
+                "user",
+                "location",
+                "description",
+                "categories",
+                "images",
+                "issue_status",
+                "is_anonymous",
+                "likes_count",
+                "comments_count",
+                "created_at",
+                "updated_at",
+                "resolved_at",
+                "area",
+            ],
+        )
+        comments = self.writer(
+            Comment,
+            [
+                "id",
+                "user",
+                "reply_to",
+                "issue",
+                "parent",
+                "content",
+                "created_at",
+                "updated_at",
+                "likes_count",
+                "is_edited",
+            ],
+        )
+        likes = self.writer(Like, ["user", "issue", "comment", "created_at"])
+
+        for _ in range(options["issues"]):
+            issue_id = issue_ids()
+            city = self.pick_city()
+            hot_lon, hot_lat, spread = self.rng.choice(hotspots[city[0]])
+            lon, lat = self.jitter(hot_lon, hot_lat, spread)
+            origin_lon = city[2] - grid * self.cell / 2
+            origin_lat = city[3] - grid * self.cell / 2
+            cell = (
+                city[0],
+                math.floor((lat - origin_lat) / self.cell),
+                math.floor((lon - origin_lon) / self.cell),
+            )
+            picked = self.rng.choices(categories, category_weights, k=2)
+            if self.rng.random() < 0.7 or picked[0] == picked[1]:
+                picked = picked[:1]
+            issue_status = self.rng.choices(statuses, status_weights)[0]
+            # Skewed towards recent issues.
+            created = self.now - timedelta(
+                days=options["days"] * self.rng.random() ** 2
+            )
+            resolved = None
+            if issue_status == Issue.SOLVED:
+                resolved = min(
+                    created + timedelta(hours=self.rng.lognormvariate(4, 1.2)), self.now
+                )
+            updated = resolved or created
+
+            like_count = comment_count = 0
+            if issue_status in PUBLIC_STATUSES:
+                like_count = min(
+                    self.heavy_tail(options["likes_per_issue"]), len(users)
+                )
+                for user_id in self.rng.sample(users, like_count):
+                    likes.add(user_id, issue_id, None, self.after(created))
+                comment_count = self.heavy_tail(options["comments_per_issue"])
+                roots = []
+                for _ in range(comment_count):
+                    comment_id = comment_ids()
+                    author = self.rng.choice(users)
+                    parent = reply_to = None
+                    if roots and self.rng.random() < options["reply_ratio"]:
+                        parent, reply_to = self.rng.choice(roots)
+                    else:
+                        roots.append((comment_id, author))
+                    comment_likes = 0
+                    if self.rng.random() < options["comment_like_ratio"]:
+                        comment_likes = min(self.heavy_tail(2), len(users))
+                    commented = self.after(created)
+                    for user_id in self.rng.sample(users, comment_likes):
+                        likes.add(user_id, None, comment_id, self.after(commented))
+                    comments.add(
+                        comment_id,
+                        author,
+                        reply_to,
+                        issue_id,
+                        parent,
+                        self.rng.choice(COMMENTS),
+                        commented,
+                        commented,
+                        comment_likes,
+                        False,
+                    )
+
+            title = self.rng.choice(TITLES).format(
+                category=picked[0], landmark=self.rng.choice(LANDMARKS)
+            )
+            issues.add(
+                issue_id,
+                title,
+                self.rng.choice(users),
+                ewkt_point(lon, lat),
+                f"{title}. Reported by residents of {city[0]}.",
+                picked,
+                [],
+                issue_status,
+                self.rng.random() < 0.1,
+                like_count,
+                comment_count,
+                created,
+                updated,
+                resolved,
+                areas_by_cell.get(cell),
+            )
+            # Likes and comments reference issues, so issues flush first.
+            if max(issues.pending, comments.pending) >= options["batch_size"] // 2:
+                issues.flush()
+                comments.flush()
+                likes.flush()
+
+        issues.flush()
+        comments.flush()
+        likes.flush()
+        self.write("issues", issues.count)
+        self.write("comments", comments.count)
+        self.write("likes", likes.count)
+        return (issue_ids.first_id or 0, issue_ids.next_id - 1)
+
+    def seed_notifications(self, users, issue_range):
+        first_id, last_id = issue_range
+        if first_id > last_id:
+            return
+        writer = self.writer(
+            Notification,
+            ["user", "screen", "screen_id", "title", "description", "created_at"],
+        )
+        for user_id in users:
+            for _ in range(self.heavy_tail(self.options["notifications_per_user"])):
+                writer.add(
+                    user_id,
+                    "issueDetail",
+                    self.rng.randint(first_id, last_id),
+                    "Nearby Issue Reported",
+                    "A new issue has been reported near your area.",
+                    self.now
+                    - timedelta(days=self.options["days"] * self.rng.random() ** 2),
+                )
+        writer.flush()
+        self.write("notifications", writer.count)
+
+    def pick_city(self):
+        return self.rng.choices(self.cities, [city[4] for city in self.cities])[0]
+
+    def jitter(self, lon, lat, spread):
+        return lon + self.rng.gauss(0, spread), lat + self.rng.gauss(0, spread)
+
+    def heavy_tail(self, mean):
+        """Non-negative integer with the given mean and a long (geometric) tail."""
+        if mean <= 0:
+            return 0
+        return int(math.log(1 - self.rng.random()) / math.log(mean / (mean + 1)))
+
+    def after(self, moment):
+        return min(moment + timedelta(hours=self.rng.expovariate(1 / 48)), self.now)
@@ -0,0 +1,151 @@
+import random
+import smtplib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from my_api.models import OutgoingEmail
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued OutgoingEmail rows, reusing one SMTP connection across "
+        "messages and retrying transient failures with backoff"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=getattr(settings, "EMAIL_QUEUE_BATCH_SIZE", 50),
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=getattr(settings, "EMAIL_QUEUE_MAX_ATTEMPTS", 5),
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the queue is empty (default: 1.0)",
+        )
+        parser.add_argument(
+            "--idle-disconnect",
+            type=float,
+            default=30.0,
+            help="Close the SMTP connection after this many idle seconds",
+        )
+        parser.add_argument(
+            "--lease",
+            type=int,
+            default=300,
+            help="Seconds a claimed batch stays reserved for this worker",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the currently due emails and exit",
+        )
+
+    def handle(self, *args, **options):
+        self.max_attempts = options["max_attempts"]
+        self.connection = get_connection()
+        idle_since = time.monotonic()
+        sent = failed = 0
+
+        try:
+            while True:
+                batch = OutgoingEmail.objects.claim(
+                    options["batch_size"], options["lease"], self.max_attempts
+                )
+                if not batch:
+                    if options["once"]:
+                        break
+                    if time.monotonic() - idle_since > options["idle_disconnect"]:
+                        self.connection.close()
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                for email in batch:
+                    if self.deliver(email):
+                        sent += 1
+                    elif email.status == OutgoingEmail.FAILED:
+                        failed += 1
+                idle_since = time.monotonic()
+        finally:
+            self.connection.close()
+            self.stdout.write(
+                self.style.SUCCESS(f"Sent {sent} emails, {failed} failed permanently")
+            )
+
+    def deliver(self, email):
+        message = EmailMultiAlternatives(
+            email.subject,
+            email.html_body,
+            email.from_email,
+            email.to,
+            connection=self.connection,
+        )
+        message.attach_alternative(email.html_body, "text/html")
+
+        try:
+            self.send(message)
+        except Exception as exc:
+            self.connection.close()
+            self.record_failure(email, exc)
+            return False
+
+        email.status = OutgoingEmail.SENT
+        email.sent_at = timezone.now()
+        email.last_error = ""
+        email.save(update_fields=["status", "sent_at", "last_error"])
+        return True
+
+    def send(self, message):
+        """
+        Send over the shared connection. It is opened here rather than by
+        send_messages(), which would close a connection it opened itself
+        after every call. A connection the server dropped while idle is
+        reopened once.
+        """
+        for retry in (False, True):
+            try:
+                self.connection.open()
+                self.connection.send_messages([message])
+                return
+            except smtplib.SMTPServerDisconnected:
+                self.connection.close()
+                if retry:
+                    raise
+
+    def record_failure(self, email, exc):
+        email.last_error = f"{type(exc).__name__}: {exc}"
+        if self.is_transient(exc) and email.attempts < self.max_attempts:
+            backoff = min(2**email.attempts * 5, 900)
+            email.status = OutgoingEmail.PENDING
+            email.next_attempt_at = timezone.now() + timedelta(
+                seconds=random.uniform(backoff / 2, backoff)
+            )
+        else:
+            email.status = OutgoingEmail.FAILED
+            self.stderr.write(
+                f"Email {email.id} to {email.to} failed: {email.last_error}"
+            )
+        email.save(update_fields=["status", "next_attempt_at", "last_error"])
+
+    def is_transient(self, exc):
+        if isinstance(exc, smtplib.SMTPRecipientsRefused):
+            return all(code < 500 for code, _ in exc.recipients.values())
+        if isinstance(exc, smtplib.SMTPResponseException):
+            return exc.smtp_code < 500
+        if isinstance(exc, smtplib.SMTPServerDisconnected):
+            return True
+        if isinstance(exc, smtplib.SMTPException):
+            return False
+        # Connection refused, timeouts, DNS failures.
+        return isinstance(exc, OSError)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from my_api.models import AreaLocation
+
+
+class Command(BaseCommand):
+    help = "Regenerate the per-zoom simplified AreaLocation boundaries"
+
+    def handle(self, *args, **options):
+        updated = AreaLocation.objects.simplify_boundaries()
+        self.stdout.write(self.style.SUCCESS(f"Simplified {updated} area boundaries"))
@@ -0,0 +1,263 @@
+"""
+In-process request metrics rendered in the Prometheus text format.
+
+PerformanceMetricsMiddleware times every request and counts the SQL it runs
+through `count_query`, an execute_wrapper installed on every database
+connection as it is opened. Connections are per thread, so the wrapper finds
+the request through a context variable, which follows it into the
+sync_to_async threads that sync views and the async ORM run on. Serializer
+time is added by views with `serializer_timer()`, and cache hits/misses come from
+InstrumentedRedisCache. Everything is exported by MetricsView at /metrics/
+together with the outbound service metrics from http_client.
+
+Like the outbound metrics, the numbers are per worker process; Prometheus
+should scrape each worker, or sum them.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    float("inf"),
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, float("inf"))
+
+_request_stats = contextvars.ContextVar("request_stats", default=None)
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (
+            name,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(
+                    f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                )
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    label_text = _format_labels(
+                        self.labelnames, labels, [("le", _format_value(bound))]
+                    )
+                    lines.append(f"{self.name}_bucket{label_text} {cumulative}")
+                label_text = _format_labels(self.labelnames, labels)
+                lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+                lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "myapi_request_duration_seconds",
+    "Request latency by endpoint.",
+    ("endpoint", "method", "status"),
+)
+REQUEST_SQL_QUERIES = Histogram(
+    "myapi_request_sql_queries",
+    "SQL queries run per request.",
+    ("endpoint", "method"),
+    QUERY_COUNT_BUCKETS,
+)
+REQUEST_SQL_DURATION = Histogram(
+    "myapi_request_sql_duration_seconds",
+    "Time spent executing SQL per request.",
+    ("endpoint", "method"),
+)
+SERIALIZER_DURATION = Histogram(
+    "myapi_serializer_duration_seconds",
+    "Time spent rendering serializer data per request.",
+    ("endpoint", "method"),
+)
+CACHE_REQUESTS = Counter(
+    "myapi_cache_requests_total",
+    "Cache lookups by key prefix and result.",
+    ("cache", "result"),
+)
+
+REQUEST_METRICS = (
+    REQUEST_DURATION,
+    REQUEST_SQL_QUERIES,
+    REQUEST_SQL_DURATION,
+    SERIALIZER_DURATION,
+    CACHE_REQUESTS,
+)
+
+
+class RequestStats:
+    __slots__ = ("sql_count", "sql_time", "serializer_time")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+
+
+def current_request_stats():
+    return _request_stats.get()
+
+
+def count_query(execute, sql, params, many, context):
+    """Database execute_wrapper counting queries run for the current request."""
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.sql_count += 1
+        stats.sql_time += time.perf_counter() - start
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """connection_created receiver adding count_query to the new connection."""
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+@contextmanager
+def collect_request_stats():
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+@contextmanager
+def serializer_timer():
+    """Attribute the wrapped block (typically `serializer.data`) to serializer time."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.serializer_time += time.perf_counter() - start
+
+
+def record_cache_lookup(key, hit):
+    CACHE_REQUESTS.inc((str(key).split(":", 1)[0], "hit" if hit else "miss"))
+
+
+def _outbound_lines():
+    from .http_client import LATENCY_BUCKETS as OUTBOUND_BUCKETS
+    from .http_client import service_metrics
+
+    counters = ("requests", "errors", "retries", "short_circuited", "rate_limited")
+    services = service_metrics()
+    lines = []
+    for counter in counters:
+        name = f"myapi_outbound_{counter}_total"
+        lines.append(f"# HELP {name} Outbound {counter.replace('_', ' ')} per service.")
+        lines.append(f"# TYPE {name} counter")
+        for service, stats in services.items():
+            lines.append(f'{name}{{service="{service}"}} {stats[counter]}')
+
+    name = "myapi_outbound_circuit_open"
+    lines.append(f"# HELP {name} 1 while the service circuit breaker is not closed.")
+    lines.append(f"# TYPE {name} gauge")
+    for service, stats in services.items():
+        lines.append(f'{name}{{service="{service}"}} {int(stats["state"] != "closed")}')
+
+    name = "myapi_outbound_duration_seconds"
+    lines.append(f"# HELP {name} Outbound request latency per service.")
+    lines.append(f"# TYPE {name} histogram")
+    for service, stats in services.items():
+        cumulative = 0
+        for bound in OUTBOUND_BUCKETS:
+            cumulative += stats["latency_buckets"][str(bound)]
+            lines.append(
+                f'{name}_bucket{{service="{service}",le="{_format_value(bound)}"}} {cumulative}'
+            )
+        lines.append(
+            f'{name}_sum{{service="{service}"}} {_format_value(stats["latency_sum"])}'
+        )
+        lines.append(f'{name}_count{{service="{service}"}} {stats["requests"]}')
+    return lines
+
+
+def render_prometheus():
+    lines = []
+    for metric in REQUEST_METRICS:
+        lines.extend(metric.render())
+    lines.extend(_outbound_lines())
+    return "\n".join(lines) + "\n"
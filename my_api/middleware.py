@@ -0,0 +1,125 @@
+import logging
+import time
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .db_routers import apin_to_primary, pin_to_primary, replica_aliases
+from .metrics import (
+    REQUEST_DURATION,
+    REQUEST_SQL_DURATION,
+    REQUEST_SQL_QUERIES,
+    SERIALIZER_DURATION,
+    collect_request_stats,
+)
+
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger("my_api.performance")
+
+
+class PerformanceMetricsMiddleware:
+    """
+    Record latency, SQL query count/time and serializer time per endpoint
+    (the URL name, e.g. "issues-list", not the concrete path), and log
+    requests slower than SLOW_REQUEST_SECONDS.
+
+    Sync and async capable, so it does not force the async views back onto
+    a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_request_seconds = getattr(settings, "SLOW_REQUEST_SECONDS", 1.0)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with collect_request_stats() as stats:
+            response = self.get_response(request)
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        # Queries count on whichever thread's connection runs them (see
+        # metrics.count_query): the stats travel in the request's context.
+        with collect_request_stats() as stats:
+            response = await self.get_response(request)
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    def record(self, request, response, stats, duration):
+        match = request.resolver_match
+        endpoint = (match.view_name or match.route) if match else "unmatched"
+        method = request.method
+        REQUEST_DURATION.observe(
+            (endpoint, method, str(response.status_code)), duration
+        )
+        REQUEST_SQL_QUERIES.observe((endpoint, method), stats.sql_count)
+        REQUEST_SQL_DURATION.observe((endpoint, method), stats.sql_time)
+        if stats.serializer_time:
+            SERIALIZER_DURATION.observe((endpoint, method), stats.serializer_time)
+
+        if duration >= self.slow_request_seconds:
+            logger.warning(
+                "Slow request %s %s: %.3fs, %d queries in %.3fs, serializer %.3fs",
+                method,
+                request.get_full_path(),
+                duration,
+                stats.sql_count,
+                stats.sql_time,
+                stats.serializer_time,
+            )
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pin users to the primary database for REPLICA_STICKY_SECONDS after a
+    successful write, so replica reads never hide their own changes (see
+    db_routers). Does nothing without replicas.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if self.wrote(request, response):
+            pin_to_primary(request.user)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self.wrote(request, response):
+            await apin_to_primary(request.user)
+        return response
+
+    def wrote(self, request, response):
+        user = getattr(request, "user", None)
+        return (
+            replica_aliases()
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and user is not None
+            # DRF replaces the lazy session user with the JWT user it
+            # authenticated; resolving a lazy one would only query sessions.
+            and not isinstance(user, SimpleLazyObject)
+        )
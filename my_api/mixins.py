@@ -1,5 +1,8 @@
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.response import Response
 
+from .db_routers import choose_read_alias, read_from, use_read_alias
+
 
 class StandardResponseMixin:
     def success_response(self, message, data=None, status_code=200):
@@ -13,3 +16,23 @@ class StandardResponseMixin:
             {"success": "False", "message": message, "data": data, "code": status_code},
             status=status_code,
         )
+
+
+class ReplicaReadMixin:
+    """
+    Serve the reads of `replica_read_actions` from a read replica (see
+    db_routers). Must come before the DRF view class in the bases.
+    """
+
+    replica_read_actions = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        # initial() picks the replica once the user is known; the block
+        # resets the routing however the request ends.
+        with read_from(None):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and self.action in self.replica_read_actions:
+            use_read_alias(choose_read_alias(request.user))
@@ -1,3 +1,7 @@
+import math
+from collections import Counter
+from datetime import timedelta, timezone as dt_timezone
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import (
@@ -7,7 +11,7 @@ from django.contrib.auth.models import (
 )
 from django.contrib.gis.db import models as gis_models
 from django.contrib.gis.geos import Polygon
-from django.db import models
+from django.db import connection, models, transaction
 from django.utils import timezone
 from django.contrib.gis.measure import D
 
@@ -15,7 +19,9 @@ from django.contrib.gis.measure import D
 from django.core.exceptions import ValidationError
 
 
-from .utils import get_district_boundary, send_push_notification
+from .geometry import BOUNDARY_ZOOM_TOLERANCES, Multi, SimplifyPreserveTopology
+from .user_cache import invalidate_user_on_commit
+from .utils import get_district_boundary
 
 
 class MyApiUserManager(BaseUserManager):
@@ -98,6 +104,146 @@ class MyApiUser(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_user_on_commit(self.pk)
+
+    def delete(self, *args, **kwargs):
+        user_id = self.pk
+        result = super().delete(*args, **kwargs)
+        invalidate_user_on_commit(user_id)
+        return result
+
+
+class DeviceTokenManager(models.Manager):
+    def register(self, user, token):
+        """
+        Upsert an FCM token for `user`. A token re-registered from another
+        account (shared device, re-login) moves to that account.
+        """
+        self.bulk_create(
+            [DeviceToken(user=user, token=token, last_seen=timezone.now())],
+            update_conflicts=True,
+            unique_fields=["token"],
+            update_fields=["user", "last_seen"],
+        )
+
+    def tokens_by_user(self, user_ids):
+        """{user_id: [token, ...]} for every user in `user_ids`, in one query."""
+        tokens = {}
+        for user_id, token in self.filter(user_id__in=list(user_ids)).values_list(
+            "user_id", "token"
+        ):
+            tokens.setdefault(user_id, []).append(token)
+        return tokens
+
+    def prune(self, tokens):
+        if not tokens:
+            return 0
+        deleted, _ = self.filter(token__in=list(tokens)).delete()
+        return deleted
+
+
+class DeviceToken(models.Model):
+    """An FCM registration token; fcm_tokens on MyApiUser is no longer written."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="device_tokens"
+    )
+    token = models.CharField(max_length=512, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(default=timezone.now)
+
+    objects = DeviceTokenManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "last_seen"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.token[:16]}..."
+
+
+class MyApiOfficialQuerySet(models.QuerySet):
+    def assign_covering(self, issues):
+        """
+        Assign each of `issues` (an Issue queryset) to the officials in this
+        queryset whose area_range covers it, in one INSERT ... SELECT, and
+        refresh the stats of the officials that gained issues. Returns the
+        number of new assignments.
+        """
+        field = MyApiOfficial._meta.get_field("assigned_issues")
+        quote = connection.ops.quote_name
+        officials_sql, officials_params = self.values("id").query.sql_with_params()
+        issues_sql, issues_params = issues.values("id").query.sql_with_params()
+        official_column = quote(field.m2m_column_name())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {quote(field.m2m_db_table())}
+                    ({official_column}, {quote(field.m2m_reverse_name())})
+                SELECT o.id, i.id
+                FROM {quote(Issue._meta.db_table)} i
+                JOIN {quote(MyApiOfficial._meta.db_table)} o
+                    ON ST_Covers(o.area_range, i.location)
+                WHERE i.id IN ({issues_sql}) AND o.id IN ({officials_sql})
+                ON CONFLICT DO NOTHING
+                RETURNING {official_column}
+                """,
+                [*issues_params, *officials_params],
+            )
+            assigned = cursor.fetchall()
+        MyApiOfficial.objects.filter(id__in={row[0] for row in assigned}).refresh_stats()
+        return len(assigned)
+
+    def refresh_stats(self):
+        """
+        Recompute the denormalized stats of every official in this queryset
+        with a single UPDATE, instead of one refresh_stats() per official.
+        """
+        official_ids = list(self.values_list("id", flat=True))
+        if not official_ids:
+            return
+
+        table = connection.ops.quote_name(MyApiOfficial._meta.db_table)
+        field = MyApiOfficial._meta.get_field("assigned_issues")
+        through_table = connection.ops.quote_name(field.m2m_db_table())
+        official_column = connection.ops.quote_name(field.m2m_column_name())
+        issue_column = connection.ops.quote_name(field.m2m_reverse_name())
+        issue_table = connection.ops.quote_name(Issue._meta.db_table)
+        in_progress = ", ".join(["%s"] * len(Issue.IN_PROGRESS_STATUSES))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {table} AS o SET
+                    assigned_count = s.assigned,
+                    in_progress_count = s.in_progress,
+                    resolved_count = s.resolved,
+                    median_resolution_seconds = s.median
+                FROM (
+                    SELECT
+                        t.id,
+                        COUNT(i.id) AS assigned,
+                        COUNT(i.id) FILTER (
+                            WHERE i.issue_status IN ({in_progress})
+                        ) AS in_progress,
+                        COUNT(i.id) FILTER (WHERE i.issue_status = %s) AS resolved,
+                        PERCENTILE_CONT(0.5) WITHIN GROUP (
+                            ORDER BY EXTRACT(EPOCH FROM i.resolved_at - i.created_at)
+                        ) FILTER (
+                            WHERE i.issue_status = %s AND i.resolved_at IS NOT NULL
+                        ) AS median
+                    FROM unnest(%s) AS t(id)
+                    LEFT JOIN {through_table} a ON a.{official_column} = t.id
+                    LEFT JOIN {issue_table} i ON i.id = a.{issue_column}
+                    GROUP BY t.id
+                ) AS s
+                WHERE o.id = s.id
+                """,
+                [*Issue.IN_PROGRESS_STATUSES, Issue.SOLVED, Issue.SOLVED, official_ids],
+            )
+
 
 class MyApiOfficial(models.Model):
     user = models.ForeignKey(
@@ -112,6 +258,28 @@ class MyApiOfficial(models.Model):
     district_name = models.CharField(max_length=150, null=True, blank=True)
     country_code = models.CharField(max_length=3, editable=False)
 
+    # Denormalized performance stats, see refresh_stats().
+    STAT_FIELDS = [
+        "assigned_count",
+        "in_progress_count",
+        "resolved_count",
+        "median_resolution_seconds",
+    ]
+    assigned_count = models.PositiveIntegerField(default=0, editable=False)
+    in_progress_count = models.PositiveIntegerField(default=0, editable=False)
+    resolved_count = models.PositiveIntegerField(default=0, editable=False)
+    median_resolution_seconds = models.FloatField(null=True, editable=False)
+
+    objects = MyApiOfficialQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-resolved_count", "median_resolution_seconds"],
+                name="official_leaderboard_idx",
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         if self.user.role != MyApiUser.OFFICIAL:
             self.user.role = MyApiUser.OFFICIAL
@@ -131,26 +299,70 @@ class MyApiOfficial(models.Model):
         if self.area_range:
             issues_in_area = Issue.objects.filter(location__within=self.area_range)
             self.assigned_issues.set(issues_in_area)
+            self.refresh_stats()
+
+    def refresh_stats(self):
+        """
+        Recompute the denormalized stats from assigned_issues (see
+        MyApiOfficialQuerySet.refresh_stats) and reload them onto this
+        instance. Called when assignments change; status transitions adjust
+        the counters incrementally (see Issue._update_official_stats).
+        """
+        MyApiOfficial.objects.filter(pk=self.pk).refresh_stats()
+        self.refresh_from_db(fields=self.STAT_FIELDS)
 
     @property
     def total_resolved(self):
-        return self.assigned_issues.filter(issue_status=Issue.SOLVED).count()
+        return self.resolved_count
 
     def resolved_issues_count(self):
-        return self.assigned_issues.filter(issue_status=Issue.SOLVED).count()
+        return self.resolved_count
     
     def resolved_issues(self):
         return self.assigned_issues.filter(issue_status=Issue.SOLVED)
 
+class AreaLocationQuerySet(models.QuerySet):
+    def simplify_boundaries(self):
+        """Regenerate every zoom tier with ST_SimplifyPreserveTopology."""
+        return self.update(
+            **{
+                f"boundary_z{zoom}": Multi(
+                    SimplifyPreserveTopology("boundary", tolerance)
+                )
+                for zoom, tolerance in BOUNDARY_ZOOM_TOLERANCES.items()
+            }
+        )
+
+
 class AreaLocation(gis_models.Model):
     name = models.CharField(max_length=255)
     city_name = models.CharField(max_length=255)
     country = models.CharField(max_length=255, default="Unknown")
     boundary = gis_models.MultiPolygonField(null=True, blank=True)
+    # Simplified copies of `boundary` per zoom tier (see geometry.py),
+    # regenerated in the database whenever the boundary is saved.
+    boundary_z8 = gis_models.MultiPolygonField(
+        null=True, blank=True, editable=False, spatial_index=False
+    )
+    boundary_z11 = gis_models.MultiPolygonField(
+        null=True, blank=True, editable=False, spatial_index=False
+    )
+    boundary_z14 = gis_models.MultiPolygonField(
+        null=True, blank=True, editable=False, spatial_index=False
+    )
+
+    objects = AreaLocationQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.name}, {self.city_name}, {self.country}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "boundary" in update_fields:
+            AreaLocation.objects.filter(pk=self.pk).simplify_boundaries()
+
+
     class Meta:
         unique_together = ('name', 'city_name', 'country')
         indexes = [
@@ -161,6 +373,115 @@ class AreaLocation(gis_models.Model):
         ]
 
 
+class EmergencyService(gis_models.Model):
+    """
+    Local index of OSM emergency/public service POIs used by
+    `get_emergency_contact`. Populated by the `load_emergency_services`
+    command so lookups never have to hit Overpass.
+    """
+
+    osm_type = models.CharField(max_length=10, default="node")
+    osm_id = models.BigIntegerField()
+    tag_key = models.CharField(max_length=50)
+    tag_value = models.CharField(max_length=50)
+    name = models.CharField(max_length=255, default="Unnamed Location")
+    address = models.CharField(max_length=500, default="N/A")
+    phone = models.CharField(max_length=100, null=True, blank=True)
+    # spatial_index creates the GiST index the KNN (<->) ordering relies on.
+    location = gis_models.PointField(srid=4326, spatial_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.tag_key}={self.tag_value})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["osm_type", "osm_id"], name="unique_emergency_service_osm"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["tag_key", "tag_value"]),
+        ]
+
+
+class IssueManager(models.Manager):
+    def schedule_deadlines(self, issues=None):
+        """
+        Set due_at on `issues` (an Issue queryset, default every issue
+        without one) from their last write, for rows that bypassed
+        Issue.save, e.g. bulk loads and issues older than the scheduler.
+        """
+        issues = self.filter(due_at__isnull=True) if issues is None else issues
+        scheduled = 0
+        for issue_status, delay in Issue.escalation_delays().items():
+            scheduled += issues.filter(issue_status=issue_status).update(
+                due_at=models.F("updated_at") + delay, escalation_count=0
+            )
+        return scheduled
+
+    def escalate_overdue(self, limit):
+        """
+        Claim up to `limit` active issues past their due_at with FOR UPDATE
+        SKIP LOCKED (through the partial due_at index, never a scan of
+        Issue), notify their assigned officials and push due_at back by
+        ISSUE_ESCALATION_REPEAT_HOURS, in one transaction. Concurrent
+        workers get disjoint batches. Returns the escalated issues and the
+        (notification, tokens) pushes to send once committed.
+        """
+        now = timezone.now()
+        repeat = timedelta(hours=getattr(settings, "ISSUE_ESCALATION_REPEAT_HOURS", 24))
+        with transaction.atomic():
+            issues = list(
+                self.select_for_update(skip_locked=True)
+                .filter(issue_status__in=Issue.ESCALATION_STATUSES, due_at__lte=now)
+                .order_by("due_at")
+                .only("id", "title", "issue_status", "escalation_count")[:limit]
+            )
+            if not issues:
+                return [], []
+            by_id = {issue.id: issue for issue in issues}
+            self.filter(id__in=by_id).update(
+                due_at=now + repeat, escalation_count=models.F("escalation_count") + 1
+            )
+
+            assignments = list(
+                MyApiOfficial.assigned_issues.through.objects.filter(
+                    issue_id__in=by_id
+                ).values_list("issue_id", "myapiofficial__user_id")
+            )
+            statuses = dict(Issue.ISSUE_STATUS)
+            notifications = Notification.objects.bulk_create(
+                [
+                    Notification(
+                        user_id=user_id,
+                        screen="issueDetail",
+                        screen_id=issue_id,
+                        title="Issue Overdue",
+                        description=(
+                            f"The issue '{by_id[issue_id].title}' is still "
+                            f"{statuses[by_id[issue_id].issue_status].lower()} and past its "
+                            f"deadline (reminder {by_id[issue_id].escalation_count + 1})."
+                        ),
+                    )
+                    for issue_id, user_id in assignments
+                ]
+            )
+            tokens = DeviceToken.objects.tokens_by_user(
+                {notification.user_id for notification in notifications}
+            )
+        pushes = [
+            (notification, tokens[notification.user_id])
+            for notification in notifications
+            if notification.user_id in tokens
+        ]
+        return issues, pushes
+
+
+class IssueStatusConflict(ValidationError):
+    """The issue's status changed after it was loaded."""
+
+
 class Issue(models.Model):
     NOT_APPROVED = "not_approved"
     APPROVED = "approved"
@@ -213,6 +534,16 @@ class Issue(models.Model):
         (REOPENED, "Reopened"),
     ]
 
+    IN_PROGRESS_STATUSES = [
+        SOLVING,
+        OFFICIAL_SOLVED,
+        PENDING_USER_CONFIRMATION,
+        REOPENED,
+    ]
+
+    # Statuses with a due_at deadline, see escalation_delays().
+    ESCALATION_STATUSES = [APPROVED, SOLVING, REOPENED]
+
     ALLOWED_STATUS_CHANGES = {
         NOT_APPROVED: [APPROVED, REJECTED],
         APPROVED: [SOLVING, REJECTED],
@@ -240,7 +571,14 @@ class Issue(models.Model):
     comments_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
     area = models.ForeignKey(AreaLocation, null=True, blank=True, on_delete=models.SET_NULL)
+    # When an issue in an ESCALATION_STATUSES status gets escalated to its
+    # officials; moved forward by every escalation.
+    due_at = models.DateTimeField(null=True, blank=True)
+    escalation_count = models.PositiveSmallIntegerField(default=0)
+
+    objects = IssueManager()
 
     class Meta:
         ordering = ["-created_at"]
@@ -251,52 +589,120 @@ class Issue(models.Model):
             models.Index(fields=["issue_status"]),
             models.Index(fields=["area"]),
             gis_models.Index(fields=["location"]),
+            # Only active issues are indexed, so the escalation worker's
+            # lookup stays proportional to what is due.
+            models.Index(
+                fields=["due_at"],
+                name="issue_due_at_active_idx",
+                condition=models.Q(issue_status__in=["approved", "solving", "reopened"]),
+            ),
         ]
 
     def __str__(self):
         return self.title
 
-    def change_status(self, new_status):
-        # from .models import MyApiOfficial
+    @classmethod
+    def escalation_delays(cls):
+        """{status: timedelta} an issue may stay in each escalated status."""
+        hours = getattr(settings, "ISSUE_ESCALATION_HOURS", {})
+        return {
+            issue_status: timedelta(hours=hours[issue_status])
+            for issue_status in cls.ESCALATION_STATUSES
+            if hours.get(issue_status)
+        }
 
+    def deadline_for(self, issue_status, entered_at):
+        delay = self.escalation_delays().get(issue_status)
+        return entered_at + delay if delay else None
+
+    def change_status(self, new_status, changed_by=None):
+        """
+        Move this issue to `new_status` with one conditional UPDATE ... WHERE
+        issue_status = <the status it was loaded with>, so of two concurrent
+        changes only one can pass the ALLOWED_STATUS_CHANGES check. The side
+        effects (official assignment, notifications) are queued as an
+        OutboxEvent in the same transaction and run by process_outbox.
+
+        `changed_by` (a user) is recorded in the IssueStatusHistory row.
+        Raises ValidationError for a disallowed transition, and
+        IssueStatusConflict when the status changed since it was loaded.
+        """
         old_status = self.issue_status
-        if new_status not in self.ALLOWED_STATUS_CHANGES.get(self.issue_status, []):
-            raise ValidationError(
-                f"Cannot transition from {self.issue_status} to {new_status}."
-            )
-
-        self.issue_status = new_status
-        self.save()
-
-        if new_status == self.APPROVED:
-            if self.location:
-                matching_officials = MyApiOfficial.objects.filter(area_range__covers=self.location)
-                for official in matching_officials:
-                    official.assigned_issues.add(self)
-                nearby_users = MyApiUser.objects.filter(
-                    location__distance_lte=(self.location, D(m=500))
-                ).exclude(id=self.user.id)
-
-                for user in nearby_users:
-                    notification = Notification.objects.create(
-                        user=user,
-                        screen="issueDetail",
-                        screen_id=self.id,
-                        title="Nearby Issue Reported",
-                        description=f"A new issue titled '{self.title}' has been reported near your area.",
-                    )
-                    if user.fcm_tokens:
-                        send_push_notification(notification)
+        if new_status not in self.ALLOWED_STATUS_CHANGES.get(old_status, []):
+            raise ValidationError(f"Cannot transition from {old_status} to {new_status}.")
 
+        # A solution reported by an official goes straight to the user.
         if new_status == self.OFFICIAL_SOLVED:
             new_status = self.PENDING_USER_CONFIRMATION
-            if new_status in self.ALLOWED_STATUS_CHANGES.get(self.issue_status, []):
-                self.issue_status = new_status
-                self.save()
 
-        self._notify_user_on_status_change(old_status, new_status)
-        self._notify_official_on_status_change(old_status, new_status)
+        now = timezone.now()
+        changes = {
+            "issue_status": new_status,
+            "updated_at": now,
+            "due_at": self.deadline_for(new_status, now),
+            "escalation_count": 0,
+        }
+        if new_status == self.SOLVED and self.resolved_at is None:
+            changes["resolved_at"] = now
+
+        with transaction.atomic():
+            previous = self._previous_state()
+            if previous is not None:
+                previous = {**previous, "issue_status": old_status}
+            updated = Issue.objects.filter(pk=self.pk, issue_status=old_status).update(
+                **changes
+            )
+            if not updated:
+                raise IssueStatusConflict(
+                    f"The issue is no longer {old_status}, reload it and try again."
+                )
+            for field, value in changes.items():
+                setattr(self, field, value)
+            self._record_change(previous, changed_by=changed_by)
+            OutboxEvent.objects.enqueue(
+                OutboxEvent.ISSUE_STATUS_CHANGED,
+                issue=self,
+                payload={"old_status": old_status, "new_status": new_status},
+            )
 
+    def apply_status_change(self, old_status, new_status):
+        """
+        The side effects of a status change, run by process_outbox inside the
+        transaction that marks the event done. Returns the (notification,
+        tokens) pushes to send once that transaction has committed.
+        """
+        pushes = []
+        if new_status == self.APPROVED and self.location:
+            MyApiOfficial.objects.assign_covering(Issue.objects.filter(pk=self.pk))
+            pushes += self._notify_nearby_users()
+        pushes += self._notify_user_on_status_change(old_status, new_status)
+        pushes += self._notify_official_on_status_change(old_status, new_status)
+        return pushes
+
+    def _notify_nearby_users(self):
+        nearby_users = list(
+            MyApiUser.objects.filter(
+                location__distance_lte=(self.location, D(m=500))
+            ).exclude(id=self.user_id)
+        )
+        tokens = DeviceToken.objects.tokens_by_user(user.id for user in nearby_users)
+        notifications = Notification.objects.bulk_create(
+            [
+                Notification(
+                    user=user,
+                    screen="issueDetail",
+                    screen_id=self.id,
+                    title="Nearby Issue Reported",
+                    description=f"A new issue titled '{self.title}' has been reported near your area.",
+                )
+                for user in nearby_users
+            ]
+        )
+        return [
+            (notification, tokens[notification.user_id])
+            for notification in notifications
+            if notification.user_id in tokens
+        ]
 
     def _notify_user_on_status_change(self, old_status, new_status):
         status_messages = {
@@ -313,23 +719,22 @@ class Issue(models.Model):
         description = status_messages.get(new_status, f"Issue status changed to '{new_status}'.")
 
         notification = Notification.objects.create(
-            user=self.user,
+            user_id=self.user_id,
             screen="issueDetail",
             screen_id=self.id,
             title="Issue Status Updated",
             description=description
         )
 
-        if self.user.fcm_tokens:
-            send_push_notification(notification)
+        return [(notification, None)]
 
     def _notify_official_on_status_change(self, old_status, new_status):
         if new_status not in [self.APPROVED, self.SOLVED]:
-            return
+            return []
 
-        officials = self.official_issues.all()
-        if not officials.exists():
-            return
+        officials = list(self.official_issues.all())
+        if not officials:
+            return []
 
         if new_status == self.APPROVED:
             title = "New Issue Assigned"
@@ -338,18 +743,26 @@ class Issue(models.Model):
             title = "Issue Marked as Solved"
             description = f"The user has confirmed the issue '{self.title}' is resolved."
 
-        for official in officials:
-            user = official.user
-            notification = Notification.objects.create(
-                user=user,
-                screen="issueDetail",
-                screen_id=self.id,
-                title=title,
-                description=description,
-            )
-
-            if user.fcm_tokens:
-                send_push_notification(notification)
+        tokens = DeviceToken.objects.tokens_by_user(
+            official.user_id for official in officials
+        )
+        notifications = Notification.objects.bulk_create(
+            [
+                Notification(
+                    user_id=official.user_id,
+                    screen="issueDetail",
+                    screen_id=self.id,
+                    title=title,
+                    description=description,
+                )
+                for official in officials
+            ]
+        )
+        return [
+            (notification, tokens[notification.user_id])
+            for notification in notifications
+            if notification.user_id in tokens
+        ]
 
     def clean(self):
         if (
@@ -366,9 +779,676 @@ class Issue(models.Model):
                 # print(category, valid_categories)
                 raise ValidationError(f"Invalid category: {category}")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_state = instance._rollup_state()
+        return instance
+
+    def _rollup_state(self):
+        """
+        The fields the rollup tables are keyed on, as stored. None when any of
+        them was deferred on load.
+        """
+        if not all(f in self.__dict__ for f in ("area_id", "issue_status", "categories")):
+            return None
+        categories = self.categories if isinstance(self.categories, list) else []
+        return {
+            "area_id": self.area_id,
+            "issue_status": self.issue_status,
+            "categories": tuple(dict.fromkeys(categories)),
+        }
+
+    def _previous_state(self):
+        if self._state.adding:
+            return None
+        state = getattr(self, "_loaded_state", None)
+        if state is None and self.pk:
+            row = (
+                Issue.objects.filter(pk=self.pk)
+                .values("area_id", "issue_status", "categories")
+                .first()
+            )
+            if row:
+                row["categories"] = tuple(dict.fromkeys(row["categories"] or []))
+                state = row
+        return state
+
+    def _record_change(self, previous, changed_by=None):
+        """
+        Apply this write to the rollup tables and the status history. Must
+        run inside the same transaction as the write itself.
+        """
+        current = self._rollup_state()
+        AreaIssueCount.objects.apply_change(previous, current)
+        IssueStatsBucket.objects.record_change(self, previous, current)
+        if previous and current and previous["issue_status"] != current["issue_status"]:
+            self._update_official_stats(previous["issue_status"], current["issue_status"])
+        old_status = previous["issue_status"] if previous else IssueStatusHistory.CREATED
+        if current and current["issue_status"] != old_status:
+            # Before the history row, which tells a first approval apart.
+            IssueSlaBucket.objects.record_change(self, old_status, current)
+            IssueStatusHistory.objects.create(
+                issue=self,
+                from_status=old_status,
+                to_status=current["issue_status"],
+                changed_at=self.updated_at or timezone.now(),
+                changed_by=changed_by,
+            )
+        self._loaded_state = current
+
+    def _update_official_stats(self, old_status, new_status):
+        """Move this issue between the assigned officials' status counters."""
+        in_progress = int(new_status in self.IN_PROGRESS_STATUSES) - int(
+            old_status in self.IN_PROGRESS_STATUSES
+        )
+        resolved = int(new_status == self.SOLVED) - int(old_status == self.SOLVED)
+        if not in_progress and not resolved:
+            return
+
+        officials = MyApiOfficial.objects.filter(assigned_issues=self)
+        officials.update(
+            in_progress_count=models.F("in_progress_count") + in_progress,
+            resolved_count=models.F("resolved_count") + resolved,
+        )
+        if resolved:
+            # The median needs the official's whole resolved set.
+            officials.refresh_stats()
+
     def save(self, *args, **kwargs):
         self.clean()
-        super(Issue, self).save(*args, **kwargs)
+        if self.issue_status == self.SOLVED and self.resolved_at is None:
+            self.resolved_at = timezone.now()
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "resolved_at"}
+        with transaction.atomic():
+            previous = self._previous_state()
+            if previous is None or previous["issue_status"] != self.issue_status:
+                self.due_at = self.deadline_for(self.issue_status, timezone.now())
+                self.escalation_count = 0
+                if kwargs.get("update_fields") is not None:
+                    kwargs["update_fields"] = {
+                        *kwargs["update_fields"],
+                        "due_at",
+                        "escalation_count",
+                    }
+            super(Issue, self).save(*args, **kwargs)
+            self._record_change(previous)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = self._previous_state()
+            official_ids = list(self.official_issues.values_list("id", flat=True))
+            result = super().delete(*args, **kwargs)
+            AreaIssueCount.objects.apply_change(previous, None)
+            MyApiOfficial.objects.filter(id__in=official_ids).refresh_stats()
+        return result
+
+
+class AreaIssueCountManager(models.Manager):
+    def rollup_keys(self, state):
+        """
+        Every (area, status, category) row an issue contributes to, including
+        the ALL rows used for totals.
+        """
+        if not state or state["area_id"] is None:
+            return []
+        statuses = [state["issue_status"], AreaIssueCount.ALL]
+        categories = list(state["categories"]) + [AreaIssueCount.ALL]
+        return [
+            (state["area_id"], status, category)
+            for status in statuses
+            for category in categories
+        ]
+
+    def apply_change(self, previous, current):
+        deltas = Counter()
+        for key in self.rollup_keys(previous):
+            deltas[key] -= 1
+        for key in self.rollup_keys(current):
+            deltas[key] += 1
+
+        # Sorted so concurrent writers lock rows in the same order.
+        rows = sorted((key, delta) for key, delta in deltas.items() if delta)
+        if not rows:
+            return
+
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        placeholders = ", ".join(["(%s, %s, %s, %s)"] * len(rows))
+        params = [value for key, delta in rows for value in (*key, delta)]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (area_id, issue_status, category, issue_count)
+                VALUES {placeholders}
+                ON CONFLICT (area_id, issue_status, category)
+                DO UPDATE SET issue_count = {table}.issue_count + EXCLUDED.issue_count
+                """,
+                params,
+            )
+
+    def rebuild(self, area_ids=None):
+        """Recompute the rollup from Issue with one set-based query."""
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        issue_table = connection.ops.quote_name(Issue._meta.db_table)
+        area_filter = "AND i.area_id = ANY(%s)" if area_ids else ""
+        params = [list(area_ids)] if area_ids else []
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Blocks concurrent increments until the rebuilt rows are committed.
+            cursor.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE")
+            cursor.execute(
+                f"DELETE FROM {table} "
+                + ("WHERE area_id = ANY(%s)" if area_ids else ""),
+                params,
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (area_id, issue_status, category, issue_count)
+                SELECT i.area_id, s.issue_status, c.category, COUNT(*)
+                FROM {issue_table} i
+                CROSS JOIN LATERAL (VALUES (i.issue_status), ('')) AS s(issue_status)
+                CROSS JOIN LATERAL (
+                    SELECT DISTINCT value FROM jsonb_array_elements_text(
+                        CASE WHEN jsonb_typeof(i.categories) = 'array'
+                        THEN i.categories ELSE '[]'::jsonb END
+                    )
+                    UNION ALL SELECT ''
+                ) AS c(category)
+                WHERE i.area_id IS NOT NULL {area_filter}
+                GROUP BY i.area_id, s.issue_status, c.category
+                """,
+                params,
+            )
+            return cursor.rowcount
+
+
+class AreaIssueCount(models.Model):
+    """
+    Issue counts per area, status and category, maintained transactionally
+    by Issue.save/delete. Rows with an ALL status or category hold totals, so
+    "top areas" is an index-ordered scan instead of a GROUP BY over Issue.
+    """
+
+    ALL = ""
+
+    area = models.ForeignKey(
+        AreaLocation, on_delete=models.CASCADE, related_name="issue_counts"
+    )
+    issue_status = models.CharField(max_length=30, blank=True)
+    category = models.CharField(max_length=100, blank=True)
+    issue_count = models.IntegerField(default=0)
+
+    objects = AreaIssueCountManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["area", "issue_status", "category"],
+                name="unique_area_issue_count",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["issue_status", "category", "-issue_count", "area"],
+                name="area_issue_count_top_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.area_id} [{self.issue_status or '*'}/{self.category or '*'}]: {self.issue_count}"
+
+
+class IssueStatsBucketManager(models.Manager):
+    def bucket_start(self, granularity, moment):
+        moment = moment.astimezone(dt_timezone.utc)
+        if granularity == IssueStatsBucket.HOUR:
+            return moment.replace(minute=0, second=0, microsecond=0)
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def record_change(self, issue, previous, current):
+        """
+        Count the created/approved/solved events implied by an issue write
+        into the hourly and daily buckets of every (area, category) it belongs
+        to, including the all-areas (NULL) and all-categories ("") rows.
+        Only an issue's first approval counts, as in record_created. Runs
+        before the history row for this write is added.
+        """
+        if not current:
+            return
+
+        events = []
+        if previous is None:
+            events.append(("created_count", issue.created_at))
+        old_status = previous["issue_status"] if previous else None
+        new_status = current["issue_status"]
+        if new_status != old_status:
+            if new_status == Issue.APPROVED:
+                if previous is None or not issue.status_history.filter(
+                    to_status=Issue.APPROVED
+                ).exists():
+                    events.append(("approved_count", timezone.now()))
+            elif new_status == Issue.SOLVED:
+                events.append(("solved_count", timezone.now()))
+        if not events:
+            return
+
+        areas = [None] if current["area_id"] is None else [current["area_id"], None]
+        categories = list(current["categories"]) + [IssueStatsBucket.ALL]
+
+        rows = sorted(
+            (granularity, self.bucket_start(granularity, moment), area, category, metric)
+            for metric, moment in events
+            for granularity in (IssueStatsBucket.HOUR, IssueStatsBucket.DAY)
+            for area in areas
+            for category in categories
+        )
+        self.increment(rows)
+
+    def record_created(self, issues):
+        """
+        Count the events of newly inserted `issues` (an Issue queryset) that
+        bypassed Issue.save, e.g. bulk loads, with one INSERT ... SELECT.
+        Issues already past moderation count as approved when created, and
+        solved ones as solved at resolved_at.
+        """
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+        issues_sql, issues_params = issues.values("id").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (granularity, bucket_start, area_id, category,
+                                     created_count, approved_count, solved_count)
+                SELECT g.granularity, date_trunc(g.granularity, e.moment, 'UTC'),
+                       a.area_id, c.category,
+                       COUNT(*) FILTER (WHERE e.metric = 'created'),
+                       COUNT(*) FILTER (WHERE e.metric = 'approved'),
+                       COUNT(*) FILTER (WHERE e.metric = 'solved')
+                FROM {quote(Issue._meta.db_table)} i
+                CROSS JOIN LATERAL (VALUES
+                    ('created', i.created_at),
+                    ('approved', CASE WHEN i.issue_status NOT IN (%s, %s)
+                                 THEN i.created_at END),
+                    ('solved', CASE WHEN i.issue_status = %s
+                               THEN i.resolved_at END)
+                ) AS e(metric, moment)
+                CROSS JOIN (VALUES (%s), (%s)) AS g(granularity)
+                CROSS JOIN LATERAL (
+                    SELECT i.area_id UNION ALL SELECT NULL WHERE i.area_id IS NOT NULL
+                ) AS a(area_id)
+                CROSS JOIN LATERAL (
+                    SELECT jsonb_array_elements_text(i.categories) UNION ALL SELECT ''
+                ) AS c(category)
+                WHERE i.id IN ({issues_sql}) AND e.moment IS NOT NULL
+                GROUP BY 1, 2, 3, 4
+                ON CONFLICT (granularity, area_id, category, bucket_start)
+                DO UPDATE SET
+                    created_count = {table}.created_count + EXCLUDED.created_count,
+                    approved_count = {table}.approved_count + EXCLUDED.approved_count,
+                    solved_count = {table}.solved_count + EXCLUDED.solved_count
+                """,
+                [
+                    Issue.NOT_APPROVED,
+                    Issue.REJECTED,
+                    Issue.SOLVED,
+                    IssueStatsBucket.HOUR,
+                    IssueStatsBucket.DAY,
+                    *issues_params,
+                ],
+            )
+            return cursor.rowcount
+
+    def increment(self, rows):
+        """rows: (granularity, bucket_start, area_id, category, metric) tuples."""
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        metrics = ("created_count", "approved_count", "solved_count")
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(rows))
+        params = []
+        for granularity, bucket_start, area_id, category, metric in rows:
+            params.extend([granularity, bucket_start, area_id, category])
+            params.extend(int(metric == name) for name in metrics)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (granularity, bucket_start, area_id, category,
+                                     created_count, approved_count, solved_count)
+                VALUES {placeholders}
+                ON CONFLICT (granularity, area_id, category, bucket_start)
+                DO UPDATE SET
+                    created_count = {table}.created_count + EXCLUDED.created_count,
+                    approved_count = {table}.approved_count + EXCLUDED.approved_count,
+                    solved_count = {table}.solved_count + EXCLUDED.solved_count
+                """,
+                params,
+            )
+
+
+class IssueStatsBucket(models.Model):
+    """
+    Hourly and daily counts of created, approved and solved issues per area
+    and category, updated incrementally from Issue writes. A NULL area or a
+    blank category is the total across that dimension. The unique index is
+    ordered for range scans over bucket_start (NULLS NOT DISTINCT, PostgreSQL
+    15+).
+    """
+
+    HOUR = "hour"
+    DAY = "day"
+    GRANULARITY_CHOICES = [(HOUR, "Hour"), (DAY, "Day")]
+    ALL = ""
+
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField()
+    area = models.ForeignKey(
+        AreaLocation, null=True, blank=True, on_delete=models.CASCADE
+    )
+    category = models.CharField(max_length=100, blank=True)
+    created_count = models.IntegerField(default=0)
+    approved_count = models.IntegerField(default=0)
+    solved_count = models.IntegerField(default=0)
+
+    objects = IssueStatsBucketManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["granularity", "area", "category", "bucket_start"],
+                name="unique_issue_stats_bucket",
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket_start:%Y-%m-%d %H:00}"
+
+
+class IssueStatusHistoryManager(models.Manager):
+    def record_created(self, issues):
+        """
+        Add the creation row of newly inserted `issues` (an Issue queryset)
+        that bypassed Issue.save, e.g. bulk loads: their status, entered at
+        created_at.
+        """
+        quote = connection.ops.quote_name
+        issues_sql, issues_params = issues.values("id").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {quote(self.model._meta.db_table)}
+                    (issue_id, from_status, to_status, changed_at)
+                SELECT i.id, %s, i.issue_status, i.created_at
+                FROM {quote(Issue._meta.db_table)} i
+                WHERE i.id IN ({issues_sql})
+                """,
+                [IssueStatusHistory.CREATED, *issues_params],
+            )
+            return cursor.rowcount
+
+
+class IssueStatusHistory(models.Model):
+    """
+    Append-only log of every status an issue entered and when, written by
+    Issue._record_change in the transaction of the change. The first row of
+    an issue has from_status CREATED.
+    """
+
+    CREATED = ""
+
+    issue = models.ForeignKey(
+        Issue, on_delete=models.CASCADE, related_name="status_history"
+    )
+    from_status = models.CharField(max_length=30, blank=True)
+    to_status = models.CharField(max_length=30, choices=Issue.ISSUE_STATUS)
+    changed_at = models.DateTimeField(default=timezone.now)
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+
+    objects = IssueStatusHistoryManager()
+
+    class Meta:
+        ordering = ["changed_at", "id"]
+        verbose_name_plural = "issue status history"
+        indexes = [
+            models.Index(fields=["issue", "changed_at"], name="status_history_issue_idx"),
+            models.Index(fields=["to_status", "changed_at"], name="status_history_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.issue_id} {self.from_status or 'created'} -> {self.to_status}"
+
+
+class IssueSlaBucketManager(models.Manager):
+    def bucket_for(self, seconds):
+        if seconds <= IssueSlaBucket.BASE_SECONDS:
+            return 0
+        bucket = math.ceil(
+            IssueSlaBucket.BUCKETS_PER_DOUBLING * math.log2(seconds / IssueSlaBucket.BASE_SECONDS)
+        )
+        return min(bucket, IssueSlaBucket.LAST_BUCKET)
+
+    def upper_bound(self, bucket):
+        """Seconds at the top of `bucket` (the last bucket is open-ended)."""
+        return IssueSlaBucket.BASE_SECONDS * 2 ** (bucket / IssueSlaBucket.BUCKETS_PER_DOUBLING)
+
+    def record_change(self, issue, old_status, current):
+        """
+        Count the SLA durations completed by `issue` entering
+        current["issue_status"]: its first approval, or its resolution.
+        """
+        new_status = current["issue_status"]
+        if new_status == Issue.APPROVED and old_status != IssueStatusHistory.CREATED:
+            if issue.status_history.filter(
+                to_status=Issue.APPROVED,
+            ).exclude(from_status=IssueStatusHistory.CREATED).exists():
+                return
+            metric = IssueSlaBucket.APPROVAL
+            seconds = ((issue.updated_at or timezone.now()) - issue.created_at).total_seconds()
+        elif new_status == Issue.SOLVED and issue.resolved_at:
+            metric = IssueSlaBucket.RESOLUTION
+            seconds = (issue.resolved_at - issue.created_at).total_seconds()
+        else:
+            return
+
+        scopes = [(IssueSlaBucket.ALL, "")]
+        if current["area_id"] is not None:
+            scopes.append((IssueSlaBucket.AREA, str(current["area_id"])))
+        scopes += [(IssueSlaBucket.CATEGORY, category) for category in current["categories"]]
+        if metric == IssueSlaBucket.RESOLUTION:
+            scopes += [
+                (IssueSlaBucket.OFFICIAL, str(official_id))
+                for official_id in issue.official_issues.values_list("id", flat=True)
+            ]
+
+        bucket = self.bucket_for(seconds)
+        # Sorted so concurrent writers lock rows in the same order.
+        rows = sorted((metric, scope, key, bucket) for scope, key in scopes)
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        placeholders = ", ".join(["(%s, %s, %s, %s, 1)"] * len(rows))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (metric, scope, scope_key, bucket, issue_count)
+                VALUES {placeholders}
+                ON CONFLICT (metric, scope, scope_key, bucket)
+                DO UPDATE SET issue_count = {table}.issue_count + EXCLUDED.issue_count
+                """,
+                [value for row in rows for value in row],
+            )
+
+    def _aggregate(self, cursor, issues=None):
+        """
+        INSERT the histogram of `issues` (an Issue queryset, default all)
+        computed from the status history, adding to existing rows.
+        """
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+        issue_table = quote(Issue._meta.db_table)
+        history_table = quote(IssueStatusHistory._meta.db_table)
+        assigned = MyApiOfficial._meta.get_field("assigned_issues")
+        issue_filter, params = "", []
+        if issues is not None:
+            issues_sql, params = issues.values("id").query.sql_with_params()
+            issue_filter = f"AND i.id IN ({issues_sql})"
+        cursor.execute(
+            f"""
+            WITH events AS (
+                SELECT %s AS metric, i.id, i.area_id, i.categories,
+                       EXTRACT(EPOCH FROM MIN(h.changed_at) - i.created_at) AS seconds
+                FROM {issue_table} i
+                JOIN {history_table} h ON h.issue_id = i.id
+                WHERE h.to_status = %s AND h.from_status <> %s {issue_filter}
+                GROUP BY i.id
+                UNION ALL
+                SELECT %s, i.id, i.area_id, i.categories,
+                       EXTRACT(EPOCH FROM i.resolved_at - i.created_at)
+                FROM {issue_table} i
+                WHERE i.issue_status = %s AND i.resolved_at IS NOT NULL {issue_filter}
+            ), bucketed AS (
+                SELECT e.*, CASE WHEN e.seconds <= %s THEN 0 ELSE LEAST(
+                    %s, CEIL(%s * LOG(2, (e.seconds / %s)::numeric))
+                )::int END AS bucket
+                FROM events e
+            )
+            INSERT INTO {table} (metric, scope, scope_key, bucket, issue_count)
+            SELECT b.metric, s.scope, s.scope_key, b.bucket, COUNT(*)
+            FROM bucketed b
+            CROSS JOIN LATERAL (
+                SELECT %s, ''
+                UNION ALL SELECT %s, b.area_id::text WHERE b.area_id IS NOT NULL
+                UNION SELECT %s, c.category FROM jsonb_array_elements_text(
+                    CASE WHEN jsonb_typeof(b.categories) = 'array'
+                    THEN b.categories ELSE '[]'::jsonb END
+                ) AS c(category)
+                UNION ALL SELECT %s, a.{quote(assigned.m2m_column_name())}::text
+                FROM {quote(assigned.m2m_db_table())} a
+                WHERE a.{quote(assigned.m2m_reverse_name())} = b.id AND b.metric = %s
+            ) AS s(scope, scope_key)
+            GROUP BY 1, 2, 3, 4
+            ON CONFLICT (metric, scope, scope_key, bucket)
+            DO UPDATE SET issue_count = {table}.issue_count + EXCLUDED.issue_count
+            """,
+            [
+                IssueSlaBucket.APPROVAL,
+                Issue.APPROVED,
+                IssueStatusHistory.CREATED,
+                *params,
+                IssueSlaBucket.RESOLUTION,
+                Issue.SOLVED,
+                *params,
+                IssueSlaBucket.BASE_SECONDS,
+                IssueSlaBucket.LAST_BUCKET,
+                IssueSlaBucket.BUCKETS_PER_DOUBLING,
+                IssueSlaBucket.BASE_SECONDS,
+                IssueSlaBucket.ALL,
+                IssueSlaBucket.AREA,
+                IssueSlaBucket.CATEGORY,
+                IssueSlaBucket.OFFICIAL,
+                IssueSlaBucket.RESOLUTION,
+            ],
+        )
+        return cursor.rowcount
+
+    def record_created(self, issues):
+        """Count newly inserted `issues` that bypassed Issue.save (bulk loads)."""
+        with connection.cursor() as cursor:
+            return self._aggregate(cursor, issues)
+
+    def rebuild(self):
+        """Recompute every histogram from the status history."""
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {connection.ops.quote_name(self.model._meta.db_table)}")
+            return self._aggregate(cursor)
+
+    def summarize(self, metric, scope, scope_key=None, fractions=(0.5, 0.9, 0.95, 0.99)):
+        """
+        {scope_key: {"count": n, "p50": seconds, ...}} for `metric` in `scope`
+        (only `scope_key` when given), estimated from the histogram: exact
+        to within one bucket (~19%), interpolated geometrically inside it.
+        """
+        rows = self.filter(metric=metric, scope=scope, issue_count__gt=0)
+        if scope_key is not None:
+            rows = rows.filter(scope_key=scope_key)
+        histograms = {}
+        for key, bucket, count in rows.order_by("scope_key", "bucket").values_list(
+            "scope_key", "bucket", "issue_count"
+        ):
+            histograms.setdefault(key, []).append((bucket, count))
+        return {
+            key: {"count": sum(count for _, count in buckets), **self._percentiles(buckets, fractions)}
+            for key, buckets in histograms.items()
+        }
+
+    def _percentiles(self, buckets, fractions):
+        total = sum(count for _, count in buckets)
+        result = {}
+        for fraction in fractions:
+            rank = fraction * total
+            seen = 0
+            for bucket, count in buckets:
+                if seen + count >= rank:
+                    break
+                seen += count
+            lower = self.upper_bound(bucket - 1) if bucket else 0
+            if bucket == IssueSlaBucket.LAST_BUCKET:
+                value = lower
+            elif lower == 0:
+                value = self.upper_bound(bucket) * (rank - seen) / count
+            else:
+                value = lower * (self.upper_bound(bucket) / lower) ** ((rank - seen) / count)
+            result[f"p{round(fraction * 100):g}"] = round(value, 1)
+        return result
+
+
+class IssueSlaBucket(models.Model):
+    """
+    Histograms of time to first approval and time to resolution, per area,
+    category and assigned official plus an ALL total, updated incrementally
+    by Issue._record_change. Bucket i holds durations up to
+    BASE_SECONDS * 2 ** (i / BUCKETS_PER_DOUBLING); the last one is
+    open-ended (beyond ~90 days). Percentiles are read from a few dozen
+    rows, never from the history.
+    """
+
+    APPROVAL = "approval"
+    RESOLUTION = "resolution"
+    METRIC_CHOICES = [(APPROVAL, "Time to approval"), (RESOLUTION, "Time to resolution")]
+
+    ALL = "all"
+    AREA = "area"
+    CATEGORY = "category"
+    OFFICIAL = "official"
+    SCOPE_CHOICES = [(ALL, "All"), (AREA, "Area"), (CATEGORY, "Category"), (OFFICIAL, "Official")]
+
+    BASE_SECONDS = 60
+    BUCKETS_PER_DOUBLING = 4
+    LAST_BUCKET = 17 * BUCKETS_PER_DOUBLING
+
+    metric = models.CharField(max_length=10, choices=METRIC_CHOICES)
+    scope = models.CharField(max_length=8, choices=SCOPE_CHOICES)
+    # Area or official id, or category label; blank for ALL.
+    scope_key = models.CharField(max_length=100, blank=True)
+    bucket = models.PositiveSmallIntegerField()
+    issue_count = models.IntegerField(default=0)
+
+    objects = IssueSlaBucketManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["metric", "scope", "scope_key", "bucket"],
+                name="unique_issue_sla_bucket",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} {self.scope}:{self.scope_key or '*'} [{self.bucket}]: {self.issue_count}"
 
 
 class Comment(models.Model):
@@ -457,6 +1537,91 @@ class Notification(models.Model):
         return self.title
 
 
+class OutgoingEmailManager(models.Manager):
+    def enqueue(self, subject, html_body, to, from_email=None):
+        """Queue an HTML email for the send_queued_emails worker."""
+        return self.create(
+            subject=subject,
+            html_body=html_body,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL or settings.EMAIL_HOST_USER,
+            to=list(to),
+        )
+
+    def claim(self, limit, lease_seconds, max_attempts):
+        """
+        Lock up to `limit` due emails with SKIP LOCKED and lease them to the
+        caller for `lease_seconds`. Emails whose worker died mid-send become
+        due again once their lease runs out, until they have been claimed
+        `max_attempts` times; then they are marked failed, so a message that
+        crashes or hangs its worker cannot be retried forever.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            self.filter(
+                status=OutgoingEmail.SENDING,
+                next_attempt_at__lte=now,
+                attempts__gte=max_attempts,
+            ).update(
+                status=OutgoingEmail.FAILED,
+                last_error=f"Lease expired on attempt {max_attempts}",
+            )
+            ids = list(
+                self.select_for_update(skip_locked=True)
+                .filter(
+                    status__in=[OutgoingEmail.PENDING, OutgoingEmail.SENDING],
+                    next_attempt_at__lte=now,
+                    attempts__lt=max_attempts,
+                )
+                .order_by("next_attempt_at")
+                .values_list("id", flat=True)[:limit]
+            )
+            self.filter(id__in=ids).update(
+                status=OutgoingEmail.SENDING,
+                attempts=models.F("attempts") + 1,
+                next_attempt_at=now + timedelta(seconds=lease_seconds),
+            )
+        return list(self.filter(id__in=ids).order_by("next_attempt_at", "id"))
+
+
+class OutgoingEmail(models.Model):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENDING, "Sending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    html_body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    objects = OutgoingEmailManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                name="outgoing_email_due_idx",
+                condition=models.Q(status__in=["pending", "sending"]),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)}"
+
+
 # approve ki patch API -> admin issue ka status approve karega...woh bolega yeh issue legit hai...woh db mein dhoondega ke
 # iss issue ke lat long ke andar konsa official ata hai...
 # woh official jese hi mila...uski id woh nikalega...
@@ -468,3 +1633,96 @@ class Notification(models.Model):
 
 # approve ki api mein app sendNOtification to only the official, ab agar baad mein
 # usko apni list dekhni ho toh woh kia karega? wapis notification mein jayga.
+
+
+class OutboxEventManager(models.Manager):
+    def enqueue(self, kind, issue, payload):
+        """
+        Record a side effect to run after the current transaction commits;
+        call it inside the transaction making the change.
+        """
+        return self.create(kind=kind, issue=issue, payload=payload)
+
+    def claim(self, limit, lease_seconds, max_attempts):
+        """
+        Lock up to `limit` due events with SKIP LOCKED and lease them to the
+        caller for `lease_seconds`, oldest first. Events whose worker died
+        become due again once their lease runs out, until they have been
+        claimed `max_attempts` times; then they are marked failed.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            self.filter(
+                status=OutboxEvent.PROCESSING,
+                next_attempt_at__lte=now,
+                attempts__gte=max_attempts,
+            ).update(
+                status=OutboxEvent.FAILED,
+                last_error=f"Lease expired on attempt {max_attempts}",
+            )
+            ids = list(
+                self.select_for_update(skip_locked=True)
+                .filter(
+                    status__in=[OutboxEvent.PENDING, OutboxEvent.PROCESSING],
+                    next_attempt_at__lte=now,
+                    attempts__lt=max_attempts,
+                )
+                .order_by("next_attempt_at", "id")
+                .values_list("id", flat=True)[:limit]
+            )
+            self.filter(id__in=ids).update(
+                status=OutboxEvent.PROCESSING,
+                attempts=models.F("attempts") + 1,
+                next_attempt_at=now + timedelta(seconds=lease_seconds),
+            )
+        return list(self.filter(id__in=ids).select_related("issue").order_by("id"))
+
+
+class OutboxEvent(models.Model):
+    """
+    A side effect of an issue write, processed by the process_outbox worker
+    after the write committed. Rows are written in the writer's transaction,
+    so an event exists if and only if its change does.
+    """
+
+    ISSUE_STATUS_CHANGED = "issue_status_changed"
+
+    KIND_CHOICES = [
+        (ISSUE_STATUS_CHANGED, "Issue status changed"),
+    ]
+
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (PROCESSING, "Processing"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=40, choices=KIND_CHOICES)
+    issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name="outbox_events")
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    objects = OutboxEventManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                name="outbox_event_due_idx",
+                condition=models.Q(status__in=["pending", "processing"]),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.issue_id} ({self.status})"
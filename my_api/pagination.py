@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class IssueCursorPagination(CursorPagination):
+    """
+    Keyset pagination for large issue lists. Stable under concurrent inserts
+    and never runs a COUNT or a large OFFSET.
+    """
+
+    page_size = 25
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
@@ -0,0 +1,166 @@
+"""
+Cluster-wide token bucket shared by every worker through Redis.
+
+Used by http_client to keep Nominatim/Overpass within their usage policy.
+Callers run at INTERACTIVE priority unless they opt into BATCH with
+`rate_limit_priority(BATCH)`. Interactive callers that are waiting register
+themselves in a sorted set, and batch callers never take a token while that
+set is non-empty, so a backfill cannot starve request handling. Every caller
+waits for a token until its deadline and then gets `RateLimitTimeout`.
+
+If Redis is unreachable the limiter falls back to a per-process bucket.
+"""
+
+import contextvars
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import redis
+import requests
+
+from .redis_client import get_redis
+
+INTERACTIVE = 0
+BATCH = 1
+
+DEFAULT_DEADLINES = {INTERACTIVE: 5.0, BATCH: 600.0}
+
+_priority = contextvars.ContextVar("rate_limit_priority", default=INTERACTIVE)
+_deadline = contextvars.ContextVar("rate_limit_deadline", default=None)
+
+# KEYS[1] bucket hash, KEYS[2] waiting interactive callers (zset, score = expiry)
+# ARGV: rate (tokens/s), capacity, priority, waiter id, waiter ttl (ms)
+# Returns 0 when a token was taken, otherwise the suggested wait in ms.
+TOKEN_BUCKET_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local priority = tonumber(ARGV[3])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000)
+
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+local waiting = redis.call('ZCARD', KEYS[2])
+
+local wait_ms = 0
+if tokens >= 1 and (priority == 0 or waiting == 0) then
+    tokens = tokens - 1
+    if priority == 0 then
+        redis.call('ZREM', KEYS[2], ARGV[4])
+    end
+else
+    if priority == 0 then
+        redis.call('ZADD', KEYS[2], now + tonumber(ARGV[5]), ARGV[4])
+    end
+    wait_ms = math.max(math.ceil((1 - tokens) * 1000 / rate), 1)
+    if tokens >= 1 then
+        -- batch caller yielding to waiting interactive callers
+        wait_ms = math.ceil(1000 / rate)
+    end
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+redis.call('PEXPIRE', KEYS[2], 600000)
+return wait_ms
+"""
+
+
+class RateLimitTimeout(requests.exceptions.RequestException):
+    """No token could be acquired before the caller's deadline."""
+
+
+@contextmanager
+def rate_limit_priority(priority, deadline=None):
+    """
+    Run outbound calls in this block at `priority`, waiting at most `deadline`
+    seconds per call (defaults to DEFAULT_DEADLINES[priority]).
+    """
+    priority_token = _priority.set(priority)
+    deadline_token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _priority.reset(priority_token)
+        _deadline.reset(deadline_token)
+
+
+class _LocalBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return max(int((1 - self.tokens) * 1000 / self.rate), 1)
+
+
+class DistributedRateLimiter:
+    def __init__(self, name, rate, capacity=1):
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = capacity
+        self.bucket_key = f"ratelimit:{name}:bucket"
+        self.waiting_key = f"ratelimit:{name}:waiting"
+        self._local = _LocalBucket(self.rate, capacity)
+        self._script = None
+
+    def acquire(self, priority=None, deadline=None):
+        """
+        Block until a token is available. Raises RateLimitTimeout when the
+        deadline (seconds) passes first.
+        """
+        if priority is None:
+            priority = _priority.get()
+        if deadline is None:
+            deadline = _deadline.get() or DEFAULT_DEADLINES[priority]
+
+        waiter_id = uuid.uuid4().hex
+        expires_at = time.monotonic() + deadline
+        while True:
+            remaining = expires_at - time.monotonic()
+            wait_ms = self._try_acquire(priority, waiter_id, remaining)
+            if wait_ms == 0:
+                return
+
+            if wait_ms / 1000 > remaining:
+                raise RateLimitTimeout(
+                    f"{self.name} rate limit: no token within {deadline}s"
+                )
+            time.sleep(wait_ms / 1000)
+
+    def _try_acquire(self, priority, waiter_id, remaining):
+        try:
+            if self._script is None:
+                self._script = get_redis().register_script(TOKEN_BUCKET_SCRIPT)
+            return int(
+                self._script(
+                    keys=[self.bucket_key, self.waiting_key],
+                    args=[
+                        self.rate,
+                        self.capacity,
+                        priority,
+                        waiter_id,
+                        max(int(remaining * 1000), 1),
+                    ],
+                )
+            )
+        except redis.exceptions.RedisError:
+            return self._local.try_acquire()
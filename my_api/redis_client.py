@@ -0,0 +1,15 @@
+from django.conf import settings
+
+import redis
+
+_client = None
+
+
+def get_redis():
+    """Process-wide Redis client (connection pooled) for REDIS_URL."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+    return _client
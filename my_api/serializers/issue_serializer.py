@@ -1,4 +1,12 @@
-from .common import Exists, Issue, Like, OuterRef, serializers
+from .common import (
+    Exists,
+    Issue,
+    Like,
+    OuterRef,
+    encode_geometry,
+    serializers,
+    wants_compact_geometry,
+)
 from django.core.validators import MinLengthValidator
 from rest_framework.exceptions import ValidationError
 
@@ -41,6 +49,12 @@ class IssueSerializer(serializers.ModelSerializer):
             "profile_image": obj.user.profile_image,
         }
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if wants_compact_geometry(self.context.get("request")):
+            data["location"] = encode_geometry(instance.location)
+        return data
+
     def get_is_liked(self, obj):
         user = self.context["request"].user
         return getattr(obj, "is_liked", False)
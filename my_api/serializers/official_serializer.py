@@ -8,11 +8,21 @@ class OfficialSerializer(serializers.ModelSerializer):
         fields = [
             "id",
             "user",
-            "assigned_issues",
             "area_range",
             "city_name",
             "country_name",
             "district_name",
             "country_code",
+            "assigned_count",
+            "in_progress_count",
+            "resolved_count",
+            "median_resolution_seconds",
+        ]
+        read_only_fields = [
+            "area_range",
+            "country_code",
+            "assigned_count",
+            "in_progress_count",
+            "resolved_count",
+            "median_resolution_seconds",
         ]
-        read_only_fields = ["area_range", "country_code"]
@@ -0,0 +1,178 @@
+"""
+Shared fixtures for the my_api test suites (tests.py).
+
+ApiTestCase seeds more rows than one page of every list endpoint, runs on an
+in-memory cache, and mocks out the external services (Nominatim, Overpass,
+Gemini, FCM, the channel layer) and the Redis throttles, so the suites only
+touch PostGIS.
+"""
+
+from unittest import mock
+
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.core.cache import cache
+from django.test import override_settings
+
+from my_api.models import (
+    AreaIssueCount,
+    AreaLocation,
+    Comment,
+    DeviceToken,
+    Issue,
+    Like,
+    MyApiOfficial,
+    MyApiUser,
+    Notification,
+)
+
+from rest_framework.test import APITestCase
+
+ISSUE_COUNT = 30
+COMMENT_COUNT = 30
+ORIGIN = (67.0011, 24.8607)
+
+EXTERNAL_SERVICE_PATCHES = (
+    ("my_api.management.commands.process_outbox.send_push_notification", {}),
+    ("my_api.models.get_district_boundary", {"return_value": None}),
+    ("my_api.views.issues_viewset.send_push_notification", {}),
+    ("my_api.views.issues_viewset.fetch_boundary_from_overpass", {}),
+    ("my_api.views.issues_viewset.get_cached_emergency_contact", {"return_value": {}}),
+    ("my_api.views.comments_viewset.get_channel_layer", {"return_value": None}),
+    ("my_api.throttling._sliding_window_hit", {"return_value": (True, 0)}),
+)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class ApiTestCase(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.patches = [
+            mock.patch(target, **kwargs) for target, kwargs in EXTERNAL_SERVICE_PATCHES
+        ]
+        for patcher in cls.patches:
+            patcher.start()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for patcher in cls.patches:
+            patcher.stop()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = MyApiUser.objects.create_user(
+            "user@example.com", "user", password="password", verified=True
+        )
+        cls.other_user = MyApiUser.objects.create_user(
+            "other@example.com", "other", password="password", verified=True
+        )
+        cls.admin = MyApiUser.objects.create_user(
+            "admin@example.com", "admin", password="password", role=MyApiUser.ADMIN
+        )
+        cls.official_user = MyApiUser.objects.create_user(
+            "official@example.com",
+            "official",
+            password="password",
+            role=MyApiUser.OFFICIAL,
+        )
+
+        x, y = ORIGIN
+        square = Polygon.from_bbox((x - 0.05, y - 0.05, x + 0.05, y + 0.05))
+        square.srid = 4326
+        cls.area = AreaLocation.objects.create(
+            name="Saddar",
+            city_name="Karachi",
+            country="Pakistan",
+            boundary=MultiPolygon(square, srid=4326),
+        )
+
+        cls.issues = []
+        for index in range(ISSUE_COUNT):
+            owner = cls.user if index % 2 else cls.other_user
+            cls.issues.append(
+                Issue.objects.create(
+                    title=f"Issue number {index}",
+                    description="Seeded issue for the API tests",
+                    user=owner,
+                    location=Point(x + index * 0.001, y, srid=4326),
+                    categories=["Water", "Roads & Potholes"],
+                    images=[],
+                    issue_status=Issue.APPROVED,
+                    area=cls.area,
+                )
+            )
+        cls.issue = cls.issues[0]
+        cls.pending_issue = Issue.objects.create(
+            title="Pending approval",
+            description="Seeded issue awaiting admin approval",
+            user=cls.user,
+            location=Point(x, y + 0.01, srid=4326),
+            categories=["Waste"],
+            images=[],
+            area=cls.area,
+        )
+
+        Like.objects.bulk_create(
+            [Like(user=cls.user, issue=issue) for issue in cls.issues]
+        )
+
+        comments = Comment.objects.bulk_create(
+            [
+                Comment(
+                    user=cls.other_user, issue=cls.issue, content=f"Comment {index}"
+                )
+                for index in range(COMMENT_COUNT)
+            ]
+        )
+        Comment.objects.bulk_create(
+            [
+                Comment(
+                    user=cls.user,
+                    issue=cls.issue,
+                    parent=comment,
+                    reply_to=cls.other_user,
+                    content=f"Reply to {comment.content}",
+                )
+                for comment in comments
+            ]
+        )
+        cls.comment = comments[0]
+        Like.objects.bulk_create(
+            [Like(user=cls.user, comment=comment) for comment in comments[1:]]
+        )
+
+        Notification.objects.bulk_create(
+            [
+                Notification(
+                    user=cls.user,
+                    screen_id=cls.issue.id,
+                    title=f"Notification {index}",
+                    description="Seeded notification",
+                )
+                for index in range(ISSUE_COUNT)
+            ]
+        )
+
+        cls.official = MyApiOfficial.objects.create(
+            user=cls.official_user, area_range=square
+        )
+        # Enough officials for a full page, covering a different area.
+        elsewhere = Polygon.from_bbox((x + 1, y + 1, x + 1.1, y + 1.1))
+        elsewhere.srid = 4326
+        for index in range(ISSUE_COUNT):
+            other = MyApiUser.objects.create_user(
+                f"official{index}@example.com",
+                f"official{index}",
+                password="password",
+                role=MyApiUser.OFFICIAL,
+            )
+            MyApiOfficial.objects.create(user=other, area_range=elsewhere)
+
+        DeviceToken.objects.register(cls.user, "seeded-device-token")
+        AreaIssueCount.objects.rebuild()
+
+    def setUp(self):
+        cache.clear()
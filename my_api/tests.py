@@ -1,3 +1,1546 @@
-from django.test import TestCase
+"""
+Tests for the my_api endpoints, models and workers. The fixture data and the
+external service mocks live in testing.py.
 
-# Create your tests here.
+The *BudgetTests hold every endpoint to a query-count and wall-clock budget.
+The fixture seeds more rows than one page, so an N+1 in a serializer or a
+missing select_related/prefetch blows the budget instead of adding one query.
+Requests are force-authenticated, so the budgets exclude the user lookup (see
+CachedJWTAuthentication).
+
+When a budget is exceeded the failure shows a diff of the captured SQL: the
+queries the budget allows versus everything that ran, with repeated
+statements (the usual N+1 signature) counted.
+
+Set QUERY_BUDGET_TIME_FACTOR to scale the wall-clock budgets on slow machines.
+"""
+
+import csv
+import difflib
+import io
+import json
+import os
+import re
+import tempfile
+import time
+from collections import Counter
+from datetime import timedelta
+from unittest import mock
+
+from django.apps import apps
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+import redis
+import requests
+from asgiref.sync import async_to_sync
+from firebase_admin import exceptions as firebase_exceptions
+from firebase_admin import messaging
+
+from my_api import db_routers, export, metrics, utils
+from my_api.apps import simplify_missing_boundaries
+from my_api.bulk_import import (
+    BulkImportError,
+    IssueImporter,
+    iter_geojson_features,
+    validate_row,
+)
+from my_api.geometry import decode_polyline, encode_geometry, encode_polyline
+from my_api.http_client import CircuitBreaker, OutboundService
+from my_api.management.commands.load_emergency_services import (
+    Command as LoadEmergencyServicesCommand,
+)
+from my_api.management.commands.seed_data import copy_value
+from my_api.models import (
+    AreaIssueCount,
+    AreaLocation,
+    Comment,
+    DeviceToken,
+    EmergencyService,
+    Issue,
+    IssueSlaBucket,
+    IssueStatsBucket,
+    IssueStatusConflict,
+    IssueStatusHistory,
+    Like,
+    MyApiOfficial,
+    Notification,
+    OutboxEvent,
+    OutgoingEmail,
+)
+from my_api.rate_limit import (
+    BATCH,
+    INTERACTIVE,
+    DistributedRateLimiter,
+    RateLimitTimeout,
+    rate_limit_priority,
+)
+from my_api.testing import ISSUE_COUNT, ORIGIN, ApiTestCase
+from my_api.throttling import IPSlidingWindowThrottle
+from my_api.utils import parse_osm_element, truncate_phone
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+
+TIME_FACTOR = float(os.getenv("QUERY_BUDGET_TIME_FACTOR", 1.0))
+DEFAULT_TIME_BUDGET = 1.0
+
+
+def normalize_sql(sql):
+    sql = re.sub(r"'(?:[^']|'')*'", "'?'", sql)
+    sql = re.sub(r"\b\d+(?:\.\d+)?\b", "?", sql)
+    return sql
+
+
+def format_query_report(captured, budget):
+    statements = [query["sql"] for query in captured]
+    diff = difflib.unified_diff(
+        statements[:budget],
+        statements,
+        fromfile=f"budget ({budget} queries)",
+        tofile=f"captured ({len(statements)} queries)",
+        lineterm="",
+        n=budget,
+    )
+    repeated = [
+        f"  x{count}  {sql}"
+        for sql, count in Counter(
+            normalize_sql(sql) for sql in statements
+        ).most_common()
+        if count > 1
+    ]
+    report = "\n".join(diff)
+    if repeated:
+        report += "\n\nRepeated statements:\n" + "\n".join(repeated)
+    return report
+
+
+class QueryBudgetTestCase(ApiTestCase):
+    def assertBudget(
+        self,
+        method,
+        url,
+        queries,
+        user,
+        data=None,
+        status_code=200,
+        seconds=DEFAULT_TIME_BUDGET,
+        format="json",
+    ):
+        self.client.force_authenticate(user)
+        request = getattr(self.client, method)
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = request(url, data, format=format)
+            if response.streaming:
+                # Streamed rows are read as the client consumes the body.
+                response.streaming_content = list(response.streaming_content)
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(
+            response.status_code,
+            status_code,
+            f"{method.upper()} {url}: {response.content[:500]!r}",
+        )
+        if len(captured) > queries:
+            self.fail(
+                f"{method.upper()} {url} ran {len(captured)} queries, "
+                f"budget is {queries}\n{format_query_report(captured, queries)}"
+            )
+        if elapsed > seconds * TIME_FACTOR:
+            self.fail(
+                f"{method.upper()} {url} took {elapsed:.3f}s, "
+                f"budget is {seconds * TIME_FACTOR:.3f}s"
+            )
+        return response
+
+
+class IssueViewSetBudgetTests(QueryBudgetTestCase):
+    def test_list(self):
+        self.assertBudget("get", "/api/issues/", 3, self.user)
+
+    def test_list_filtered(self):
+        self.assertBudget(
+            "get",
+            "/api/issues/?issue_status=approved&categories=Water&search=Issue",
+            3,
+            self.user,
+        )
+
+    def test_list_served_from_cache(self):
+        self.assertBudget("get", "/api/issues/", 3, self.user)
+        self.assertBudget("get", "/api/issues/", 0, self.user)
+
+    def test_retrieve(self):
+        self.assertBudget("get", f"/api/issues/{self.issue.id}/", 3, self.user)
+
+    def test_my(self):
+        self.assertBudget("get", "/api/issues/my/", 3, self.user)
+
+    def test_my_official_issues(self):
+        self.assertBudget(
+            "get", "/api/issues/my_official_issues/", 4, self.official_user
+        )
+
+    def test_nearby(self):
+        x, y = ORIGIN
+        self.assertBudget(
+            "get",
+            f"/api/issues/nearby/?latitude={y}&longitude={x}&distance=5000",
+            3,
+            self.user,
+        )
+
+    def test_locations(self):
+        self.assertBudget("get", "/api/issues/locations/", 2, self.user)
+
+    def test_liked_issues(self):
+        self.assertBudget("get", "/api/issues/liked_issues/", 5, self.user)
+
+    def test_in_area(self):
+        self.assertBudget(
+            "get", "/api/issues/in-area/?area_name=Saddar&zoom=11", 5, self.user
+        )
+
+    def test_area_counts(self):
+        self.assertBudget("get", "/api/issues/area-counts/", 3, self.user)
+
+    def test_officials(self):
+        self.assertBudget(
+            "get", f"/api/issues/{self.issue.id}/officials/", 4, self.user
+        )
+
+    def test_like_and_unlike(self):
+        issue = self.issues[2]
+        self.assertBudget(
+            "post",
+            f"/api/issues/{issue.id}/like/",
+            15,
+            self.other_user,
+            status_code=201,
+        )
+        self.assertBudget("post", f"/api/issues/{issue.id}/like/", 15, self.other_user)
+
+    def test_create(self):
+        address = {
+            "suburb": self.area.name,
+            "city": self.area.city_name,
+            "country": self.area.country,
+        }
+        with mock.patch(
+            "my_api.views.issues_viewset.reverse_geocode", return_value=address
+        ):
+            self.assertBudget(
+                "post",
+                "/api/issues/",
+                20,
+                self.user,
+                data={
+                    "title": "Broken street light",
+                    "description": "The street light has been out for a week",
+                    "categories": ["Street Lighting"],
+                    "images": [],
+                    "latitude": ORIGIN[1] + 0.02,
+                    "longitude": ORIGIN[0] - 0.02,
+                },
+                status_code=201,
+            )
+
+    def test_change_status(self):
+        self.assertBudget(
+            "patch",
+            f"/api/issues/{self.issues[3].id}/change-status/",
+            15,
+            self.admin,
+            data={"new_status": Issue.SOLVING},
+        )
+
+    def test_change_status_approve(self):
+        self.assertBudget(
+            "patch",
+            f"/api/issues/{self.pending_issue.id}/change-status/",
+            15,
+            self.admin,
+            data={"new_status": Issue.APPROVED},
+        )
+
+    def test_destroy(self):
+        self.assertBudget(
+            "delete",
+            f"/api/issues/{self.issues[4].id}/",
+            25,
+            self.admin,
+            status_code=204,
+        )
+
+    def test_update(self):
+        # PUT requires both the user and the admin role, so it is refused
+        # before the issue is loaded.
+        self.assertBudget(
+            "put",
+            f"/api/issues/{self.issues[1].id}/",
+            0,
+            self.user,
+            data={"title": "Updated issue title"},
+            status_code=403,
+        )
+
+    def test_partial_update(self):
+        self.assertBudget(
+            "patch",
+            f"/api/issues/{self.issues[1].id}/",
+            4,
+            self.user,
+            data={"title": "Updated issue title"},
+        )
+
+    def test_approve(self):
+        self.assertBudget(
+            "patch", f"/api/issues/{self.pending_issue.id}/approve/", 13, self.admin
+        )
+
+    def test_complete(self):
+        self.assertBudget(
+            "patch", f"/api/issues/{self.issues[1].id}/complete/", 11, self.user
+        )
+
+    def test_official_area_issues(self):
+        self.assertBudget(
+            "get", "/api/issues/official-area-issues/", 3, self.official_user
+        )
+
+    def test_emergency_contact(self):
+        x, y = ORIGIN
+        EmergencyService.objects.create(
+            osm_id=1,
+            tag_key="man_made",
+            tag_value="water_works",
+            name="Saddar Water Works",
+            location=Point(x + 0.002, y + 0.002, srid=4326),
+        )
+        response = self.assertBudget(
+            "get", f"/api/issues/{self.issue.id}/emergency-contact/", 2, self.user
+        )
+        self.assertEqual(response.json()["data"]["name"], "Saddar Water Works")
+
+    def test_export(self):
+        self.assertBudget(
+            "get", "/api/issues/export/?export_format=csv", 2, self.official_user
+        )
+
+    def test_bulk_import(self):
+        x, y = ORIGIN
+        upload = SimpleUploadedFile(
+            "issues.csv",
+            (
+                "title,description,categories,latitude,longitude\n"
+                f"Broken lamp,Lamp out for a week,Street Lighting,{y + 0.02},{x - 0.02}\n"
+                f"Overflowing bin,Not collected for days,Waste,{y - 0.02},{x + 0.02}\n"
+            ).encode(),
+        )
+        # Constant in the number of rows: set-based statements per batch.
+        self.assertBudget(
+            "post",
+            "/api/issues/bulk-import/",
+            27,
+            self.admin,
+            data={"file": upload},
+            format="multipart",
+            status_code=201,
+        )
+
+
+class CommentViewSetBudgetTests(QueryBudgetTestCase):
+    def test_list(self):
+        self.assertBudget(
+            "get", f"/api/comments/?issueId={self.issue.id}", 5, self.user
+        )
+
+    def test_retrieve(self):
+        self.assertBudget("get", f"/api/comments/{self.comment.id}/", 4, self.user)
+
+    def test_create(self):
+        self.assertBudget(
+            "post",
+            "/api/comments/",
+            12,
+            self.user,
+            data={"issueId": self.issue.id, "content": "Same problem on my street"},
+            status_code=201,
+        )
+
+    def test_like(self):
+        self.assertBudget(
+            "post",
+            f"/api/comments/{self.comment.id}/like/",
+            10,
+            self.user,
+            status_code=201,
+        )
+
+
+class NotificationViewSetBudgetTests(QueryBudgetTestCase):
+    def test_list(self):
+        self.assertBudget("get", "/api/notifications/", 3, self.user)
+
+    def test_my(self):
+        self.assertBudget("get", "/api/notifications/my/", 3, self.user)
+
+
+class OfficialViewSetBudgetTests(QueryBudgetTestCase):
+    def test_list(self):
+        self.assertBudget("get", "/api/officials/", 3, self.admin)
+
+    def test_retrieve(self):
+        self.assertBudget("get", f"/api/officials/{self.official.id}/", 2, self.user)
+
+    def test_leaderboard(self):
+        self.assertBudget("get", "/api/officials/leaderboard/", 3, self.user)
+
+    def test_issues(self):
+        self.assertBudget(
+            "get", f"/api/officials/{self.official.id}/issues/", 3, self.user
+        )
+
+
+class UserViewSetBudgetTests(QueryBudgetTestCase):
+    def test_list(self):
+        self.assertBudget("get", "/api/users/", 3, self.admin)
+
+    def test_profile(self):
+        self.assertBudget("get", "/api/users/profile/", 1, self.user)
+
+    def test_retrieve(self):
+        self.assertBudget("get", f"/api/users/{self.user.id}/", 2, self.user)
+
+    def test_fcmtoken(self):
+        self.assertBudget(
+            "patch",
+            "/api/users/fcmtoken/",
+            2,
+            self.user,
+            data={"token": "new-device-token"},
+        )
+
+
+class QueryReportTests(SimpleTestCase):
+    def test_report_counts_repeated_statements(self):
+        captured = [
+            {"sql": 'SELECT * FROM "my_api_issue" LIMIT 25'},
+            {"sql": 'SELECT * FROM "my_api_myapiuser" WHERE "id" = 1'},
+            {"sql": 'SELECT * FROM "my_api_myapiuser" WHERE "id" = 2'},
+        ]
+        report = format_query_report(captured, 1)
+        self.assertIn('+SELECT * FROM "my_api_myapiuser" WHERE "id" = 2', report)
+        self.assertIn('x2  SELECT * FROM "my_api_myapiuser" WHERE "id" = ?', report)
+
+
+class AsyncReadViewTests(ApiTestCase):
+    """The /api/async/ endpoints return what their sync twins return."""
+
+    def get_both(self, path, user):
+        token = str(RefreshToken.for_user(user).access_token)
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        sync_response = self.client.get(f"/api/{path}", **headers)
+        cache.clear()
+        async_response = async_to_sync(self.async_client.get)(
+            f"/api/async/{path}", **headers
+        )
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.json(), sync_response.json())
+        return async_response
+
+    def test_list(self):
+        self.get_both("issues/?page=2", self.user)
+
+    def test_retrieve(self):
+        with mock.patch(
+            "my_api.views.async_views.aget_cached_emergency_contact", return_value={}
+        ):
+            self.get_both(f"issues/{self.issue.id}/", self.user)
+
+    def test_retrieve_missing(self):
+        self.get_both("issues/999999/", self.user)
+
+    def test_nearby(self):
+        x, y = ORIGIN
+        self.get_both(
+            f"issues/nearby/?latitude={y}&longitude={x}&distance=5000", self.user
+        )
+
+    def test_locations(self):
+        self.get_both("issues/locations/?status=approved", self.user)
+
+    def test_my_notifications(self):
+        self.get_both("notifications/my/", self.user)
+
+    def test_requires_authentication(self):
+        response = async_to_sync(self.async_client.get)("/api/async/notifications/my/")
+        self.assertEqual(response.status_code, 401)
+
+
+class RequestMetricsTests(ApiTestCase):
+    """
+    Under ASGI the middleware runs on the event loop while queries run on
+    sync_to_async threads, each with its own database connection.
+    """
+
+    async def get_counted(self, path, endpoint, **headers):
+        with mock.patch.object(metrics.REQUEST_SQL_QUERIES, "observe") as observe:
+            response = await self.async_client.get(path, **headers)
+        self.assertEqual(response.status_code, 200)
+        observe.assert_called_once()
+        labels, queries = observe.call_args.args
+        self.assertEqual(labels, (endpoint, "GET"))
+        return queries
+
+    async def test_sync_view_queries_are_counted(self):
+        self.assertGreater(await self.get_counted("/api/issues/", "issues-list"), 0)
+
+    async def test_async_orm_queries_are_counted(self):
+        token = str(RefreshToken.for_user(self.user).access_token)
+        queries = await self.get_counted(
+            "/api/async/issues/",
+            "async-issues-list",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+        self.assertGreater(queries, 0)
+
+
+@override_settings(REPLICA_DATABASES=["replica1"], REPLICA_MAX_LAG_SECONDS=2)
+class ReplicaRoutingTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        db_routers._replica_health.clear()
+
+    def choose(self, lag):
+        with mock.patch("my_api.db_routers.replication_lag", return_value=lag):
+            return db_routers.choose_read_alias(self.user)
+
+    def test_healthy_replica_serves_reads(self):
+        self.assertEqual(self.choose(0.5), "replica1")
+
+    def test_lagging_or_unreachable_replica_falls_back_to_primary(self):
+        self.assertIsNone(self.choose(30))
+        db_routers._replica_health.clear()
+        self.assertIsNone(self.choose(None))
+
+    def test_writes_pin_the_user_to_the_primary(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(f"/api/issues/{self.issue.id}/like/", format="json")
+        self.assertLess(response.status_code, 400)
+        self.assertIsNone(self.choose(0))
+        self.assertEqual(db_routers.choose_read_alias(self.other_user), "replica1")
+
+    def outside_transaction(self):
+        # APITestCase wraps every test in atomic(), which alone keeps reads
+        # on the primary; pretend the request runs in autocommit.
+        return mock.patch.object(
+            connections[DEFAULT_DB_ALIAS], "in_atomic_block", False
+        )
+
+    def test_reads_in_a_transaction_stay_on_the_primary(self):
+        router = db_routers.ReplicaRouter()
+        with db_routers.read_from("replica1"):
+            with self.outside_transaction():
+                self.assertEqual(router.db_for_read(Issue), "replica1")
+            with mock.patch.object(
+                connections[DEFAULT_DB_ALIAS], "in_atomic_block", True
+            ):
+                self.assertEqual(router.db_for_read(Issue), DEFAULT_DB_ALIAS)
+
+    def routed_reads(self, method, url):
+        """Aliases the router picked for the request's reads."""
+        routed = []
+        db_for_read = db_routers.ReplicaRouter.db_for_read
+
+        def spy(router, model, **hints):
+            with self.outside_transaction():
+                routed.append(db_for_read(router, model, **hints))
+            # The test database has no replica to run the query on.
+            return DEFAULT_DB_ALIAS
+
+        self.client.force_authenticate(self.user)
+        with mock.patch("my_api.mixins.choose_read_alias", return_value="replica1"):
+            with mock.patch.object(db_routers.ReplicaRouter, "db_for_read", spy):
+                response = getattr(self.client, method)(url, format="json")
+        self.assertLess(response.status_code, 400)
+        return routed
+
+    def test_replica_read_actions_read_from_the_replica(self):
+        self.assertEqual(set(self.routed_reads("get", "/api/issues/")), {"replica1"})
+
+    def test_other_actions_read_from_the_primary(self):
+        for method, url in [
+            ("get", f"/api/issues/{self.issue.id}/"),
+            ("post", f"/api/issues/{self.issues[2].id}/like/"),
+        ]:
+            self.assertEqual(set(self.routed_reads(method, url)), {DEFAULT_DB_ALIAS})
+
+
+class IssueStatusOutboxTests(ApiTestCase):
+    def change_status(self, issue, new_status, user=None):
+        self.client.force_authenticate(user or self.admin)
+        return self.client.patch(
+            f"/api/issues/{issue.id}/change-status/",
+            {"new_status": new_status},
+            format="json",
+        )
+
+    def test_stale_transition_is_rejected(self):
+        first = Issue.objects.get(pk=self.pending_issue.pk)
+        second = Issue.objects.get(pk=self.pending_issue.pk)
+        first.change_status(Issue.APPROVED)
+        with self.assertRaises(IssueStatusConflict):
+            second.change_status(Issue.REJECTED)
+        self.assertEqual(
+            Issue.objects.get(pk=self.pending_issue.pk).issue_status, Issue.APPROVED
+        )
+        self.assertEqual(self.pending_issue.outbox_events.count(), 1)
+
+    def test_side_effects_run_once_from_the_outbox(self):
+        response = self.change_status(self.pending_issue, Issue.APPROVED)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(
+            Notification.objects.filter(screen_id=self.pending_issue.id).exists()
+        )
+
+        call_command("process_outbox", "--once", stdout=io.StringIO())
+        call_command("process_outbox", "--once", stdout=io.StringIO())
+
+        event = self.pending_issue.outbox_events.get()
+        self.assertEqual(event.status, OutboxEvent.DONE)
+        self.assertTrue(
+            self.official.assigned_issues.filter(pk=self.pending_issue.pk).exists()
+        )
+        self.assertEqual(
+            Notification.objects.filter(
+                user=self.user,
+                screen_id=self.pending_issue.id,
+                title="Issue Status Updated",
+            ).count(),
+            1,
+        )
+        self.assertEqual(
+            Notification.objects.filter(
+                user=self.official_user, screen_id=self.pending_issue.id
+            ).count(),
+            1,
+        )
+
+    def test_events_whose_worker_keeps_dying_end_up_failed(self):
+        self.pending_issue.change_status(Issue.APPROVED)
+        event = self.pending_issue.outbox_events.get()
+        for _ in range(3):
+            self.assertEqual(
+                [claimed.id for claimed in OutboxEvent.objects.claim(10, 0, 3)],
+                [event.id],
+            )
+        self.assertEqual(OutboxEvent.objects.claim(10, 0, 3), [])
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxEvent.FAILED)
+        self.assertEqual(event.attempts, 3)
+
+    def test_official_solved_waits_for_the_user(self):
+        self.change_status(self.issues[5], Issue.SOLVING)
+        response = self.change_status(
+            self.issues[5], Issue.OFFICIAL_SOLVED, self.official_user
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            Issue.objects.get(pk=self.issues[5].pk).issue_status,
+            Issue.PENDING_USER_CONFIRMATION,
+        )
+
+
+class IssueSlaTests(ApiTestCase):
+    def test_transitions_are_recorded_in_history(self):
+        issue = self.pending_issue
+        issue.change_status(Issue.APPROVED, changed_by=self.admin)
+        issue.change_status(Issue.SOLVING, changed_by=self.official_user)
+        self.assertEqual(
+            list(
+                issue.status_history.values_list(
+                    "from_status", "to_status", "changed_by"
+                )
+            ),
+            [
+                (IssueStatusHistory.CREATED, Issue.NOT_APPROVED, None),
+                (Issue.NOT_APPROVED, Issue.APPROVED, self.admin.id),
+                (Issue.APPROVED, Issue.SOLVING, self.official_user.id),
+            ],
+        )
+
+    def test_percentiles_are_maintained_incrementally(self):
+        issue = self.pending_issue
+        Issue.objects.filter(pk=issue.pk).update(
+            created_at=timezone.now() - timedelta(hours=2)
+        )
+        issue.refresh_from_db()
+        issue.change_status(Issue.APPROVED)
+        issue.change_status(Issue.REJECTED)
+        issue.change_status(Issue.APPROVED)
+
+        approval = IssueSlaBucket.objects.summarize(
+            IssueSlaBucket.APPROVAL, IssueSlaBucket.ALL
+        )
+        self.assertEqual(approval[""]["count"], 1)
+        self.assertAlmostEqual(approval[""]["p50"], 7200, delta=7200 * 0.2)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(
+            f"/api/analytics/sla/?metric=approval&scope=area&key={self.area.id}"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["approval"]["count"], 1)
+
+    def test_rebuild_matches_incremental_counts(self):
+        issue = self.pending_issue
+        issue.change_status(Issue.APPROVED)
+        fields = ("metric", "scope", "scope_key", "bucket", "issue_count")
+        before = set(IssueSlaBucket.objects.values_list(*fields))
+        call_command("rebuild_sla_stats", stdout=io.StringIO())
+        self.assertEqual(set(IssueSlaBucket.objects.values_list(*fields)), before)
+
+
+class EscalationTests(ApiTestCase):
+    def test_status_changes_schedule_a_deadline(self):
+        issue = self.pending_issue
+        issue.change_status(Issue.APPROVED)
+        self.assertIsNotNone(Issue.objects.get(pk=issue.pk).due_at)
+        issue.change_status(Issue.REJECTED)
+        self.assertIsNone(Issue.objects.get(pk=issue.pk).due_at)
+
+    def test_overdue_issues_are_escalated_once_per_interval(self):
+        overdue = self.issues[:3]
+        Issue.objects.filter(pk__in=[issue.pk for issue in overdue]).update(
+            due_at=timezone.now() - timedelta(minutes=1)
+        )
+        MyApiOfficial.assigned_issues.through.objects.bulk_create(
+            [
+                MyApiOfficial.assigned_issues.through(
+                    myapiofficial=self.official, issue=issue
+                )
+                for issue in overdue
+            ]
+        )
+
+        call_command("escalate_overdue_issues", "--once", stdout=io.StringIO())
+        call_command("escalate_overdue_issues", "--once", stdout=io.StringIO())
+
+        self.assertEqual(
+            Notification.objects.filter(
+                user=self.official_user, title="Issue Overdue"
+            ).count(),
+            3,
+        )
+        for issue in Issue.objects.filter(pk__in=[issue.pk for issue in overdue]):
+            self.assertEqual(issue.escalation_count, 1)
+            self.assertGreater(issue.due_at, timezone.now())
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.service = OutboundService(
+            "test",
+            connect_timeout=1,
+            read_timeout=1,
+            retries=0,
+            backoff=0,
+            pool_size=1,
+            failure_threshold=1,
+            reset_timeout=30,
+        )
+        self.breaker = self.service.breaker
+
+    def call(self, **mock_kwargs):
+        with mock.patch.object(self.service.session, "request", **mock_kwargs):
+            return self.service.get("https://upstream.invalid/")
+
+    def expire_reset_timeout(self):
+        self.breaker.opened_at -= self.breaker.reset_timeout
+
+    def test_unexpected_error_in_half_open_trial_reopens_the_breaker(self):
+        with self.assertRaises(requests.ConnectionError):
+            self.call(side_effect=requests.ConnectionError)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        self.expire_reset_timeout()
+        with self.assertRaises(requests.TooManyRedirects):
+            self.call(side_effect=requests.TooManyRedirects)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        self.expire_reset_timeout()
+        response = self.call(return_value=mock.Mock(status_code=200))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+
+class AreaBoundaryTests(ApiTestCase):
+    def test_saving_an_area_simplifies_its_boundary(self):
+        x, y = ORIGIN
+        # A zigzag finer than the z8 tolerance but coarser than the z14 one.
+        ring = [(x + 0.1 + 0.001 * (i % 2), y + 0.001 * i) for i in range(50)]
+        ring += [(x + 0.2, y + 0.049), (x + 0.2, y), (x + 0.1, y)]
+        area = AreaLocation(
+            name="Clifton",
+            city_name="Karachi",
+            country="Pakistan",
+            boundary=MultiPolygon(Polygon(ring), srid=4326),
+        )
+        area.save()
+        area.refresh_from_db()
+        self.assertEqual(area.boundary_z14.geom_type, "MultiPolygon")
+        self.assertLess(area.boundary_z8.num_coords, area.boundary.num_coords)
+        self.assertLessEqual(area.boundary_z8.num_coords, area.boundary_z14.num_coords)
+
+        area.name = "Clifton Block 2"
+        area.save(update_fields=["name"])
+        area.boundary = MultiPolygon(
+            Polygon.from_bbox((x + 0.1, y, x + 0.2, y + 0.05)), srid=4326
+        )
+        area.save(update_fields=["boundary"])
+        area.refresh_from_db()
+        self.assertEqual(area.boundary_z8.num_coords, 5)
+
+    def test_migrate_skips_simplified_areas(self):
+        with CaptureQueriesContext(connection) as queries:
+            simplify_missing_boundaries(apps.get_app_config("my_api"), using="default")
+        self.assertEqual(len(queries), 1)
+
+    def test_unsimplified_areas_serve_the_full_boundary(self):
+        AreaLocation.objects.update(
+            boundary_z8=None, boundary_z11=None, boundary_z14=None
+        )
+        self.client.force_authenticate(self.user)
+        response = self.client.get("/api/issues/in-area/?area_name=Saddar&zoom=11")
+        self.assertEqual(response.status_code, 200)
+        boundaries = response.json()["data"]["boundaries"]
+        self.assertEqual(
+            [boundary["area_id"] for boundary in boundaries], [self.area.id]
+        )
+        self.assertEqual(len(boundaries[0]["coords"]), len(self.area.boundary))
+
+    def test_migrate_backfills_simplified_boundaries(self):
+        AreaLocation.objects.update(
+            boundary_z8=None, boundary_z11=None, boundary_z14=None
+        )
+        simplify_missing_boundaries(apps.get_app_config("my_api"), using="default")
+        area = AreaLocation.objects.get(pk=self.area.pk)
+        self.assertIsNotNone(area.boundary_z8)
+        self.assertIsNotNone(area.boundary_z14)
+
+
+class IPThrottleTests(SimpleTestCase):
+    def test_spoofed_forwarded_for_does_not_reset_the_window(self):
+        throttle = IPSlidingWindowThrottle("login")
+        factory = APIRequestFactory()
+        with mock.patch(
+            "my_api.throttling._sliding_window_hit", return_value=(True, 0)
+        ) as hit:
+            for forwarded_for in ("203.0.113.1", "203.0.113.2", "198.51.100.7"):
+                request = Request(
+                    factory.post(
+                        "/api/login/",
+                        HTTP_X_FORWARDED_FOR=forwarded_for,
+                        REMOTE_ADDR="192.0.2.10",
+                    )
+                )
+                throttle.allow_request(request, None)
+        keys = {call.args[0] for call in hit.call_args_list}
+        self.assertEqual(keys, {"throttle:login:ip:192.0.2.10"})
+
+
+class OutgoingEmailQueueTests(TestCase):
+    def test_emails_whose_worker_keeps_dying_end_up_failed(self):
+        email = OutgoingEmail.objects.enqueue(
+            "Verify your email",
+            "<p>code</p>",
+            ["user@example.com"],
+            "noreply@example.com",
+        )
+        for _ in range(2):
+            self.assertEqual(
+                [claimed.id for claimed in OutgoingEmail.objects.claim(10, 0, 2)],
+                [email.id],
+            )
+        self.assertEqual(OutgoingEmail.objects.claim(10, 0, 2), [])
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.FAILED)
+
+
+class OfficialStatsTests(ApiTestCase):
+    def test_refresh_stats_reloads_the_queryset_counts(self):
+        MyApiOfficial.objects.filter(pk=self.official.pk).update(
+            assigned_count=0, in_progress_count=0
+        )
+        official = MyApiOfficial.objects.get(pk=self.official.pk)
+        official.refresh_stats()
+        self.assertEqual(official.assigned_count, official.assigned_issues.count())
+        self.assertEqual(
+            official.in_progress_count,
+            official.assigned_issues.filter(
+                issue_status__in=Issue.IN_PROGRESS_STATUSES
+            ).count(),
+        )
+        self.assertGreater(official.assigned_count, 0)
+
+
+class LoadEmergencyServicesTests(SimpleTestCase):
+    def read_geojson(self, features):
+        with tempfile.NamedTemporaryFile("w", suffix=".geojson") as fh:
+            json.dump({"type": "FeatureCollection", "features": features}, fh)
+            fh.flush()
+            return list(LoadEmergencyServicesCommand().read_geojson(fh.name))
+
+    def feature(self, lon, lat, amenity, osm_id=None):
+        return {
+            "type": "Feature",
+            "id": osm_id,
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "properties": {"amenity": amenity, "name": f"{amenity} {lon}"},
+        }
+
+    def test_features_without_an_osm_id_are_keyed_by_content(self):
+        hospital = self.feature(67.01, 24.86, "hospital")
+        police = self.feature(67.02, 24.87, "police")
+        first = self.read_geojson([hospital, police])
+        second = self.read_geojson([police, hospital])
+
+        self.assertEqual(
+            {(r["tag_value"], r["osm_id"]) for r in first},
+            {(r["tag_value"], r["osm_id"]) for r in second},
+        )
+        self.assertEqual(len({r["osm_id"] for r in first}), 2)
+        self.assertTrue(all(r["osm_type"] == "feature" for r in first))
+
+    def test_osm_ids_are_kept(self):
+        [record] = self.read_geojson(
+            [self.feature(67.01, 24.86, "hospital", "node/42")]
+        )
+        self.assertEqual((record["osm_type"], record["osm_id"]), ("node", 42))
+
+    def test_long_phone_lists_keep_whole_numbers(self):
+        numbers = ";".join(f"+92 21 9921 {index:04d}" for index in range(10))
+        record = parse_osm_element(
+            {
+                "type": "node",
+                "id": 1,
+                "lat": 24.86,
+                "lon": 67.01,
+                "tags": {"man_made": "water_works", "phone": numbers},
+            }
+        )
+        self.assertLessEqual(len(record["phone"]), 100)
+        self.assertTrue(numbers.startswith(record["phone"] + ";"))
+        self.assertEqual(truncate_phone("+92 21 111 222 333"), "+92 21 111 222 333")
+        self.assertIsNone(truncate_phone(""))
+
+    def test_osm_xml_nodes_are_streamed(self):
+        nodes = "".join(
+            f'<node id="{index}" lat="24.86" lon="67.0{index}">'
+            '<tag k="man_made" v="water_works"/></node>'
+            for index in range(3)
+        )
+        untagged = '<node id="9" lat="24.8" lon="67.0"/>'
+        way = '<way id="5"><nd ref="1"/><tag k="man_made" v="water_works"/></way>'
+        with tempfile.NamedTemporaryFile("w", suffix=".osm") as fh:
+            fh.write(
+                f'<?xml version="1.0"?><osm version="0.6">{nodes}{untagged}{way}</osm>'
+            )
+            fh.flush()
+            records = list(LoadEmergencyServicesCommand().read_osm_xml(fh.name))
+        self.assertEqual([r["osm_id"] for r in records], [0, 1, 2])
+        self.assertEqual(records[2]["lon"], 67.02)
+
+
+class EmergencyServiceRefreshTests(ApiTestCase):
+    bbox = "24.8,66.9,24.9,67.1"
+
+    def setUp(self):
+        super().setUp()
+        for osm_id, lon in ((1, 67.0), (2, 67.01), (3, 68.0)):
+            EmergencyService.objects.create(
+                osm_id=osm_id,
+                tag_key="man_made",
+                tag_value="water_works",
+                location=Point(lon, 24.86, srid=4326),
+            )
+
+    def refresh(self, **fetch):
+        with mock.patch(
+            "my_api.management.commands.load_emergency_services."
+            "fetch_emergency_services_from_overpass",
+            **fetch,
+        ):
+            call_command(
+                "load_emergency_services",
+                bbox=self.bbox,
+                replace=True,
+                stdout=io.StringIO(),
+            )
+
+    def test_replace_removes_stale_services_inside_the_bbox(self):
+        element = {
+            "type": "node",
+            "id": 2,
+            "lat": 24.86,
+            "lon": 67.01,
+            "tags": {"man_made": "water_works", "name": "Refreshed"},
+        }
+        self.refresh(return_value=[parse_osm_element(element)])
+        self.assertEqual(
+            dict(EmergencyService.objects.values_list("osm_id", "name")),
+            {2: "Refreshed", 3: "Unnamed Location"},
+        )
+
+    def test_failed_refresh_keeps_the_index(self):
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.refresh(side_effect=requests.exceptions.ConnectionError("down"))
+        self.assertEqual(EmergencyService.objects.count(), 3)
+
+
+class PolylineTests(SimpleTestCase):
+    def test_matches_the_reference_encoding(self):
+        # Example from Google's encoded polyline algorithm documentation.
+        coords = [(-120.2, 38.5), (-120.95, 40.7), (-126.453, 43.252)]
+        self.assertEqual(encode_polyline(coords), "_p~iF~ps|U_ulLnnqC_mqNvxq`@")
+        self.assertEqual(decode_polyline("_p~iF~ps|U_ulLnnqC_mqNvxq`@"), coords)
+
+    def test_round_trips_at_the_precision(self):
+        coords = [(67.00011, -24.86071), (-0.00001, 0.0), (179.99999, 89.99999)]
+        self.assertEqual(decode_polyline(encode_polyline(coords)), coords)
+        self.assertEqual(decode_polyline(encode_polyline([])), [])
+
+    def test_extra_dimensions_are_dropped(self):
+        self.assertEqual(
+            decode_polyline(encode_polyline([(67.0, 24.8, 12.5)])), [(67.0, 24.8)]
+        )
+
+    def test_encodes_geometries_by_type(self):
+        square = Polygon.from_bbox((67.0, 24.8, 67.1, 24.9))
+        self.assertIsNone(encode_geometry(None))
+        self.assertEqual(
+            decode_polyline(encode_geometry(Point(67.0, 24.8))), [(67.0, 24.8)]
+        )
+        [ring] = encode_geometry(square)
+        self.assertEqual(decode_polyline(ring), list(square.coords[0]))
+        [[multi_ring]] = encode_geometry(MultiPolygon(square))
+        self.assertEqual(multi_ring, ring)
+
+
+def geojson_feature(lon, lat, **properties):
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [lon, lat]},
+        "properties": properties,
+    }
+
+
+class GeojsonReaderTests(SimpleTestCase):
+    features = [
+        geojson_feature(67.0 + index / 1000, 24.86, title=f'Issue [{index}], "quoted"')
+        for index in range(5)
+    ]
+
+    def read(self, text, chunk_size):
+        return list(iter_geojson_features(io.StringIO(text), chunk_size=chunk_size))
+
+    def test_feature_collection_across_chunk_boundaries(self):
+        text = json.dumps(
+            {"type": "FeatureCollection", "name": "import", "features": self.features},
+            indent=1,
+        )
+        for chunk_size in range(1, 40):
+            self.assertEqual(self.read(text, chunk_size), self.features, chunk_size)
+
+    def test_feature_sequences(self):
+        lines = "\n".join(json.dumps(feature) for feature in self.features) + "\n"
+        records = "".join(f"\x1e{json.dumps(feature)}\n" for feature in self.features)
+        for text in (lines, records):
+            for chunk_size in (1, 7, 1 << 16):
+                self.assertEqual(self.read(text, chunk_size), self.features)
+
+    def test_unreadable_files_are_rejected(self):
+        truncated = json.dumps({"type": "FeatureCollection", "features": self.features})
+        for text in ("not json", truncated[:-10]):
+            for chunk_size in (3, 1 << 16):
+                with self.assertRaises(BulkImportError):
+                    self.read(text, chunk_size)
+
+
+class ValidateRowTests(SimpleTestCase):
+    row = {
+        "title": " Burst water main ",
+        "description": "Water everywhere on the main road",
+        "categories": "water|Roads & Potholes;WATER",
+        "latitude": "24.86",
+        "longitude": "67.01",
+    }
+
+    def validate(self, default_status=Issue.APPROVED, **changes):
+        return validate_row({**self.row, **changes}, default_status)
+
+    def test_valid_row(self):
+        values, errors = self.validate(
+            is_anonymous="Yes", images="https://a/1.jpg; https://a/2.jpg"
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual(values["title"], "Burst water main")
+        self.assertEqual(values["categories"], ["Water", "Roads & Potholes"])
+        self.assertEqual((values["location"].x, values["location"].y), (67.01, 24.86))
+        self.assertEqual(values["issue_status"], Issue.APPROVED)
+        self.assertTrue(values["is_anonymous"])
+        self.assertEqual(values["images"], ["https://a/1.jpg", "https://a/2.jpg"])
+
+    def test_invalid_fields_are_all_reported(self):
+        values, errors = self.validate(
+            title="",
+            categories="water;teleportation",
+            latitude="91",
+            status="lost",
+            is_anonymous="maybe",
+            created_at="yesterday",
+        )
+        self.assertIsNone(values)
+        self.assertEqual(
+            errors,
+            [
+                "title: required",
+                "categories: invalid category 'teleportation'",
+                "latitude/longitude: out of range",
+                "status: invalid status 'lost'",
+                "is_anonymous: expected true or false",
+                "created_at: not an ISO 8601 datetime",
+            ],
+        )
+
+    def test_missing_categories_and_coordinates(self):
+        _, errors = self.validate(categories="", latitude=None)
+        self.assertEqual(
+            errors,
+            [
+                "categories: at least one category is required",
+                "latitude/longitude: required numbers",
+            ],
+        )
+
+    def test_parse_errors_are_kept(self):
+        _, errors = self.validate(_error="Geometry must be a Point")
+        self.assertEqual(errors, ["Geometry must be a Point"])
+
+    def test_timestamps(self):
+        values, _ = self.validate(
+            created_at="2024-01-02T03:04:05", resolved_at="2024-01-03T00:00:00Z"
+        )
+        self.assertEqual(values["created_at"].utcoffset(), timedelta(0))
+        self.assertEqual(values["created_at"].hour, 3)
+        self.assertIsNone(values["resolved_at"])
+
+        values, _ = self.validate(
+            status=Issue.SOLVED, resolved_at="2024-01-03T00:00:00Z"
+        )
+        self.assertEqual(values["resolved_at"].day, 3)
+
+
+class IssueImportTests(ApiTestCase):
+    def run_import(self, rows):
+        lines = ["title,description,categories,latitude,longitude"]
+        lines += [",".join(str(value) for value in row) for row in rows]
+        importer = IssueImporter(self.admin)
+        return importer.run(io.StringIO("\n".join(lines) + "\n"), "csv")
+
+    def test_duplicates_and_areas_are_resolved_per_batch(self):
+        x, y = ORIGIN
+        existing = self.issues[1]
+        rows = [
+            # Same place and categories as an existing issue.
+            (
+                "Flooded street",
+                "Water over the road",
+                "Water;Roads & Potholes",
+                existing.location.y,
+                existing.location.x,
+            ),
+            # Inside the seeded area, then a second report ~30 m away.
+            (
+                "Broken lamp",
+                "Lamp out for a week",
+                "Street Lighting",
+                y + 0.02,
+                x - 0.02,
+            ),
+            (
+                "Broken lamp too",
+                "Same lamp from another reporter",
+                "Street Lighting",
+                y + 0.02,
+                x - 0.0197,
+            ),
+            # Far from every known area.
+            ("Remote issue", "Nowhere near Saddar", "Waste", y + 5, x + 5),
+        ]
+        report = self.run_import(rows)
+
+        self.assertEqual(
+            (
+                report["rows"],
+                report["imported"],
+                report["duplicates"],
+                report["failed"],
+            ),
+            (4, 2, 2, 0),
+        )
+        self.assertEqual(
+            report["errors"],
+            [
+                {"row": 2, "errors": [f"duplicate of issue {existing.id}"]},
+                {"row": 4, "errors": ["duplicate of row 3"]},
+            ],
+        )
+        imported = Issue.objects.filter(user=self.admin)
+        self.assertEqual(imported.get(title="Broken lamp").area, self.area)
+        self.assertIsNone(imported.get(title="Remote issue").area)
+        self.assertEqual(
+            AreaIssueCount.objects.get(
+                area=self.area,
+                issue_status=AreaIssueCount.ALL,
+                category="Street Lighting",
+            ).issue_count,
+            1,
+        )
+
+    def test_invalid_rows_are_skipped(self):
+        x, y = ORIGIN
+        report = self.run_import(
+            [
+                ("", "No title here", "Waste", y, x + 0.02),
+                ("Fine", "A valid row", "Waste", y, x + 0.03),
+            ]
+        )
+        self.assertEqual((report["imported"], report["failed"]), (1, 1))
+        self.assertEqual(report["errors"], [{"row": 2, "errors": ["title: required"]}])
+
+
+class AreaIssueCountTests(ApiTestCase):
+    def counts(self):
+        return {
+            (row.area_id, row.issue_status, row.category): row.issue_count
+            for row in AreaIssueCount.objects.all()
+            if row.issue_count
+        }
+
+    def test_incremental_counts_match_a_rebuild(self):
+        x, y = ORIGIN
+        square = Polygon.from_bbox((x + 2, y + 2, x + 2.1, y + 2.1))
+        square.srid = 4326
+        clifton = AreaLocation.objects.create(
+            name="Clifton",
+            city_name="Karachi",
+            country="Pakistan",
+            boundary=MultiPolygon(square, srid=4326),
+        )
+        issue = Issue.objects.create(
+            title="Open manhole",
+            description="Open manhole on the footpath",
+            user=self.user,
+            location=Point(x, y, srid=4326),
+            categories=["Sewerage", "Sewerage"],
+            images=[],
+            area=self.area,
+        )
+        issue.issue_status = Issue.APPROVED
+        issue.save()
+
+        moved = Issue.objects.get(pk=self.issues[2].pk)
+        moved.area = clifton
+        moved.categories = ["Gas"]
+        moved.issue_status = Issue.SOLVED
+        moved.save()
+
+        Issue.objects.get(pk=self.issues[3].pk).delete()
+
+        counts = self.counts()
+        self.assertEqual(counts[(self.area.id, Issue.APPROVED, "Sewerage")], 1)
+        self.assertEqual(
+            counts[(clifton.id, AreaIssueCount.ALL, AreaIssueCount.ALL)], 1
+        )
+        AreaIssueCount.objects.rebuild()
+        self.assertEqual(counts, self.counts())
+
+
+class IssueStatsBucketTests(ApiTestCase):
+    def buckets(self):
+        return {
+            (row.granularity, row.bucket_start, row.area_id, row.category): (
+                row.created_count,
+                row.approved_count,
+                row.solved_count,
+            )
+            for row in IssueStatsBucket.objects.all()
+        }
+
+    def test_saves_count_like_a_bulk_load(self):
+        solved = Issue.objects.get(pk=self.issues[4].pk)
+        solved.issue_status = Issue.SOLVED
+        solved.save()
+
+        from_saves = self.buckets()
+        day = IssueStatsBucket.objects.bucket_start(
+            IssueStatsBucket.DAY, timezone.now()
+        )
+        self.assertEqual(
+            from_saves[(IssueStatsBucket.DAY, day, None, IssueStatsBucket.ALL)],
+            (ISSUE_COUNT + 1, ISSUE_COUNT, 1),
+        )
+        self.assertEqual(
+            from_saves[(IssueStatsBucket.DAY, day, self.area.id, "Waste")], (1, 0, 0)
+        )
+
+        IssueStatsBucket.objects.all().delete()
+        IssueStatsBucket.objects.record_created(Issue.objects.all())
+        self.assertEqual(self.buckets(), from_saves)
+
+    def test_reapproval_is_not_counted_again(self):
+        issue = Issue.objects.get(pk=self.pending_issue.pk)
+        for issue_status in (Issue.APPROVED, Issue.REJECTED, Issue.APPROVED):
+            issue.issue_status = issue_status
+            issue.save()
+
+        day = IssueStatsBucket.objects.bucket_start(
+            IssueStatsBucket.DAY, timezone.now()
+        )
+        totals = IssueStatsBucket.objects.get(
+            granularity=IssueStatsBucket.DAY,
+            bucket_start=day,
+            area=None,
+            category=IssueStatsBucket.ALL,
+        )
+        self.assertEqual(totals.approved_count, ISSUE_COUNT + 1)
+        self.assertEqual(
+            IssueStatsBucket.objects.get(
+                granularity=IssueStatsBucket.DAY,
+                bucket_start=day,
+                area=self.area,
+                category="Waste",
+            ).approved_count,
+            1,
+        )
+
+
+class PushNotificationTests(ApiTestCase):
+    dead = {
+        "token-7": messaging.UnregisteredError("Requested entity was not found."),
+        "token-500": firebase_exceptions.InvalidArgumentError(
+            "The registration token is not a valid FCM registration token"
+        ),
+    }
+    unavailable = {
+        "token-3": firebase_exceptions.UnavailableError("FCM is unavailable")
+    }
+
+    def send_each(self, message):
+        responses = []
+        for token in message.tokens:
+            error = self.dead.get(token) or self.unavailable.get(token)
+            responses.append(mock.Mock(success=error is None, exception=error))
+        failures = sum(not response.success for response in responses)
+        return mock.Mock(
+            success_count=len(responses) - failures,
+            failure_count=failures,
+            responses=responses,
+        )
+
+    def test_tokens_are_chunked_and_dead_ones_pruned(self):
+        DeviceToken.objects.bulk_create(
+            [
+                DeviceToken(user=self.user, token=f"token-{index}")
+                for index in range(501)
+            ]
+        )
+        notification = Notification.objects.filter(user=self.user).first()
+
+        with (
+            mock.patch.object(utils.firebase_admin, "_apps", {"[DEFAULT]": None}),
+            mock.patch.object(
+                utils.messaging, "send_each_for_multicast", side_effect=self.send_each
+            ) as send_each,
+        ):
+            result = utils.send_push_notification(notification)
+
+        self.assertEqual(
+            [len(call.args[0].tokens) for call in send_each.call_args_list],
+            [utils.FCM_MULTICAST_LIMIT, 2],
+        )
+        self.assertEqual(
+            result,
+            {
+                "status": "success",
+                "success_count": 499,
+                "failure_count": 3,
+                "pruned_count": 2,
+            },
+        )
+        remaining = set(DeviceToken.objects.values_list("token", flat=True))
+        self.assertEqual(len(remaining), 500)
+        self.assertFalse(remaining & self.dead.keys())
+        self.assertIn("token-3", remaining)
+
+
+class DistributedRateLimiterTests(SimpleTestCase):
+    def limiter(self, script=None, rate=1, capacity=2):
+        limiter = DistributedRateLimiter("test", rate=rate, capacity=capacity)
+        limiter._script = script
+        return limiter
+
+    def test_priority_comes_from_the_context(self):
+        script = mock.Mock(return_value=0)
+        limiter = self.limiter(script)
+        limiter.acquire()
+        with rate_limit_priority(BATCH):
+            limiter.acquire()
+        priorities = [call.kwargs["args"][2] for call in script.call_args_list]
+        self.assertEqual(priorities, [INTERACTIVE, BATCH])
+
+    def test_waits_for_the_suggested_time(self):
+        limiter = self.limiter(mock.Mock(side_effect=[250, 0]))
+        with mock.patch("my_api.rate_limit.time.sleep") as sleep:
+            limiter.acquire()
+        sleep.assert_called_once_with(0.25)
+
+    def test_gives_up_at_the_deadline(self):
+        limiter = self.limiter(mock.Mock(return_value=2000))
+        with mock.patch("my_api.rate_limit.time.sleep") as sleep:
+            with self.assertRaises(RateLimitTimeout):
+                limiter.acquire(deadline=1.0)
+        sleep.assert_not_called()
+
+    def test_falls_back_to_a_local_bucket_without_redis(self):
+        limiter = self.limiter()
+        with mock.patch(
+            "my_api.rate_limit.get_redis",
+            side_effect=redis.exceptions.ConnectionError("down"),
+        ):
+            limiter.acquire()
+            limiter.acquire()
+            with self.assertRaises(RateLimitTimeout):
+                limiter.acquire(deadline=0.1)
+
+
+class IssueExportTests(ApiTestCase):
+    def render(self, fmt, **criteria):
+        return "".join(export.render_export(export.export_queryset(**criteria), fmt))
+
+    def test_csv_export_is_importable(self):
+        text = self.render(export.CSV, statuses=[Issue.APPROVED])
+        rows = list(csv.DictReader(io.StringIO(text)))
+        self.assertEqual(len(rows), ISSUE_COUNT)
+        for row in rows:
+            values, errors = validate_row(row, Issue.NOT_APPROVED)
+            self.assertEqual(errors, [])
+            self.assertEqual(values["categories"], ["Water", "Roads & Potholes"])
+            self.assertEqual(values["issue_status"], Issue.APPROVED)
+
+    def test_geojson_is_streamed_in_bounded_chunks(self):
+        with mock.patch.object(export, "EXPORT_BUFFER_BYTES", 1024):
+            chunks = list(
+                export.render_export(export.export_queryset(), export.GEOJSON)
+            )
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) < 2048 for chunk in chunks))
+        collection = json.loads("".join(chunks))
+        self.assertEqual(len(collection["features"]), ISSUE_COUNT + 1)
+        self.assertEqual(
+            collection["features"][0]["geometry"]["coordinates"],
+            [self.issue.location.x, self.issue.location.y],
+        )
+
+    def test_officials_export_their_area(self):
+        x, y = ORIGIN
+        outside = Issue.objects.create(
+            title="Outside the area",
+            description="Not covered by the official",
+            user=self.user,
+            location=Point(x + 0.5, y + 0.5, srid=4326),
+            categories=["Waste"],
+            images=[],
+        )
+        self.client.force_authenticate(self.official_user)
+        response = self.client.get("/api/issues/export/?export_format=ndjson")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], export.CONTENT_TYPES[export.NDJSON])
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        ids = {json.loads(line)["properties"]["id"] for line in lines}
+        self.assertEqual(len(ids), ISSUE_COUNT + 1)
+        self.assertNotIn(outside.id, ids)
+
+    def test_invalid_filters_are_rejected(self):
+        self.client.force_authenticate(self.admin)
+        for query in ("export_format=xml", "status=lost", "created_after=yesterday"):
+            response = self.client.get(f"/api/issues/export/?{query}")
+            self.assertEqual(response.status_code, 400, query)
+
+
+class SeedDataTests(ApiTestCase):
+    def test_copy_values(self):
+        moment = timezone.now()
+        self.assertEqual(
+            [
+                copy_value(value)
+                for value in (None, True, False, ["Water"], moment, "a\tb\nc\\d")
+            ],
+            ["\\N", "t", "f", '["Water"]', moment.isoformat(), "a\\tb\\nc\\\\d"],
+        )
+
+    def test_seeded_rows_are_consistent(self):
+        before = Issue.objects.count()
+        call_command(
+            "seed_data",
+            issues=60,
+            users=20,
+            cities=1,
+            grid=2,
+            stdout=io.StringIO(),
+        )
+        seeded = Issue.objects.filter(user__username__startswith="seed1-")
+        self.assertEqual(Issue.objects.count() - before, 60)
+        self.assertEqual(seeded.count(), 60)
+
+        likes = Counter(
+            Like.objects.filter(issue__in=seeded).values_list("issue_id", flat=True)
+        )
+        comments = Counter(
+            Comment.objects.filter(issue__in=seeded).values_list("issue_id", flat=True)
+        )
+        for issue in seeded:
+            self.assertEqual(issue.likes_count, likes[issue.id])
+            self.assertEqual(issue.comments_count, comments[issue.id])
+        self.assertFalse(
+            seeded.filter(area__isnull=False)
+            .exclude(location__coveredby=F("area__boundary"))
+            .exists()
+        )
+
+        counts = {
+            (row.area_id, row.issue_status, row.category): row.issue_count
+            for row in AreaIssueCount.objects.all()
+        }
+        AreaIssueCount.objects.rebuild()
+        self.assertEqual(
+            counts,
+            {
+                (row.area_id, row.issue_status, row.category): row.issue_count
+                for row in AreaIssueCount.objects.all()
+            },
+        )
+
+        with self.assertRaises(CommandError):
+            call_command("seed_data", issues=1, users=1, cities=1, stdout=io.StringIO())
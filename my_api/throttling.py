@@ -0,0 +1,119 @@
+"""
+Sliding-window throttles for write-heavy endpoints, counted in Redis.
+
+Each (scope, user) or (scope, ip) pair is one Redis hash holding the hit
+counts of the current and previous fixed windows. The Lua script estimates
+the sliding-window count as `previous * overlap + current`, so every check
+is a single EVALSHA with O(1) memory per client.
+
+Rates come from REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]: the per-user rate
+is keyed by the scope (e.g. "issue_like") and the per-IP rate by the scope
+with an "_ip" suffix (e.g. "issue_like_ip"). A scope with no rate is not
+limited. Views pick scopes per action in `get_throttles()` via
+`scoped_throttles(scope)`, and DRF turns a rejection into a 429 with
+`Retry-After`.
+
+If Redis is unreachable requests are let through rather than failed.
+"""
+
+import redis
+
+from .redis_client import get_redis
+
+from rest_framework.throttling import SimpleRateThrottle
+
+# KEYS[1] window hash
+# ARGV: window (ms), limit
+# Returns {1, 0} when the hit was counted, otherwise {0, retry_after_ms}.
+SLIDING_WINDOW_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+
+local current = math.floor(now / window)
+local elapsed = now - current * window
+local hits = tonumber(redis.call('HGET', KEYS[1], current)) or 0
+local previous = tonumber(redis.call('HGET', KEYS[1], current - 1)) or 0
+
+if previous * (window - elapsed) / window + hits + 1 <= limit then
+    redis.call('HINCRBY', KEYS[1], current, 1)
+    redis.call('HDEL', KEYS[1], current - 2)
+    redis.call('PEXPIRE', KEYS[1], window * 2)
+    return {1, 0}
+end
+
+local wait
+if hits + 1 <= limit then
+    -- wait for the previous window's weight to drop enough
+    wait = window * (1 - (limit - 1 - hits) / previous) - elapsed
+else
+    -- this window is full, wait until it becomes the previous one
+    wait = window - elapsed + window * (1 - (limit - 1) / hits)
+end
+return {0, math.max(math.ceil(wait), 1)}
+"""
+
+_script = None
+
+
+def _sliding_window_hit(key, window_ms, limit):
+    global _script
+    if _script is None:
+        _script = get_redis().register_script(SLIDING_WINDOW_SCRIPT)
+    allowed, wait_ms = _script(keys=[key], args=[window_ms, limit])
+    return bool(allowed), int(wait_ms)
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    rate_suffix = ""
+
+    def __init__(self, scope=None):
+        if scope is not None:
+            self.scope = scope
+        self.wait_seconds = None
+        super().__init__()
+
+    def get_rate(self):
+        return self.THROTTLE_RATES.get(f"{self.scope}{self.rate_suffix}")
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        try:
+            allowed, wait_ms = _sliding_window_hit(
+                key, self.duration * 1000, self.num_requests
+            )
+        except redis.exceptions.RedisError:
+            return True
+
+        self.wait_seconds = wait_ms / 1000
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserSlidingWindowThrottle(SlidingWindowThrottle):
+    """Per authenticated user; anonymous requests are left to the IP throttle."""
+
+    def get_cache_key(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return None
+        return f"throttle:{self.scope}:user:{request.user.pk}"
+
+
+class IPSlidingWindowThrottle(SlidingWindowThrottle):
+    rate_suffix = "_ip"
+
+    def get_cache_key(self, request, view):
+        return f"throttle:{self.scope}:ip:{self.get_ident(request)}"
+
+
+def scoped_throttles(scope):
+    return [UserSlidingWindowThrottle(scope), IPSlidingWindowThrottle(scope)]
@@ -1,11 +1,20 @@
 from django.urls import include, path
 
 from my_api.views import (
+    AnalyticsViewSet,
+    AsyncIssueDetailView,
+    AsyncIssueListView,
+    AsyncIssueLocationsView,
+    AsyncMyNotificationsView,
+    AsyncNearbyIssuesView,
     CommentViewSet,
+    DatabaseReplicasView,
     IssueViewSet,
     LoginView,
+    MetricsView,
     NotificationViewSet,
     OfficialViewSet,
+    OutboundServicesView,
     RegisterView,
     SendEmailView,
     SocialRegisterView,
@@ -22,6 +31,7 @@ router.register(r"users", UserViewSet, basename="users")
 router.register(r"comments", CommentViewSet, basename="comments")
 router.register(r"officials", OfficialViewSet, basename="officials")
 router.register(r"notifications", NotificationViewSet, basename="notifications")
+router.register(r"analytics", AnalyticsViewSet, basename="analytics")
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -31,4 +41,37 @@ urlpatterns = [
     path("send-email-verification/", SendEmailView.as_view(), name="send-email"),
     path("verify-email/", VerifyEmailView.as_view(), name="verify-email"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path(
+        "outbound-services/",
+        OutboundServicesView.as_view(),
+        name="outbound-services",
+    ),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path(
+        "database-replicas/",
+        DatabaseReplicasView.as_view(),
+        name="database-replicas",
+    ),
+    # Native async versions of the hot read endpoints (same responses).
+    path("async/issues/", AsyncIssueListView.as_view(), name="async-issues-list"),
+    path(
+        "async/issues/nearby/",
+        AsyncNearbyIssuesView.as_view(),
+        name="async-issues-nearby",
+    ),
+    path(
+        "async/issues/locations/",
+        AsyncIssueLocationsView.as_view(),
+        name="async-issues-issue-locations",
+    ),
+    path(
+        "async/issues/<int:pk>/",
+        AsyncIssueDetailView.as_view(),
+        name="async-issues-detail",
+    ),
+    path(
+        "async/notifications/my/",
+        AsyncMyNotificationsView.as_view(),
+        name="async-notifications-my",
+    ),
 ]
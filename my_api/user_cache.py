@@ -0,0 +1,122 @@
+"""
+Two-tier cache of authenticated MyApiUser rows, used by CachedJWTAuthentication.
+
+Tier 1 is a small per-process LRU with a very short TTL, tier 2 is the shared
+Redis cache. MyApiUser.save()/delete() evict the user from both tiers (again
+after commit, so a concurrent request cannot re-cache the old row). Other
+processes may keep serving their tier 1 copy for at most
+AUTH_USER_LOCAL_CACHE_SECONDS after a role or is_active change.
+
+Redis failures are treated as misses so authentication keeps working off the
+database.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+import redis
+
+from . import async_cache
+
+REDIS_SECONDS = getattr(settings, "AUTH_USER_CACHE_SECONDS", 300)
+LOCAL_SECONDS = getattr(settings, "AUTH_USER_LOCAL_CACHE_SECONDS", 5)
+LOCAL_SIZE = getattr(settings, "AUTH_USER_LOCAL_CACHE_SIZE", 1024)
+
+
+class _LocalLRU:
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+_local = _LocalLRU(LOCAL_SIZE, LOCAL_SECONDS)
+
+
+def user_cache_key(user_id):
+    return f"auth_user:{user_id}"
+
+
+def get_cached_user(user_id, loader):
+    """
+    Return the user for `user_id`, calling `loader(user_id)` on a miss in both
+    tiers. Each call gets its own copy, so request code can modify or save the
+    instance without touching the cached one.
+    """
+    key = user_cache_key(user_id)
+
+    user = _local.get(key)
+    if user is None:
+        try:
+            user = cache.get(key)
+        except redis.exceptions.RedisError:
+            user = None
+
+        if user is None:
+            user = loader(user_id)
+            try:
+                cache.set(key, user, REDIS_SECONDS)
+            except redis.exceptions.RedisError:
+                pass
+        _local.set(key, user)
+
+    return copy.copy(user)
+
+
+async def aget_cached_user(user_id, aloader):
+    """get_cached_user for async code: `aloader` is awaited on a miss."""
+    key = user_cache_key(user_id)
+
+    user = _local.get(key)
+    if user is None:
+        user = await async_cache.aget(key)
+        if user is None:
+            user = await aloader(user_id)
+            await async_cache.aset(key, user, REDIS_SECONDS)
+        _local.set(key, user)
+
+    return copy.copy(user)
+
+
+def invalidate_user(user_id):
+    key = user_cache_key(user_id)
+    _local.delete(key)
+    try:
+        cache.delete(key)
+    except redis.exceptions.RedisError:
+        pass
+
+
+def invalidate_user_on_commit(user_id):
+    invalidate_user(user_id)
+    transaction.on_commit(lambda: invalidate_user(user_id))
@@ -7,6 +7,7 @@ from django.conf import settings
 
 import requests
 import re
+from firebase_admin import exceptions as firebase_exceptions
 from firebase_admin import messaging
 from firebase_admin import credentials
 
@@ -15,6 +16,9 @@ from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import exception_handler
 
+from .http_client import gemini, nominatim, overpass
+from .rate_limit import BATCH, rate_limit_priority
+
 
 def custom_exception_handler(exc, context):
     response = exception_handler(exc, context)
@@ -86,6 +90,20 @@ def custom_exception_handler(exc, context):
             }
         )
 
+    elif response.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+        return Response(
+            {
+                "success": "False",
+                "message": "Too Many Requests",
+                "data": response.data.get("detail"),
+                "code": status.HTTP_429_TOO_MANY_REQUESTS,
+            },
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": response.get("Retry-After")}
+            if response.has_header("Retry-After")
+            else None,
+        )
+
     elif response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED:
         return Response(
             {
@@ -99,7 +117,34 @@ def custom_exception_handler(exc, context):
     return response
 
 
-def send_push_notification(notification):
+FCM_MULTICAST_LIMIT = 500
+
+
+def is_dead_token_error(exc):
+    """True when FCM rejected the token itself rather than the message."""
+    if isinstance(exc, (messaging.UnregisteredError, messaging.SenderIdMismatchError)):
+        return True
+    return isinstance(
+        exc, firebase_exceptions.InvalidArgumentError
+    ) and "registration token" in str(exc).lower()
+
+
+def send_push_notification(notification, tokens=None):
+    """
+    Push `notification` to `tokens`, or to every DeviceToken of its user.
+    Tokens FCM reports as unregistered or invalid are deleted.
+    """
+    from .models import DeviceToken
+
+    if tokens is None:
+        tokens = list(
+            DeviceToken.objects.filter(user_id=notification.user_id).values_list(
+                "token", flat=True
+            )
+        )
+    if not tokens:
+        return {"status": "skipped", "success_count": 0, "failure_count": 0}
+
     if not firebase_admin._apps:
         cred = credentials.Certificate(settings.FIREBASE_SERVICE)
         firebase_admin.initialize_app(cred)
@@ -111,37 +156,35 @@ def send_push_notification(notification):
         "description": str(notification.description),
         "created_at": str(notification.created_at),
     }
-    tokens = notification.user.fcm_tokens
-    if not isinstance(tokens, list):
-        tokens = [tokens]
-
-    tokens = [str(token) for token in tokens]
-    message = messaging.MulticastMessage(
-        data=data_payload,
-        notification=messaging.Notification(title=str(notification.title)),
-        tokens=tokens,
-    )
-    print(f"TITLE IS {notification.title}")
-    print(f"Description IS {notification.description}")
+
+    success_count = failure_count = 0
+    dead_tokens = []
     try:
-        response = messaging.send_each_for_multicast(message)
-        for i, resp in enumerate(response.responses):
-            if resp.success:
-                print(f"Notification successfully sent to token {tokens[i]}")
-            else:
-                print(
-                    f"Failed to send notification to token {tokens[i]}: {resp.exception}"
-                )
-        print(f"Notification Sent, Response is: {response}")
-        return {
-            "status": "success",
-            "success_count": response.success_count,
-            "failure_count": response.failure_count,
-            "responses": response.responses,
-        }
+        for offset in range(0, len(tokens), FCM_MULTICAST_LIMIT):
+            chunk = [str(token) for token in tokens[offset : offset + FCM_MULTICAST_LIMIT]]
+            message = messaging.MulticastMessage(
+                data=data_payload,
+                notification=messaging.Notification(title=str(notification.title)),
+                tokens=chunk,
+            )
+            response = messaging.send_each_for_multicast(message)
+            success_count += response.success_count
+            failure_count += response.failure_count
+            for token, resp in zip(chunk, response.responses):
+                if not resp.success and is_dead_token_error(resp.exception):
+                    dead_tokens.append(token)
     except Exception as e:
         print(f"Notification Not Sent, Exception is: {e}")
         return {"status": "error", "error": str(e)}
+    finally:
+        DeviceToken.objects.prune(dead_tokens)
+
+    return {
+        "status": "success",
+        "success_count": success_count,
+        "failure_count": failure_count,
+        "pruned_count": len(dead_tokens),
+    }
 
 
 def find_official_for_point(point):
@@ -183,7 +226,7 @@ def get_district_boundary(district_name, city, country):
     headers = {"User-Agent": "district_boundary_fetcher/1.0"}
 
     try:
-        response = requests.get(nominatim_url, params=params, headers=headers)
+        response = nominatim.get(nominatim_url, params=params, headers=headers)
         response.raise_for_status()
 
         data = response.json()
@@ -252,7 +295,7 @@ def get_polygon_from_area_name(area_name: str):
         }
         headers = {"User-Agent": "issue-tracker-app"}
 
-        response = requests.get(nominatim_url, params=params, headers=headers)
+        response = nominatim.get(nominatim_url, params=params, headers=headers)
         data = response.json()
 
         if not data or "geojson" not in data[0]:
@@ -333,37 +376,154 @@ CATEGORY_EMERGENCY_TAGS = {
 }
 
 
+EMERGENCY_SERVICE_RADIUS_M = 5000
+
+
+def category_slug(category):
+    """
+    Issue.categories stores the display labels ("Roads & Potholes"), while
+    CATEGORY_EMERGENCY_TAGS is keyed by the choice value ("roads_potholes").
+    """
+    from my_api.models import Issue
+
+    labels = {label.lower(): value for value, label in Issue.CATEGORY_CHOICES}
+    category = str(category).strip().lower()
+    return labels.get(category, category)
+
+
 def get_emergency_contact(issue):
+    """
+    Find the nearest emergency/public service for the issue's primary category.
+
+    Reads from the local EmergencyService index with a KNN (<->) query per
+    mapped tag; Overpass is only used by `load_emergency_services` to refresh
+    the index.
+    """
+    from django.contrib.gis.db.models.functions import Distance, GeometryDistance
+    from my_api.models import EmergencyService
+
     if not issue.location or not issue.categories:
         return {"error": "Missing location or categories"}
 
-    lat, lon = issue.location.y, issue.location.x
-    category = issue.categories[0].lower()
+    category = category_slug(issue.categories[0])
 
     tags = CATEGORY_EMERGENCY_TAGS.get(category)
     if not tags:
         return {"error": f"No emergency service mapped for category: {category}"}
 
     for tag in tags:
-        query = f"""
-        [out:json];
-        node["{tag['key']}"="{tag['value']}"](around:5000,{lat},{lon});
-        out body 1;
-        """
-        response = requests.post("https://overpass-api.de/api/interpreter", data=query)
-        if response.status_code == 200:
-            data = response.json()
-            if data["elements"]:
-                el = data["elements"][0]
-                return {
-                    "name": el.get("tags", {}).get("name", "Unnamed Location"),
-                    "type": tag["value"],
-                    "address": el.get("tags", {}).get("addr:full", "N/A"),
-                    "coordinates": {"lat": el["lat"], "lon": el["lon"]}
-                }
+        service = (
+            EmergencyService.objects.filter(
+                tag_key=tag["key"], tag_value=tag["value"]
+            )
+            .annotate(distance=Distance("location", issue.location))
+            .order_by(GeometryDistance("location", issue.location))
+            .first()
+        )
+        if service and service.distance.m <= EMERGENCY_SERVICE_RADIUS_M:
+            return {
+                "name": service.name,
+                "type": tag["value"],
+                "address": service.address,
+                "phone": service.phone,
+                "coordinates": {"lat": service.location.y, "lon": service.location.x},
+                "distance_m": round(service.distance.m),
+            }
 
     return {"error": "No emergency services found nearby"}
 
+
+def parse_osm_element(element):
+    """
+    Turn an Overpass JSON element (node, or way/relation with `out center`)
+    into the fields stored on EmergencyService. Returns None when the element
+    has no usable coordinates or does not match a mapped tag.
+    """
+    tags = element.get("tags", {})
+    if "lat" in element and "lon" in element:
+        lat, lon = element["lat"], element["lon"]
+    elif "center" in element:
+        lat, lon = element["center"]["lat"], element["center"]["lon"]
+    else:
+        return None
+
+    for key, value in emergency_tag_pairs():
+        if tags.get(key) == value:
+            return {
+                "osm_type": element.get("type", "node"),
+                "osm_id": element["id"],
+                "tag_key": key,
+                "tag_value": value,
+                "name": tags.get("name", "Unnamed Location")[:255],
+                "address": (tags.get("addr:full") or format_osm_address(tags))[:500],
+                "phone": truncate_phone(tags.get("phone") or tags.get("contact:phone")),
+                "lat": float(lat),
+                "lon": float(lon),
+            }
+    return None
+
+
+def truncate_phone(phone, max_length=100):
+    """
+    Fit an OSM phone tag, often several `;`-separated numbers, into the
+    EmergencyService.phone column, dropping whole numbers rather than
+    cutting one short.
+    """
+    if not phone or len(phone) <= max_length:
+        return phone or None
+    whole = phone[: max_length + 1].rsplit(";", 1)[0].strip()
+    return whole or phone[:max_length]
+
+
+def format_osm_address(tags):
+    parts = [
+        tags.get("addr:housenumber"),
+        tags.get("addr:street"),
+        tags.get("addr:suburb"),
+        tags.get("addr:city"),
+    ]
+    address = ", ".join(part for part in parts if part)
+    return address or "N/A"
+
+
+def emergency_tag_pairs():
+    """Unique (key, value) pairs across CATEGORY_EMERGENCY_TAGS."""
+    pairs = []
+    for tags in CATEGORY_EMERGENCY_TAGS.values():
+        for tag in tags:
+            pair = (tag["key"], tag["value"])
+            if pair not in pairs:
+                pairs.append(pair)
+    return pairs
+
+
+def fetch_emergency_services_from_overpass(south, west, north, east):
+    """
+    Fetch every mapped emergency service inside a bounding box in a single
+    Overpass query. Used to refresh the local EmergencyService index.
+    """
+    bbox = f"{south},{west},{north},{east}"
+    selectors = "\n".join(
+        f'  nwr["{key}"="{value}"]({bbox});' for key, value in emergency_tag_pairs()
+    )
+    query = f"""
+    [out:json][timeout:180];
+    (
+    {selectors}
+    );
+    out center tags;
+    """
+
+    response = overpass.post(
+        "https://overpass-api.de/api/interpreter",
+        data={"data": query},
+        headers=HEADERS,
+        timeout=(3.05, 200),
+    )
+    response.raise_for_status()
+    elements = response.json().get("elements", [])
+    return [parsed for parsed in map(parse_osm_element, elements) if parsed]
+
 class OSMPolygonExtractor:
     def __init__(self):
         self.overpass_url = "http://overpass-api.de/api/interpreter"
@@ -384,10 +544,9 @@ class OSMPolygonExtractor:
             query = self._build_query(area_name, area_type)
             
             # Make the API request
-            response = requests.post(
+            response = overpass.post(
                 self.overpass_url,
                 data={'data': query},
-                timeout=30
             )
             response.raise_for_status()
             
@@ -528,7 +687,7 @@ def reverse_geocode(lat, lon):
     }
 
     try:
-        resp = requests.get(url, params=params, headers=HEADERS, timeout=10)
+        resp = nominatim.get(url, params=params, headers=HEADERS)
         resp.raise_for_status()
         address = resp.json().get("address", {})
         # Optional: log full address for debugging
@@ -566,14 +725,13 @@ def fetch_boundary_from_overpass(area_name):
     """
 
     try:
-        response = requests.post(
+        response = overpass.post(
             "https://overpass-api.de/api/interpreter",
             data={"data": query},
             headers={
                 "User-Agent": "MyIssueApp (contact@yourdomain.com)",
                 "Accept-Language": "en"
             },
-            timeout=30
         )
         response.raise_for_status()
         data = response.json()
@@ -601,7 +759,15 @@ def fetch_boundary_from_overpass(area_name):
 
 
 def assign_area_names_to_issues():
-    import time
+    """
+    Backfill Issue.area for issues that have none. Runs at BATCH priority so
+    the shared Nominatim/Overpass rate limit serves interactive requests first.
+    """
+    with rate_limit_priority(BATCH):
+        _assign_area_names_to_issues()
+
+
+def _assign_area_names_to_issues():
     from my_api.models import Issue, AreaLocation
     issues = Issue.objects.filter(location__isnull=False, area__isnull=True)
 
@@ -656,17 +822,13 @@ def assign_area_names_to_issues():
         issue.save(update_fields=["area"])
         print(f"✔️ Assigned: Issue '{issue.title}' → {town}, {city}, {country}")
 
-        time.sleep(1)  # Respect rate limits
-
 
 def get_issue_counts_by_area():
-    from my_api.models import Issue
-    from django.db.models import Count
+    from my_api.models import AreaIssueCount
     results = (
-        Issue.objects
-        .filter(area__isnull=False)
-        .values("area__name", "area__city_name")
-        .annotate(issue_count=Count("id"))
+        AreaIssueCount.objects
+        .filter(issue_status=AreaIssueCount.ALL, category=AreaIssueCount.ALL)
+        .values("area__name", "area__city_name", "issue_count")
         .order_by("-issue_count")
     )
 
@@ -725,7 +887,7 @@ def get_emergency_contact_info(issue_type, city, area):
     }
 
     try:
-        response = requests.post(url, headers=headers, json=data, timeout=15)
+        response = gemini.post(url, headers=headers, json=data)
         response.raise_for_status()
         
         content = response.json()
@@ -1,4 +1,13 @@
+from .analytics_viewset import AnalyticsViewSet
+from .async_views import (
+    AsyncIssueDetailView,
+    AsyncIssueListView,
+    AsyncIssueLocationsView,
+    AsyncMyNotificationsView,
+    AsyncNearbyIssuesView,
+)
 from .comments_viewset import CommentViewSet
+from .health_viewset import DatabaseReplicasView, MetricsView, OutboundServicesView
 from .issues_viewset import IssueViewSet
 from .login_viewset import LoginView
 from .notification_viewset import NotificationViewSet
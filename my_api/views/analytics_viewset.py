@@ -0,0 +1,163 @@
+from datetime import datetime
+from datetime import time as dt_time
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .common import (
+    IsAuthenticated,
+    IssueSlaBucket,
+    IssueStatsBucket,
+    StandardResponseMixin,
+    action,
+    status,
+    viewsets,
+)
+
+MAX_BUCKETS = 2000
+
+DEFAULT_RANGES = {
+    IssueStatsBucket.HOUR: timedelta(hours=48),
+    IssueStatsBucket.DAY: timedelta(days=30),
+}
+
+STEPS = {
+    IssueStatsBucket.HOUR: timedelta(hours=1),
+    IssueStatsBucket.DAY: timedelta(days=1),
+}
+
+
+def parse_moment(value):
+    """Accept an ISO datetime or a plain date (midnight UTC)."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        moment = datetime.combine(day, dt_time.min)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=dt_timezone.utc)
+    return moment
+
+
+class AnalyticsViewSet(viewsets.ViewSet, StandardResponseMixin):
+    """
+    Issue analytics served from the IssueStatsBucket rollup.
+
+    list:
+    Created/approved/solved counts per bucket, oldest first, zero-filled.
+    Query Parameters:
+    - granularity: hour or day (default: day)
+    - start, end: ISO date or datetime (default: last 48 hours / 30 days)
+    - area: AreaLocation id (default: all areas)
+    - category: Category label (default: all categories)
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request, *args, **kwargs):
+        params = request.query_params
+        granularity = params.get("granularity", IssueStatsBucket.DAY)
+        if granularity not in STEPS:
+            return self.error_response(
+                message="granularity must be 'hour' or 'day'",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            end = parse_moment(params["end"]) if params.get("end") else None
+            start = parse_moment(params["start"]) if params.get("start") else None
+            area_id = int(params["area"]) if params.get("area") else None
+        except ValueError:
+            return self.error_response(
+                message="Invalid start, end or area parameter",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        end = IssueStatsBucket.objects.bucket_start(
+            granularity, end or datetime.now(dt_timezone.utc)
+        )
+        start = IssueStatsBucket.objects.bucket_start(
+            granularity, start or end - DEFAULT_RANGES[granularity]
+        )
+        step = STEPS[granularity]
+        if start > end or (end - start) / step >= MAX_BUCKETS:
+            return self.error_response(
+                message=f"Range must be non-empty and at most {MAX_BUCKETS} buckets",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rows = IssueStatsBucket.objects.filter(
+            granularity=granularity,
+            area_id=area_id,
+            category=params.get("category", IssueStatsBucket.ALL),
+            bucket_start__gte=start,
+            bucket_start__lte=end,
+        ).values_list("bucket_start", "created_count", "approved_count", "solved_count")
+        counts = {row[0]: row[1:] for row in rows}
+
+        buckets = []
+        moment = start
+        while moment <= end:
+            created, approved, solved = counts.get(moment, (0, 0, 0))
+            buckets.append(
+                {
+                    "bucket": moment.isoformat(),
+                    "created": created,
+                    "approved": approved,
+                    "solved": solved,
+                }
+            )
+            moment += step
+
+        return self.success_response(
+            message="Issue Analytics",
+            data={
+                "granularity": granularity,
+                "area": area_id,
+                "category": params.get("category"),
+                "buckets": buckets,
+            },
+            status_code=status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["get"], url_path="sla")
+    def sla(self, request):
+        """
+        Time to first approval and time to resolution percentiles (seconds),
+        read from the IssueSlaBucket histograms.
+
+        Query Parameters:
+        - metric: approval or resolution (default: both)
+        - scope: all, area, category or official (default: all)
+        - key: AreaLocation id, category label or MyApiOfficial id; without
+          it every area/category/official of the scope is listed
+        """
+        params = request.query_params
+        metrics = dict(IssueSlaBucket.METRIC_CHOICES)
+        scope = params.get("scope", IssueSlaBucket.ALL)
+        if scope not in dict(IssueSlaBucket.SCOPE_CHOICES):
+            return self.error_response(
+                message="scope must be 'all', 'area', 'category' or 'official'",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        if params.get("metric") and params["metric"] not in metrics:
+            return self.error_response(
+                message="metric must be 'approval' or 'resolution'",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        key = "" if scope == IssueSlaBucket.ALL else params.get("key")
+        data = {"scope": scope, "key": key}
+        for metric in [params["metric"]] if params.get("metric") else metrics:
+            summary = IssueSlaBucket.objects.summarize(metric, scope, key)
+            data[metric] = (
+                summary.get(key, {"count": 0}) if key is not None else summary
+            )
+
+        return self.success_response(
+            message="Issue SLA Percentiles",
+            data=data,
+            status_code=status.HTTP_200_OK,
+        )
@@ -0,0 +1,319 @@
+"""
+Native async versions of the hot read endpoints, served under /api/async/.
+
+Responses (and cache entries) match the sync IssueViewSet / NotificationViewSet
+actions: the querysets come from the viewsets' own get_queryset() and filter
+backends, which only build SQL, and the same serializers render them. What
+changes is the I/O: JWT users and cached pages are read through
+redis.asyncio (async_cache.py), and the queries through the async ORM, so a
+request waiting on Redis or Postgres does not hold a worker thread.
+
+Serializers run on the event loop, so every queryset here must be fully
+loaded (select_related / annotations) before serialization.
+"""
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404, HttpResponse
+from django.views import View
+
+from ..authentication import CachedJWTAuthentication
+from ..db_routers import achoose_read_alias, read_from, use_read_alias
+from ..utils import custom_exception_handler
+from .common import (
+    POLYLINE,
+    POLYLINE_PRECISION,
+    D,
+    Distance,
+    IssueSerializer,
+    NotificationSerializer,
+    Point,
+    Polygon,
+    StandardResponseMixin,
+    aget_cached_emergency_contact,
+    async_cache,
+    encode_polyline,
+    serializer_timer,
+    status,
+    wants_compact_geometry,
+)
+from .issues_viewset import IssueViewSet
+from .notification_viewset import NotificationViewSet
+
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+_renderer = JSONRenderer()
+
+
+def as_http_response(response):
+    """Render a DRF Response without DRF's (sync) view machinery."""
+    http_response = HttpResponse(
+        _renderer.render(response.data),
+        status=response.status_code,
+        content_type="application/json",
+    )
+    for header, value in response.items():
+        http_response.setdefault(header, value)
+    return http_response
+
+
+async def apaginate(request, queryset, serializer_class):
+    """PageNumberPagination.get_paginated_response(...).data, with the async ORM."""
+    page_size = api_settings.PAGE_SIZE
+    try:
+        page = int(request.query_params.get("page", 1))
+        if page < 1:
+            raise ValueError
+    except ValueError:
+        raise NotFound("Invalid page.")
+
+    count = await queryset.acount()
+    offset = (page - 1) * page_size
+    if page > 1 and offset >= count:
+        raise NotFound("Invalid page.")
+    items = [item async for item in queryset[offset : offset + page_size]]
+
+    url = request.build_absolute_uri()
+    next_url = (
+        replace_query_param(url, "page", page + 1)
+        if offset + page_size < count
+        else None
+    )
+    if page == 1:
+        previous_url = None
+    elif page == 2:
+        previous_url = remove_query_param(url, "page")
+    else:
+        previous_url = replace_query_param(url, "page", page - 1)
+
+    serializer = serializer_class(items, many=True, context={"request": request})
+    with serializer_timer():
+        results = serializer.data
+    return {
+        "count": count,
+        "next": next_url,
+        "previous": previous_url,
+        "results": results,
+    }
+
+
+class AsyncReadView(StandardResponseMixin, View):
+    """
+    Base for the async endpoints: authenticates with CachedJWTAuthentication,
+    wraps the request for DRF code, and renders APIExceptions through
+    custom_exception_handler like the sync views.
+    """
+
+    allow_anonymous = False
+    # Serve the reads from a replica, as the sync action does (db_routers).
+    replica_reads = False
+    authentication = CachedJWTAuthentication()
+
+    async def get(self, request, *args, **kwargs):
+        with read_from(None):
+            try:
+                drf_request = await self.initialize_request(request)
+                if self.replica_reads:
+                    use_read_alias(await achoose_read_alias(drf_request.user))
+                return as_http_response(await self.read(drf_request, *args, **kwargs))
+            except (APIException, Http404) as exc:
+                return as_http_response(
+                    custom_exception_handler(exc, {"request": request, "view": self})
+                )
+
+    async def initialize_request(self, request):
+        drf_request = Request(request, authenticators=())
+        result = await self.authentication.aauthenticate(request)
+        if result is None:
+            if not self.allow_anonymous:
+                raise NotAuthenticated()
+            drf_request.user = AnonymousUser()
+        else:
+            drf_request.user = result[0]
+        return drf_request
+
+    def viewset(self, viewset_class, request, action):
+        """A sync viewset instance, used only for get_queryset/filter_queryset."""
+        return viewset_class(
+            request=request, action=action, args=(), kwargs={}, format_kwarg=None
+        )
+
+    async def read(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+
+class AsyncIssueListView(AsyncReadView):
+    allow_anonymous = True
+    replica_reads = True
+
+    async def read(self, request):
+        cache_key = IssueViewSet.list_cache_key(request)
+        cached_response = await async_cache.aget(cache_key)
+        if cached_response:
+            return self.success_response(
+                message="Fetched Successfully!! (from cache)",
+                data=cached_response,
+                status_code=status.HTTP_200_OK,
+            )
+
+        view = self.viewset(IssueViewSet, request, "list")
+        queryset = view.filter_queryset(view.get_queryset())
+        paginated_data = await apaginate(request, queryset, IssueSerializer)
+        await async_cache.aset(cache_key, paginated_data, 180)
+        return self.success_response(
+            message="Fetched Successfully!!",
+            data=paginated_data,
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class AsyncIssueDetailView(AsyncReadView):
+    async def read(self, request, pk):
+        view = self.viewset(IssueViewSet, request, "retrieve")
+        queryset = view.filter_queryset(view.get_queryset()).select_related("area")
+        try:
+            instance = await queryset.aget(pk=pk)
+        except (ObjectDoesNotExist, ValueError):
+            raise Http404("No Issue matches the given query.")
+
+        serializer = IssueSerializer(instance, context={"request": request})
+        with serializer_timer():
+            response_data = serializer.data
+
+        city = instance.area.city_name if instance.area else "Unknown"
+        area_name = instance.area.name if instance.area else "Unknown"
+        primary_category = (
+            instance.categories[0] if instance.categories else "public safety"
+        )
+        response_data["emergency_contact"] = await aget_cached_emergency_contact(
+            primary_category, city, area_name
+        )
+        return self.success_response(
+            message="Retrieval successful!",
+            data=response_data,
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class AsyncNearbyIssuesView(AsyncReadView):
+    replica_reads = True
+
+    async def read(self, request):
+        try:
+            latitude = float(request.query_params.get("latitude"))
+            longitude = float(request.query_params.get("longitude"))
+            distance = float(request.query_params.get("distance", 1000))
+        except (TypeError, ValueError):
+            return self.error_response(
+                message="Invalid or missing latitude/longitude.",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        geometry_format = "polyline" if wants_compact_geometry(request) else "geojson"
+        cache_key = f"nearby_issues:{latitude}_{longitude}_{distance}_{geometry_format}"
+        cached_data = await async_cache.aget(cache_key)
+        if cached_data:
+            return self.success_response(
+                message="Nearby issues fetched successfully (cached)",
+                data=cached_data,
+                status_code=status.HTTP_200_OK,
+            )
+
+        location = Point(longitude, latitude, srid=4326)
+        view = self.viewset(IssueViewSet, request, "nearby")
+        queryset = (
+            view.get_queryset()
+            .filter(location__distance_lte=(location, D(m=distance)))
+            .annotate(distance=Distance("location", location))
+            .order_by("distance")
+        )
+        response_data = await apaginate(request, queryset, IssueSerializer)
+        await async_cache.aset(cache_key, response_data, 300)
+        return self.success_response(
+            message="Nearby issues fetched successfully",
+            data=response_data,
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class AsyncIssueLocationsView(AsyncReadView):
+    replica_reads = True
+
+    async def read(self, request):
+        view = self.viewset(IssueViewSet, request, "issue_locations")
+        queryset = view.filter_queryset(view.get_queryset()).exclude(
+            location__isnull=True
+        )
+
+        statuses = request.query_params.getlist("status", [])
+        category = request.query_params.get("category")
+        bbox = request.query_params.get("bbox")
+
+        if bbox:
+            try:
+                coords = [float(c) for c in bbox.split(",")]
+                if len(coords) != 4:
+                    raise ValueError
+                queryset = queryset.filter(
+                    location__contained=Polygon.from_bbox(coords)
+                )
+            except (ValueError, TypeError):
+                return self.error_response(
+                    message="Invalid bbox format. Use min_lon,min_lat,max_lon,max_lat",
+                    status_code=400,
+                )
+        if statuses:
+            status_list = [s.strip() for s in statuses[0].split(",") if s.strip()]
+            queryset = queryset.filter(issue_status__in=status_list)
+        if category:
+            queryset = queryset.filter(categories__contains=[category])
+
+        locations = [
+            item
+            async for item in queryset.values("id", "title", "location", "issue_status")
+        ]
+        if wants_compact_geometry(request):
+            data = {
+                "encoding": POLYLINE,
+                "precision": POLYLINE_PRECISION,
+                "points": encode_polyline(
+                    item["location"].coords for item in locations
+                ),
+                "items": [
+                    {
+                        "id": item["id"],
+                        "title": item["title"],
+                        "status": item["issue_status"],
+                    }
+                    for item in locations
+                ],
+            }
+        else:
+            data = [
+                {
+                    "id": item["id"],
+                    "title": item["title"],
+                    "status": item["issue_status"],
+                    "coordinates": [item["location"].x, item["location"].y],
+                }
+                for item in locations
+            ]
+        return self.success_response(
+            message="Locations retrieved successfully", data=data, status_code=200
+        )
+
+
+class AsyncMyNotificationsView(AsyncReadView):
+    replica_reads = True
+
+    async def read(self, request):
+        view = self.viewset(NotificationViewSet, request, "my")
+        queryset = view.filter_queryset(view.get_queryset().filter(user=request.user))
+        paginated_data = await apaginate(request, queryset, NotificationSerializer)
+        return self.success_response(
+            message="Fetched Your Notifications Successfully!!", data=paginated_data
+        )
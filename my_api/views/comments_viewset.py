@@ -10,9 +10,10 @@ from .common import (
     StandardResponseMixin,
     action,
     async_to_sync,
-    connection,
     get_channel_layer,
     get_object_or_404,
+    scoped_throttles,
+    serializer_timer,
     status,
     viewsets,
 )
@@ -50,6 +51,14 @@ class CommentViewSet(viewsets.ModelViewSet, StandardResponseMixin):
         permission_classes = action_permissions.get(self.action, [IsAuthenticated])
         return [permission() for permission in permission_classes]
 
+    def get_throttles(self):
+        action_throttles = {
+            "create": "comment_create",
+            "like": "comment_like",
+        }
+        scope = action_throttles.get(self.action)
+        return scoped_throttles(scope) if scope else []
+
     def create(self, request, *args, **kwargs):
         issue = get_object_or_404(Issue, id=request.data.get("issueId"))
         parent_id = request.data.get("parentId")
@@ -101,8 +110,8 @@ class CommentViewSet(viewsets.ModelViewSet, StandardResponseMixin):
             serializer = self.get_serializer(
                 page, many=True, context={"request": request}
             )
-            paginated_data = self.get_paginated_response(serializer.data).data
-            print(f"Number of queries: {len(connection.queries)}")
+            with serializer_timer():
+                paginated_data = self.get_paginated_response(serializer.data).data
             return self.success_response(
                 message="Comment List",
                 data=paginated_data,
@@ -113,10 +122,11 @@ class CommentViewSet(viewsets.ModelViewSet, StandardResponseMixin):
         serializer = self.get_serializer(
             queryset, many=True, context={"request": request}
         )
-        print(f"Number of queries: {len(connection.queries)}")
+        with serializer_timer():
+            data = serializer.data
 
         return self.success_response(
-            message="Comment List", data=serializer.data, status_code=status.HTTP_200_OK
+            message="Comment List", data=data, status_code=status.HTTP_200_OK
         )
 
     def retrieve(self, request, *args, **kwargs):
@@ -149,7 +159,6 @@ class CommentViewSet(viewsets.ModelViewSet, StandardResponseMixin):
         comment = self.get_object()
         user = request.user
         like, created = Like.objects.get_or_create(user=user, comment=comment)
-        print(f"Number of queries: {len(connection.queries)}")
         if created:
             comment.likes_count += 1
             comment.save()
@@ -13,7 +13,8 @@ from django.contrib.gis.geos import Point, Polygon, MultiPolygon
 from django.contrib.gis.measure import D
 from django.core.mail import EmailMultiAlternatives
 from django.db import connection
-from django.db.models import Q, Count
+from django.db.models import Count, F, Q
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
 from django.template.loader import render_to_string
 from django.utils import timezone
@@ -24,9 +25,46 @@ from django.core.exceptions import ValidationError
 from asgiref.sync import async_to_sync
 
 from channels.layers import get_channel_layer
-from my_api.mixins import StandardResponseMixin
-from my_api.models import Comment, Issue, Like, MyApiOfficial, MyApiUser, Notification, AreaLocation
+from my_api.bulk_import import BulkImportError, IssueImporter, detect_format
+from my_api import async_cache
+from my_api.contact_cache import aget_cached_emergency_contact, get_cached_emergency_contact
+from my_api.db_routers import refresh_replica_health, replica_status
+from my_api.export import (
+    CONTENT_TYPES as EXPORT_CONTENT_TYPES,
+    aiter_chunks,
+    export_queryset,
+    parse_export_datetime,
+    render_export,
+)
+from my_api.geometry import (
+    POLYLINE,
+    POLYLINE_PRECISION,
+    boundary_field_for_zoom,
+    encode_geometry,
+    encode_polyline,
+    wants_compact_geometry,
+)
+from my_api.http_client import service_metrics
+from my_api.metrics import render_prometheus, serializer_timer
+from my_api.mixins import ReplicaReadMixin, StandardResponseMixin
+from my_api.pagination import IssueCursorPagination
+from my_api.models import (
+    AreaIssueCount,
+    AreaLocation,
+    Comment,
+    DeviceToken,
+    Issue,
+    IssueSlaBucket,
+    IssueStatsBucket,
+    IssueStatusConflict,
+    Like,
+    MyApiOfficial,
+    MyApiUser,
+    Notification,
+    OutgoingEmail,
+)
 from my_api.permissions import IsAdmin, IsOfficial, IsUser
+from my_api.throttling import scoped_throttles
 from my_api.serializers import (
     CommentSerializer,
     IssueSerializer,
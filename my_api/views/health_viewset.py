@@ -0,0 +1,59 @@
+from django.http import HttpResponse
+
+from .common import (
+    APIView,
+    IsAdmin,
+    StandardResponseMixin,
+    refresh_replica_health,
+    render_prometheus,
+    replica_status,
+    service_metrics,
+    status,
+)
+
+
+class OutboundServicesView(APIView, StandardResponseMixin):
+    """
+    Circuit breaker state plus request, error, retry and latency metrics for
+    each outbound service (Nominatim, Overpass, Gemini) in this process.
+    """
+
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return self.success_response(
+            message="Outbound Service Metrics",
+            data=service_metrics(),
+            status_code=status.HTTP_200_OK,
+        )
+
+
+class MetricsView(APIView):
+    """
+    Request latency, SQL, serializer and cache metrics plus the outbound
+    service metrics of this process, in the Prometheus text format.
+    """
+
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return HttpResponse(
+            render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+
+class DatabaseReplicasView(APIView, StandardResponseMixin):
+    """
+    Replication lag and health of each read replica, freshly checked. Reads
+    fall back to the primary while a replica is unhealthy.
+    """
+
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        refresh_replica_health(force=True)
+        return self.success_response(
+            message="Database Replicas",
+            data=replica_status(),
+            status_code=status.HTTP_200_OK,
+        )
@@ -1,8 +1,19 @@
 import hashlib
+import io
 import json
 from .common import (
     AllowAny,
+    AreaIssueCount,
+    BulkImportError,
+    EXPORT_CONTENT_TYPES,
+    IssueImporter,
+    aiter_chunks,
+    detect_format,
+    export_queryset,
+    parse_export_datetime,
+    render_export,
     AreaLocation,
+    Coalesce,
     Count,
     D,
     Distance,
@@ -12,6 +23,7 @@ from .common import (
     IsOfficial,
     Issue,
     IssueSerializer,
+    IssueStatusConflict,
     IsUser,
     Like,
     MyApiUser,
@@ -20,40 +32,42 @@ from .common import (
     Notification,
     Point,
     Q,
+    ReplicaReadMixin,
     StandardResponseMixin,
     action,
-    connection,
     filters,
     find_official_for_point,
     remove_keys_from_dict,
     reverse_geocode,
     fetch_boundary_from_overpass,
     send_push_notification,
-    get_emergency_contact_info,
+    get_cached_emergency_contact,
     status,
-    time,
     viewsets,
     GEOSGeometry,
     OSMPolygonExtractor,
     Polygon,
     MultiPolygon,
     ValidationError,
+    POLYLINE,
+    POLYLINE_PRECISION,
+    boundary_field_for_zoom,
+    encode_geometry,
+    encode_polyline,
+    wants_compact_geometry,
     get_emergency_contact,
+    scoped_throttles,
+    serializer_timer,
     # CustomPageNumberPagination,
 )
 from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
 from django.conf import settings
-# from rest_framework.throttling import UserRateThrottle, AnonRateThrottle
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 
 
-# class IssueRateThrottle(UserRateThrottle):
-#     rate = '100/hour'
-
-# class IssueAnonRateThrottle(AnonRateThrottle):
-#     rate = '20/hour'
-
-
-class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
+class IssueViewSet(ReplicaReadMixin, viewsets.ModelViewSet, StandardResponseMixin):
     """
     ViewSet for managing issues in the system.
     
@@ -86,7 +100,6 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
     queryset = Issue.objects.all()
     serializer_class = IssueSerializer
     permission_classes = [IsAuthenticated]
-    # throttle_classes = [IssueRateThrottle, IssueAnonRateThrottle]
     filterset_fields = ["issue_status"]
     filter_backends = [
         DjangoFilterBackend,
@@ -96,6 +109,7 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
     search_fields = ["title", "description"]
     ordering_fields = ["created_at", "likes_count", "comments_count", "title"]
     ordering = ["-created_at"]
+    replica_read_actions = ("list", "nearby", "issue_locations", "area_issue_counts")
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -127,17 +141,32 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
             "destroy": [IsAdmin, IsUser],
             "complete": [IsUser],
             "approve": [IsAdmin],
+            "bulk_import": [IsAdmin],
+            "export": [IsOfficial | IsAdmin],
         }
 
         permission_classes = action_permissions.get(self.action, [IsAuthenticated])
         return [permission() for permission in permission_classes]
 
-    def list(self, request, *args, **kwargs):
-        start_time = time.time()
+    def get_throttles(self):
+        action_throttles = {
+            "create": "issue_create",
+            "like": "issue_like",
+            "export": "issue_export",
+        }
+        scope = action_throttles.get(self.action)
+        return scoped_throttles(scope) if scope else []
 
+    @staticmethod
+    def list_cache_key(request):
+        """Shared with AsyncIssueListView, so both serve the same entries."""
         user_id = request.user.id if request.user.is_authenticated else "anon"
-        raw_key = f"issue_list:{user_id}:{json.dumps(request.query_params.dict(), sort_keys=True)}"
-        cache_key = "issue_list:" + hashlib.md5(raw_key.encode()).hexdigest()
+        geometry_format = "polyline" if wants_compact_geometry(request) else "geojson"
+        raw_key = f"issue_list:{user_id}:{geometry_format}:{json.dumps(request.query_params.dict(), sort_keys=True)}"
+        return "issue_list:" + hashlib.md5(raw_key.encode()).hexdigest()
+
+    def list(self, request, *args, **kwargs):
+        cache_key = self.list_cache_key(request)
 
         cached_response = cache.get(cache_key)
         if cached_response:
@@ -148,18 +177,13 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
             )
 
         queryset = self.filter_queryset(self.get_queryset())
-        query_time = time.time() - start_time
-        print(f"Query time: {query_time}")
 
         page = self.paginate_queryset(queryset)
 
         if page is not None:
-            start_time = time.time()
             serializer = self.get_serializer(page, many=True)
-            serialization_time = time.time() - start_time
-            print(f"Serialization time: {serialization_time}")
-            paginated_data = self.get_paginated_response(serializer.data).data
-            print(f"Number of queries: {len(connection.queries)}")
+            with serializer_timer():
+                paginated_data = self.get_paginated_response(serializer.data).data
 
             cache.set(cache_key, paginated_data, timeout=180)
 
@@ -170,7 +194,8 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
             )
 
         serializer = self.get_serializer(queryset, many=True)
-        cache.set(cache_key, serializer.data, timeout=300)
+        with serializer_timer():
+            cache.set(cache_key, serializer.data, timeout=300)
         return self.success_response(
             message="Fetched Successfully!!",
             data=serializer.data,
@@ -218,31 +243,26 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
         """
         issue = self.get_object()
         try:
-            issue.change_status(Issue.APPROVED)
-            serializer = self.get_serializer(issue).data
-            serializer["contact"] = "info.reportit@gmail.com"
-            # we have found the official here
-            officialUser = find_official_for_point(issue.location)
-            if officialUser:
-                send_push_notification(
-                    tokens=officialUser.user.fcm_tokens,
-                    title=f"A New Issue Has Been Assigned to You from {issue.location}",
-                )
-                officialUser.assigned_issues.append(issue)
-                serializer["contact"] = officialUser.user.email
-                officialUser.save()
-
-            serializer.save()
-            return self.success_response(
-                message="Issue Approved",
-                data=serializer,
-                status_code=status.HTTP_200_OK,
-            )
+            # Assignment and notifications run in process_outbox.
+            issue.change_status(Issue.APPROVED, changed_by=request.user)
+        except IssueStatusConflict as e:
+            return self.error_response(message=str(e), status_code=status.HTTP_409_CONFLICT)
         except ValidationError as e:
             return self.error_response(
                 message=str(e), status_code=status.HTTP_400_BAD_REQUEST
             )
 
+        data = self.get_serializer(issue).data
+        data["contact"] = "info.reportit@gmail.com"
+        official = find_official_for_point(issue.location)
+        if official:
+            data["contact"] = official.user.email
+        return self.success_response(
+            message="Issue Approved",
+            data=data,
+            status_code=status.HTTP_200_OK,
+        )
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = self.get_serializer(instance)
@@ -250,15 +270,9 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
         city = instance.area.city_name if instance.area else "Unknown"
         area_name = instance.area.name if instance.area else "Unknown"
         primary_category = instance.categories[0] if instance.categories else "public safety"
-        
-        cache_key = f"emergency_contact_{primary_category}_{city}_{area_name}".lower()
-        
-        emergency_contact = cache.get(cache_key)
-        
-        if emergency_contact is None:
-            emergency_contact = get_emergency_contact_info(primary_category, city, area_name)
-            # timeout = getattr(settings, 'EMERGENCY_CONTACT_CACHE_TIMEOUT', 3600)
-            cache.set(cache_key, emergency_contact, timeout=3600)
+
+        # Served stale-while-revalidate; Gemini is only ever called off-request.
+        emergency_contact = get_cached_emergency_contact(primary_category, city, area_name)
 
         response_data = serializer.data
         response_data["emergency_contact"] = emergency_contact
@@ -341,7 +355,9 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
                     status_code=status.HTTP_403_FORBIDDEN,
                 )
         try:
-            issue.change_status(new_status)
+            issue.change_status(new_status, changed_by=user)
+        except IssueStatusConflict as e:
+            return self.error_response(message=str(e), status_code=status.HTTP_409_CONFLICT)
         except ValidationError as e:
             return self.error_response(
                 message=str(e),
@@ -436,6 +452,48 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
             status_code=status.HTTP_201_CREATED,
         )
 
+    @action(detail=False, methods=["post"], url_path="bulk-import")
+    def bulk_import(self, request):
+        """
+        Import many issues from an uploaded CSV or GeoJSON `file`, owned by
+        the requesting admin, without per-issue geocoding (see bulk_import.py).
+        Optional fields: format (csv/geojson, else taken from the file
+        name) and status (default approved). Rows that fail validation or
+        duplicate an existing issue are reported in `errors` and skipped.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            return self.error_response(
+                message="Missing file upload",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        default_status = request.data.get("status", Issue.APPROVED)
+        if default_status not in dict(Issue.ISSUE_STATUS):
+            return self.error_response(
+                message=f"'{default_status}' is not a valid issue status",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        importer = IssueImporter(request.user, default_status=default_status)
+        try:
+            fmt = detect_format(upload.name, request.data.get("format"))
+            stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+            report = importer.run(stream, fmt)
+        except (BulkImportError, UnicodeDecodeError) as e:
+            # Batches loaded before the unreadable part stay imported.
+            return self.error_response(
+                message=f"Could not read the import file: {e}",
+                data=importer.report,
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return self.success_response(
+            message=f"Imported {report['imported']} of {report['rows']} rows",
+            data=report,
+            status_code=status.HTTP_201_CREATED if report["imported"] else status.HTTP_200_OK,
+        )
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         print(instance.user, request.user)
@@ -482,8 +540,7 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
                 title="Issue Liked",
                 description=f"User {user.username} raised {issue.title}",
             )
-            if issue.user.fcm_tokens:
-                send_push_notification(notification)
+            send_push_notification(notification)
 
             return self.success_response(
                 message="Issue liked",
@@ -523,7 +580,8 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
 
-        cache_key = f"nearby_issues_{latitude}_{longitude}_{distance}"
+        geometry_format = "polyline" if wants_compact_geometry(request) else "geojson"
+        cache_key = f"nearby_issues:{latitude}_{longitude}_{distance}_{geometry_format}"
         cached_data = cache.get(cache_key)
         
         if cached_data:
@@ -570,6 +628,8 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
         - status: Filter by issue status (comma-separated)
         - category: Filter by category (use the %26 for '&' character)
         - bbox: Filter by bounding box (min_lon,min_lat,max_lon,max_lat)
+        - geometry: "polyline" returns every point as one encoded polyline
+          (in item order) instead of per-item coordinates
         """
         print("HELLO REQUEST REACHED")
         queryset = self.filter_queryset(self.get_queryset()).exclude(location__isnull=True)
@@ -601,6 +661,23 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
         
         
         locations = queryset.values('id', 'title', 'location', 'issue_status')
+
+        if wants_compact_geometry(request):
+            locations = list(locations)
+            data = {
+                "encoding": POLYLINE,
+                "precision": POLYLINE_PRECISION,
+                "points": encode_polyline(item['location'].coords for item in locations),
+                "items": [
+                    {"id": item['id'], "title": item['title'], "status": item['issue_status']}
+                    for item in locations
+                ],
+            }
+            return self.success_response(
+                message="Locations retrieved successfully",
+                data=data,
+                status_code=200
+            )
         
         data = [
             {   "id": item['id'],
@@ -632,8 +709,8 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
         page = self.paginate_queryset(liked_issues)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            paginated_data = self.get_paginated_response(serializer.data).data
-            print(f"Number of queries: {len(connection.queries)}")
+            with serializer_timer():
+                paginated_data = self.get_paginated_response(serializer.data).data
             return self.success_response(
                 message="Issues Liked by the User",
                 data=paginated_data,
@@ -654,10 +731,21 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
         Query Parameters:
         - area_name (optional): Area name to filter issues by
         - city_name (optional): City name to further narrow down the area
+        - zoom (optional): Map zoom level, returns boundaries simplified for it
+        - geometry (optional): "polyline" encodes each boundary ring as a polyline
         """
         area_name = request.query_params.get("area_name")
         city_name = request.query_params.get("city_name")
 
+        try:
+            zoom = int(request.query_params["zoom"]) if request.query_params.get("zoom") else None
+        except ValueError:
+            return self.error_response(
+                message="zoom must be an integer",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        boundary_field = boundary_field_for_zoom(zoom)
+
         if not area_name and not city_name:
             return self.error_response(
                 message="Provide at least area_name or city_name to search",
@@ -686,13 +774,23 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
             serializer = self.get_serializer(issues, many=True)
             data = {"issues": serializer.data}
 
+        compact = wants_compact_geometry(request)
+        # Areas not simplified yet (simplify_area_boundaries) serve the full boundary.
+        served = area_qs.only("id", "name").annotate(
+            served_boundary=Coalesce(boundary_field, "boundary")
+        )
         data["boundaries"] = [
             {
                 "area_id": area.id,
                 "name": area.name,
-                "coords": list(area.boundary.coords) if area.boundary else None
+                "coords": (
+                    encode_geometry(area.served_boundary)
+                    if compact
+                    else list(area.served_boundary.coords)
+                )
             }
-            for area in area_qs if area.boundary
+            for area in served
+            if area.served_boundary
         ]
 
         return self.success_response(
@@ -716,7 +814,9 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
 
-        issues = Issue.objects.filter(location__within=official_profile.area_range)
+        issues = self.get_queryset().filter(
+            location__within=official_profile.area_range
+        )
 
         page = self.paginate_queryset(issues)
         if page is not None:
@@ -732,46 +832,111 @@ class IssueViewSet(viewsets.ModelViewSet, StandardResponseMixin):
             status_code=status.HTTP_200_OK,
         )
         
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        Stream issues as a file download, straight from a server-side cursor.
+        Officials get the issues inside their area_range, admins every issue
+        (or one AreaLocation with `area`).
+        Query Parameters:
+        - export_format: csv (default), geojson or ndjson
+        - status: comma-separated issue statuses
+        - category: a category label
+        - created_after / created_before: ISO date or datetime (inclusive)
+        """
+        fmt = request.query_params.get("export_format", "csv")
+        if fmt not in EXPORT_CONTENT_TYPES:
+            return self.error_response(
+                message=f"export_format must be one of: {', '.join(EXPORT_CONTENT_TYPES)}",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        criteria = {"category": request.query_params.get("category")}
+        statuses = [
+            s.strip() for s in request.query_params.get("status", "").split(",") if s.strip()
+        ]
+        invalid = [s for s in statuses if s not in dict(Issue.ISSUE_STATUS)]
+        if invalid:
+            return self.error_response(
+                message=f"Invalid status: {', '.join(invalid)}",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        criteria["statuses"] = statuses
+        try:
+            for param, end_of_day in (("created_after", False), ("created_before", True)):
+                if request.query_params.get(param):
+                    criteria[param] = parse_export_datetime(
+                        request.query_params[param], end_of_day=end_of_day
+                    )
+            if request.user.role == MyApiUser.OFFICIAL:
+                official_profile = request.user.official_profile.first()
+                if not official_profile or not official_profile.area_range:
+                    return self.error_response(
+                        message="Official does not have an area_range defined.",
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                    )
+                criteria["area_range"] = official_profile.area_range
+            elif request.query_params.get("area"):
+                criteria["area_id"] = int(request.query_params["area"])
+        except ValueError as e:
+            return self.error_response(
+                message=str(e), status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        chunks = render_export(export_queryset(**criteria), fmt)
+        if isinstance(request._request, ASGIRequest):
+            chunks = aiter_chunks(chunks)
+        response = StreamingHttpResponse(chunks, content_type=EXPORT_CONTENT_TYPES[fmt])
+        filename = f"issues-{timezone.now():%Y%m%d-%H%M%S}.{fmt}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
     @action(detail=False, permission_classes=[IsAuthenticated], url_path='area-counts')
     def area_issue_counts(self, request):
+        """
+        Areas ranked by issue count, read from the AreaIssueCount rollup.
+
+        Query Parameters:
+        - status: Only count issues with this status
+        - category: Only count issues with this category
+        """
         issues_by_area = (
-            Issue.objects
-            .filter(area__isnull=False)
-            .values(
-                "area__id",
-                "area__name",
-                "area__city_name",
-                "area__country"
-            )
-            .annotate(issue_count=Count("id"))
-            .order_by("-issue_count")
+            AreaIssueCount.objects
+            .filter(
+                issue_status=request.query_params.get("status", AreaIssueCount.ALL),
+                category=request.query_params.get("category", AreaIssueCount.ALL),
+                issue_count__gt=0,
+            )
+            .select_related("area")
+            .order_by("-issue_count", "area_id")
         )
 
-        results = [
-            {
-                "area_id": row["area__id"],
-                "name": row["area__name"],
-                "city": row["area__city_name"],
-                "country": row["area__country"],
-                "issue_count": row["issue_count"]
-            }
-            for row in issues_by_area
-        ]
-
-        page = self.paginate_queryset(results)
+        def serialize(rows):
+            return [
+                {
+                    "area_id": row.area_id,
+                    "name": row.area.name,
+                    "city": row.area.city_name,
+                    "country": row.area.country,
+                    "issue_count": row.issue_count
+                }
+                for row in rows
+            ]
+
+        page = self.paginate_queryset(issues_by_area)
         if page is not None:
             return self.success_response(
                 message="Area-wise Issue Counts",
-                data=self.get_paginated_response(page).data,
+                data=self.get_paginated_response(serialize(page)).data,
                 status_code=status.HTTP_200_OK,
             )
 
         return self.success_response(
             message="Area-wise Issue Counts",
-            data=results,
+            data=serialize(issues_by_area),
             status_code=status.HTTP_200_OK,
         )
-    
+
     @action(detail=True, methods=["get"], url_path="officials", permission_classes=[IsAuthenticated])
     def get_issue_official(self, request, pk=None):
         """
@@ -5,6 +5,7 @@ from .common import (
     RefreshToken,
     StandardResponseMixin,
     generics,
+    scoped_throttles,
     status,
     update_last_login,
 )
@@ -13,6 +14,9 @@ from .common import (
 class LoginView(generics.GenericAPIView, StandardResponseMixin):
     serializer_class = LoginSerializer
 
+    def get_throttles(self):
+        return scoped_throttles("login")
+
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         role = request.data.get("role")
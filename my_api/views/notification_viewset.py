@@ -2,6 +2,7 @@ from .common import (
     IsAuthenticated,
     Notification,
     NotificationSerializer,
+    ReplicaReadMixin,
     StandardResponseMixin,
     action,
     status,
@@ -9,10 +10,11 @@ from .common import (
 )
 
 
-class NotificationViewSet(viewsets.ModelViewSet, StandardResponseMixin):
+class NotificationViewSet(ReplicaReadMixin, viewsets.ModelViewSet, StandardResponseMixin):
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    replica_read_actions = ("my",)
 
     def get_permissions(self):
         """
@@ -1,7 +1,10 @@
 from .common import (
+    F,
     IsAdmin,
     IsAuthenticated,
     IsOfficial,
+    IssueCursorPagination,
+    IssueSerializer,
     IsUser,
     MyApiOfficial,
     OfficialSerializer,
@@ -26,6 +29,8 @@ class OfficialViewSet(viewsets.ModelViewSet, StandardResponseMixin):
             "partial_update": [IsAuthenticated],
             "destroy": [IsAuthenticated],
             "verify": [IsAdmin],
+            "leaderboard": [IsAuthenticated],
+            "issues": [IsAuthenticated],
         }
         permission_classes = action_permissions.get(self.action, [IsAuthenticated])
         return [permission() for permission in permission_classes]
@@ -70,3 +75,52 @@ class OfficialViewSet(viewsets.ModelViewSet, StandardResponseMixin):
             data=serializer.data,
             status_code=status.HTTP_200_OK,
         )
+
+    @action(detail=False, methods=["get"])
+    def leaderboard(self, request, *args, **kwargs):
+        """
+        Officials ranked by resolved issues, then by median time-to-resolve.
+        Reads the denormalized stats, so it is a single index-ordered query.
+        """
+        queryset = MyApiOfficial.objects.order_by(
+            "-resolved_count", F("median_resolution_seconds").asc(nulls_last=True), "id"
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            paginated_data = self.get_paginated_response(serializer.data).data
+            return self.success_response(
+                message="Official Leaderboard", data=paginated_data
+            )
+        serializer = self.get_serializer(queryset, many=True)
+        return self.success_response(message="Official Leaderboard", data=serializer.data)
+
+    @action(detail=True, methods=["get"])
+    def issues(self, request, *args, **kwargs):
+        """
+        Issues assigned to this official, cursor-paginated newest first.
+
+        Query Parameters:
+        - status: Filter by issue status (comma-separated)
+        - page_size: Page size (max 100)
+        """
+        official = self.get_object()
+        queryset = IssueSerializer.setup_eager_loading(
+            official.assigned_issues.all(), request.user
+        )
+
+        statuses = request.query_params.get("status")
+        if statuses:
+            queryset = queryset.filter(
+                issue_status__in=[s.strip() for s in statuses.split(",") if s.strip()]
+            )
+
+        paginator = IssueCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = IssueSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return self.success_response(
+            message="Official Assigned Issues",
+            data=paginator.get_paginated_response(serializer.data).data,
+        )
@@ -1,9 +1,9 @@
 import json
 from .common import (
     APIView,
-    EmailMultiAlternatives,
     MyApiUser,
     MyApiUserSerializer,
+    OutgoingEmail,
     RefreshToken,
     RegisterSerializer,
     Response,
@@ -13,6 +13,7 @@ from .common import (
     generics,
     random,
     render_to_string,
+    scoped_throttles,
     settings,
     status,
     timedelta,
@@ -87,6 +88,9 @@ class SocialRegisterView(generics.CreateAPIView, StandardResponseMixin):
 
 
 class SendEmailView(APIView, StandardResponseMixin):
+    def get_throttles(self):
+        return scoped_throttles("send_email")
+
     def get(self, request, refresh_code=False):
         email = self.request.query_params.get("email")
         # print(email)
@@ -111,11 +115,9 @@ class SendEmailView(APIView, StandardResponseMixin):
             {"username": user.username, "verification_code": verification_code},
         )
 
-        email = EmailMultiAlternatives(
-            email_subject, email_body_html, settings.EMAIL_HOST_USER, [user.email]
+        OutgoingEmail.objects.enqueue(
+            email_subject, email_body_html, [user.email], settings.EMAIL_HOST_USER
         )
-        email.attach_alternative(email_body_html, "text/html")
-        email.send()
         return self.success_response(
             message="Verification Email Sent Successfully!",
             data={"email": user.email},
@@ -124,6 +126,9 @@ class SendEmailView(APIView, StandardResponseMixin):
 
 
 class VerifyEmailView(APIView, StandardResponseMixin):
+    def get_throttles(self):
+        return scoped_throttles("verify_email")
+
     def post(self, request):
         serializer = VerifyEmailSerializer(data=request.data)
         if serializer.is_valid():
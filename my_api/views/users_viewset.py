@@ -1,4 +1,5 @@
 from .common import (
+    DeviceToken,
     IsAdmin,
     IsAuthenticated,
     IsOfficial,
@@ -85,12 +86,7 @@ class UserViewSet(viewsets.ModelViewSet, StandardResponseMixin):
                 message="Token is required", status=status.HTTP_400_BAD_REQUEST
             )
 
-        if user.fcm_tokens is None:
-            user.fcm_tokens = []
-
-        if fcmToken not in user.fcm_tokens:
-            user.fcm_tokens.append(fcmToken)
-            user.save()
+        DeviceToken.objects.register(user, fcmToken)
 
         return self.success_response(
             message="FCM Token added successfully",
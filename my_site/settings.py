@@ -85,12 +85,33 @@ INSTALLED_APPS = [
 # Configure the default authentication classes
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "my_api.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.AllowAny",),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 25,
     "EXCEPTION_HANDLER": "my_api.utils.custom_exception_handler",
+    # Reverse proxies in front of the app. The IP throttles only trust that
+    # many X-Forwarded-For hops, so clients cannot pick their own IP (0: use
+    # REMOTE_ADDR and ignore the header).
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES") or 0),
+    # Sliding-window limits (my_api/throttling.py): "<scope>" is per user,
+    # "<scope>_ip" is per client IP.
+    "DEFAULT_THROTTLE_RATES": {
+        "issue_create": "20/hour",
+        "issue_create_ip": "60/hour",
+        "issue_like": "120/min",
+        "issue_like_ip": "300/min",
+        "comment_create": "30/min",
+        "comment_create_ip": "90/min",
+        "comment_like": "120/min",
+        "comment_like_ip": "300/min",
+        "login_ip": "10/min",
+        "send_email_ip": "5/min",
+        "verify_email_ip": "10/min",
+        "issue_export": "30/hour",
+        "issue_export_ip": "60/hour",
+    },
 }
 
 SIMPLE_JWT = {
@@ -104,6 +125,8 @@ SIMPLE_JWT = {
 }
 
 MIDDLEWARE = [
+    "my_api.middleware.PerformanceMetricsMiddleware",
+    "my_api.middleware.ReadYourWritesMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -114,6 +137,9 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Requests slower than this are logged by PerformanceMetricsMiddleware.
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS") or 1.0)
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 ROOT_URLCONF = "my_site.urls"
@@ -152,6 +178,30 @@ DATABASES = {
     }
 }
 
+# Streaming replicas of "default" ("host" or "host:port", comma-separated).
+# Views opt endpoints into replica reads; see my_api/db_routers.py.
+REPLICA_DATABASES = []
+for index, replica in enumerate(filter(None, os.getenv("db_replica_hosts", "").split(","))):
+    replica_host, _, replica_port = replica.strip().partition(":")
+    alias = f"replica{index + 1}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": replica_host,
+        "PORT": replica_port or DATABASES["default"]["PORT"],
+        "OPTIONS": {**DATABASES["default"]["OPTIONS"], "connect_timeout": 2},
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ["my_api.db_routers.ReplicaRouter"]
+# Replicas lagging more than this are skipped until they catch up; lag is
+# re-checked by each process every REPLICA_LAG_CHECK_SECONDS.
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS") or 2)
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS") or 2)
+# How long a user reads from the primary after a write. Keep it above
+# REPLICA_MAX_LAG_SECONDS + REPLICA_LAG_CHECK_SECONDS.
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS") or 5)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -173,11 +223,29 @@ AUTH_PASSWORD_VALIDATORS = [
 # Email settings from .env
 EMAIL_BACKEND = os.getenv("EMAIL_BACKEND")
 EMAIL_HOST = os.getenv("EMAIL_HOST")
-EMAIL_PORT = int(os.getenv("EMAIL_PORT", default=587))
+EMAIL_PORT = int(os.getenv("EMAIL_PORT") or 587)
 EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS") == "True"
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL")
+EMAIL_TIMEOUT = int(os.getenv("EMAIL_TIMEOUT") or 10)
+
+# Verification emails are queued as OutgoingEmail rows and delivered by
+# `manage.py send_queued_emails`.
+EMAIL_QUEUE_BATCH_SIZE = 50
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+
+# Side effects of issue status changes are queued as OutboxEvent rows and run
+# by `manage.py process_outbox`.
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+
+# Hours an issue may stay in each status before its officials are notified
+# by `manage.py escalate_overdue_issues`, then again every
+# ISSUE_ESCALATION_REPEAT_HOURS until the status changes.
+ISSUE_ESCALATION_HOURS = {"approved": 48, "solving": 168, "reopened": 48}
+ISSUE_ESCALATION_REPEAT_HOURS = 24
+ISSUE_ESCALATION_BATCH_SIZE = 200
 
 
 UNFOLD = {
@@ -197,6 +265,30 @@ CHANNEL_LAYERS = {
     },
 }
 
+REDIS_URL = os.getenv("REDIS_URL") or "redis://127.0.0.1:6379"
+
+CACHES = {
+    "default": {
+        # RedisCache that also counts hits/misses for /metrics/.
+        "BACKEND": "my_api.cache_backend.InstrumentedRedisCache",
+        "LOCATION": f"{REDIS_URL}/1",
+    }
+}
+
+# Emergency contacts (Gemini) are served stale-while-revalidate, see
+# my_api/contact_cache.py. Times are in seconds.
+EMERGENCY_CONTACT_FRESH_SECONDS = int(os.getenv("EMERGENCY_CONTACT_FRESH_SECONDS") or 86400)
+EMERGENCY_CONTACT_STALE_SECONDS = int(
+    os.getenv("EMERGENCY_CONTACT_STALE_SECONDS") or 30 * 86400
+)
+EMERGENCY_CONTACT_ERROR_SECONDS = int(os.getenv("EMERGENCY_CONTACT_ERROR_SECONDS") or 120)
+EMERGENCY_CONTACT_REFRESH_WORKERS = 2
+
+# Authenticated user cache (my_api/user_cache.py)
+AUTH_USER_CACHE_SECONDS = int(os.getenv("AUTH_USER_CACHE_SECONDS") or 300)
+AUTH_USER_LOCAL_CACHE_SECONDS = int(os.getenv("AUTH_USER_LOCAL_CACHE_SECONDS") or 5)
+AUTH_USER_LOCAL_CACHE_SIZE = 1024
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 